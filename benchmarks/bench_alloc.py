@@ -0,0 +1,170 @@
+"""shootit / massquare 普通模式每帧的内存分配和 GC 停顿报告
+
+模拟持续生成敌人、不停射击的局面，热身之后逐帧统计：
+    blocks   净增加的内存块数（sys.getallocatedblocks），不为 0 的帧数 / 总数
+    net      tracemalloc 记录的内存净增长（字节，所有帧合计）
+    peak     帧内临时内存的峰值（字节，p50 / 最大），和实体数量无关说明没有按实体分配
+    gc       gc 回调测到的回收次数和最长停顿
+每个游戏测三行：update 只有更新，frame 是整帧（更新 + Game.draw() + present()，dummy 显示驱动，
+插值 alpha = 0.5，HUD 的计时每帧前进一个 tick），dirty 是打开脏矩形模式（--dirty）的整帧。
+dirty 的 peak 几乎都是 pygame.display.update() 在内部为矩形临时分配的 SDL_Rect 数组（每个矩形 16 字节，
+用完就释放），DirtyRects 自己记录和提交矩形不分配内存。blocks 和 gc 在不开 tracemalloc 的一遍里单独统计。
+--legacy 同时测量原来的写法（[x, y] 列表、每次检测都新建 Rect、复制列表）的更新作为对比。
+
+用法：python benchmarks/bench_alloc.py [--warmup 300] [--frames 600] [--legacy]
+"""
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "pythgames"))
+
+import pygame  # noqa: E402
+
+import massquare  # noqa: E402
+import shootit  # noqa: E402
+from bench_shootit_collisions import legacy_update  # noqa: E402
+from entities import EntityPool, SpatialHash  # noqa: E402
+
+W, H = shootit.SCREEN_WIDTH, shootit.SCREEN_HEIGHT
+PLAYER_X, PLAYER_Y = W // 2 - shootit.PLAYER_SIZE // 2, H - 100
+ENEMY_EVERY = 2   # 每隔几帧生成一个敌人
+BULLET_EVERY = 2  # 每隔几帧发射一颗子弹
+ALPHA = 0.5       # 画面插值的 alpha，< 1 时实体画在两个 tick 之间
+
+
+def legacy_massquare(enemies, player_x, player_y):
+    """原来 massquare.main() 里的敌人更新逻辑"""
+    player_hit = False
+    for enemy in enemies[:]:
+        enemy[1] += massquare.ENEMY_SPEED
+        player_rect = pygame.Rect(player_x, player_y, massquare.PLAYER_SIZE, massquare.PLAYER_SIZE)
+        enemy_rect = pygame.Rect(enemy[0], enemy[1], massquare.ENEMY_SIZE, massquare.ENEMY_SIZE)
+        if player_rect.colliderect(enemy_rect):
+            player_hit = True
+        if enemy[1] > H:
+            enemies.remove(enemy)
+    return player_hit
+
+
+def scenario(game, pooled, draw=False, dirty=False, seed=0):
+    """返回 (每帧调用一次的函数, 当前实体数的函数)；draw 为 True 时每帧还画出并提交画面，dirty 为 True 时用脏矩形模式"""
+    rng = random.Random(seed)
+    grid = SpatialHash(W, H, shootit.GRID_CELL)
+    if pooled:
+        # 用游戏自己的对象池和玩家矩形，Game.draw() 画的就是这里更新的实体
+        g = game.Game(seed=seed, dirty=dirty)
+        if draw:
+            g.open()
+        enemies, player_rect = g.enemies, g.player_rect
+        bullets = g.bullets if game is shootit else []
+        add_enemy = enemies.add
+        add_bullet = bullets.add if game is shootit else None
+    else:
+        player_rect = pygame.Rect(PLAYER_X, PLAYER_Y, shootit.PLAYER_SIZE, shootit.PLAYER_SIZE)
+        enemies, bullets = [], []
+        add_enemy = lambda x, y: enemies.append([x, y])  # noqa: E731
+        add_bullet = lambda x, y: bullets.append([x, y])  # noqa: E731
+    tick = [0]
+
+    def frame():
+        tick[0] += 1
+        if tick[0] % ENEMY_EVERY == 0:
+            add_enemy(rng.randrange(W - game.ENEMY_SIZE), -game.ENEMY_SIZE)
+        if game is shootit:
+            if tick[0] % BULLET_EVERY == 0:
+                add_bullet(rng.randrange(W - shootit.BULLET_SIZE), PLAYER_Y)
+            if pooled:
+                shootit.update_entities(enemies, bullets, player_rect, grid)
+            else:
+                legacy_update(enemies, bullets, PLAYER_X, PLAYER_Y)
+        elif pooled:
+            massquare.update_enemies(enemies, player_rect)
+        else:
+            legacy_massquare(enemies, PLAYER_X, PLAYER_Y)
+        if draw:
+            g.ticks += 1
+            g.draw(ALPHA)
+            g.present()
+
+    return frame, lambda: len(enemies) + len(bullets)
+
+
+def measure(frame, live, warmup, frames):
+    for _ in range(warmup):
+        frame()
+    # 结果数组预先分配好，统计本身不在被测的帧里分配内存
+    blocks = [0] * frames
+    net = [0] * frames
+    peaks = [0] * frames
+    counts = [0] * frames
+    pauses = []
+    gc_start = [0.0]
+
+    def on_gc(phase, info):
+        if phase == "start":
+            gc_start[0] = time.perf_counter()
+        else:
+            pauses.append(time.perf_counter() - gc_start[0])
+
+    # 内存块数和 GC 单独跑一遍，tracemalloc 自己记录每次分配时也会让块数上下波动
+    gc.callbacks.append(on_gc)
+    try:
+        for i in range(frames):
+            before_blocks = sys.getallocatedblocks()
+            frame()
+            blocks[i] = sys.getallocatedblocks() - before_blocks
+            counts[i] = live()
+    finally:
+        gc.callbacks.remove(on_gc)
+
+    tracemalloc.start()
+    frame()  # tracemalloc 刚启动时自身会分配一些内存，这一帧不计入
+    try:
+        for i in range(frames):
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            frame()
+            after, peak = tracemalloc.get_traced_memory()
+            net[i] = after - before
+            peaks[i] = peak - before
+    finally:
+        tracemalloc.stop()
+    peaks.sort()
+    return {
+        "live": sum(counts) / frames,
+        "alloc_frames": sum(1 for b in blocks if b > 0),
+        "net": sum(net),
+        "peak_p50": peaks[frames // 2],
+        "peak_max": peaks[-1],
+        "gc": len(pauses),
+        "gc_max_ms": max(pauses, default=0.0) * 1e3,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--warmup", type=int, default=300)
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--legacy", action="store_true", help="同时测量原来的写法")
+    args = parser.parse_args()
+
+    print(f"{'':>18} {'live':>6} {'blocks':>10} {'net':>8} {'peak p50':>9} {'peak max':>9} {'gc':>4} {'gc max ms':>10}")
+    for game in (shootit, massquare):
+        runs = [("update", True, False, False), ("frame", True, True, False), ("dirty", True, True, True)]
+        if args.legacy:
+            runs.append(("legacy", False, False, False))
+        for label, pooled, draw, dirty in runs:
+            frame, live = scenario(game, pooled, draw, dirty)
+            r = measure(frame, live, args.warmup, args.frames)
+            name = f"{game.__name__} {label}"
+            print(f"{name:>18} {r['live']:>6.0f} {r['alloc_frames']:>4}/{args.frames:<5} {r['net']:>8} "
+                  f"{r['peak_p50']:>9} {r['peak_max']:>9} {r['gc']:>4} {r['gc_max_ms']:>10.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""弹幕模式下 EntityStore 每帧更新和绘制的耗时，随场上实体数量的变化
+
+场上先铺满指定数量的敌人，之后每帧补充被删除的敌人，让数量保持不变；
+shootit 另外有十分之一数量的子弹从底部射出。update 是两个游戏的 update_bullet_hell，
+draw 是游戏里用的 EntityStore.draw（一次 Surface.blits），draw.rect 是原来逐个 pygame.draw.rect 的画法。
+
+用法：python benchmarks/bench_entities.py [--counts 1000 10000 50000] [--frames 120]
+"""
+import argparse
+import os
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "pythgames"))
+
+import pygame  # noqa: E402
+
+import massquare  # noqa: E402
+import runtime  # noqa: E402
+import shootit  # noqa: E402
+from entities import EntityStore, sprite  # noqa: E402
+
+W, H = shootit.SCREEN_WIDTH, shootit.SCREEN_HEIGHT
+
+
+def fill(store, count, speed, y):
+    """补充到 count 个实体，新实体在 y 范围内随机分布"""
+    if len(store) < count:
+        store.spawn(count - len(store), x=(0, W - store.width), y=y, vx=(-1.0, 1.0), vy=speed)
+
+
+def run(game, count, frames):
+    enemies = EntityStore(game.HELL_ENEMY_SIZE, game.HELL_ENEMY_SIZE, seed=0)
+    bullets = EntityStore(shootit.BULLET_SIZE, shootit.BULLET_SIZE, seed=1)
+    fill(enemies, count, game.HELL_ENEMY_SPEED, (-game.HELL_ENEMY_SIZE, H))
+    screen = runtime.get().display((W, H))
+    enemy_image = sprite(shootit.RED, enemies.width, enemies.height)
+    bullet_image = sprite(shootit.YELLOW, bullets.width, bullets.height)
+    update_time = draw_time = legacy_time = 0.0
+    for _ in range(frames):
+        start = time.perf_counter()
+        if game is shootit:
+            game.update_bullet_hell(enemies, bullets, W // 2, H - 100)
+        else:
+            game.update_bullet_hell(enemies, W // 2, H - 100)
+        update_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        enemies.draw(screen, enemy_image)
+        bullets.draw(screen, bullet_image)
+        draw_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        for x, y in enemies.positions():
+            pygame.draw.rect(screen, shootit.RED, (x, y, enemies.width, enemies.height))
+        for x, y in bullets.positions():
+            pygame.draw.rect(screen, shootit.YELLOW, (x, y, bullets.width, bullets.height))
+        legacy_time += time.perf_counter() - start
+
+        fill(enemies, count, game.HELL_ENEMY_SPEED, (-game.HELL_ENEMY_SIZE, 0))
+        if game is shootit:
+            fill(bullets, count // 10, -shootit.BULLET_SPEED, (H - 50, H))
+    return update_time / frames, draw_time / frames, legacy_time / frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--counts", type=int, nargs="+", default=[1000, 10000, 50000], help="场上的敌人数")
+    parser.add_argument("--frames", type=int, default=120)
+    args = parser.parse_args()
+
+    print(f"{'game':>10} {'count':>8} {'update ms':>10} {'draw ms':>10} {'draw.rect ms':>13}")
+    for game in (massquare, shootit):
+        for count in args.counts:
+            update, draw, legacy = run(game, count, args.frames)
+            print(f"{game.__name__:>10} {count:>8} {update * 1e3:>10.2f} {draw * 1e3:>10.2f} {legacy * 1e3:>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
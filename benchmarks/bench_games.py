@@ -0,0 +1,233 @@
+"""四个游戏在脚本输入和放大负载下的每 tick 耗时：update / draw / flip 的分位数和 ticks/s
+
+不开窗口（SDL dummy 驱动）、不限帧率，按游戏主循环的顺序逐 tick 调用 step()、draw()、present()，
+输入由脚本按 tick 生成，随机数种子固定，所以每次运行的局面完全相同：
+    shootit / massquare        左右来回移动、一直射击，结束后马上重开；生成频率随 --scale 提高
+    shootit-hell / massquare-hell  弹幕模式，每个 tick 生成的敌人数乘以 --scale
+    sanke                      自动驾驶，棋盘边长乘以 --scale
+    maze                       反复 生成 -> 求解 -> 点击格子显示路线 -> 换算法重新生成，视口一直平移；
+                               迷宫边长乘以 --scale，固定步长模式（每帧的工作量固定）
+--json 把结果写成 JSON；--baseline 和之前保存的 JSON 比较，变慢超过 --threshold 的项目标记为回归，
+有回归时退出码为 1。
+
+用法：python benchmarks/bench_games.py [--scenarios maze sanke] [--scale 2] [--ticks 600]
+                                      [--json out.json] [--baseline base.json] [--threshold 0.2]
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+from contextlib import contextmanager
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "pythgames"))
+
+import pygame  # noqa: E402
+
+import entities  # noqa: E402
+import massquare  # noqa: E402
+import maze  # noqa: E402
+import sanke  # noqa: E402
+import shootit  # noqa: E402
+
+PHASES = ("update", "draw", "flip")
+PERCENTILES = (50, 95, 99)
+MIN_DELTA_MS = 0.02  # 比基线慢不到这么多毫秒时不算回归，避免很小的数值被噪声放大
+
+
+@contextmanager
+def patched(module, values):
+    """临时修改模块里的常量（生成频率等），退出时恢复"""
+    saved = {name: getattr(module, name) for name in values}
+    for name, value in values.items():
+        setattr(module, name, value)
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(module, name, value)
+
+
+def shooter(module, bullet_hell):
+    """shootit / massquare 的场景，返回 setup(scale, seed) -> (游戏, 输入脚本, 要修改的常量)"""
+    def setup(scale, seed):
+        if bullet_hell:
+            if entities.np is None:
+                return None
+            constants = {"HELL_SPAWN": module.HELL_SPAWN * scale}
+        else:
+            constants = {"ENEMY_SPAWN_RATE": max(1, module.ENEMY_SPAWN_RATE // (10 * scale))}
+        game = module.Game(bullet_hell, seed=seed)
+        game.open()
+        shoot = getattr(module, "SHOOT", 0)
+
+        def script(tick):
+            if game.state != "PLAYING":
+                return (module.RESTART,)
+            return (shoot | (module.LEFT if tick // 90 % 2 else module.RIGHT),)
+
+        return game, script, constants
+    return setup
+
+
+def snake(scale, seed):
+    size = sanke.GRID_WIDTH * scale
+    game = sanke.Game(seed, size, size)
+    game.open()
+
+    def script(tick):
+        if tick == 0:
+            return (sanke.CMD_AUTOPILOT,)
+        if game.game_over:
+            return (sanke.CMD_SPACE,)  # 重新开始，自动驾驶保持开启
+        return ()
+
+    return game, script, {}
+
+
+def maze_demo(scale, seed):
+    game = maze.Game(maze.COLS * 10 * scale, maze.ROWS * 10 * scale, compact=True, seed=seed, fixed_step=True)
+    game.open()
+    rng = random.Random(seed)
+    phase = [0]
+
+    def script(tick):
+        # 视口斜着平移（只影响画面），每隔一段时间回到左上角
+        camera = game.camera
+        if tick % 300 == 0:
+            camera.x = camera.y = 0.0
+        camera.move(7, 5)
+        camera.clamp(game.cols, game.rows)
+        if tick == 0:
+            return (maze.CMD_FASTER,) * (len(maze.SOLVE_SPEEDS) - 1)  # 求解动画不限速
+        if game.gen_task or game.solve_task or game.field_task or game.route_start is not None:
+            return ()
+        phase[0] = (phase[0] + 1) % 3
+        if phase[0] == 1:
+            return (maze.CMD_SOLVE,)
+        if phase[0] == 2:
+            return (maze.CMD_CLICK, rng.randrange(game.cols), rng.randrange(game.rows))
+        return (maze.CMD_ALGORITHM, maze.CMD_GENERATE)
+
+    return game, script, {}
+
+
+SCENARIOS = {
+    "shootit": (shootit, shooter(shootit, False)),
+    "shootit-hell": (shootit, shooter(shootit, True)),
+    "massquare": (massquare, shooter(massquare, False)),
+    "massquare-hell": (massquare, shooter(massquare, True)),
+    "maze": (maze, maze_demo),
+    "sanke": (sanke, snake),
+}
+
+
+def percentile(values, p):
+    """values 已排序"""
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+def spread(stats):
+    return "/".join(f"{stats[f'p{p}']:.2f}" for p in PERCENTILES)
+
+
+def run(module, setup, scale, ticks, warmup, seed):
+    """返回 {"ticks", "ticks_per_sec", 各阶段: {"p50", "p95", "p99", "mean"}}，时间单位为毫秒；场景不可用时返回 None"""
+    scenario = setup(scale, seed)
+    if scenario is None:
+        return None
+    game, script, constants = scenario
+    times = {phase: [0.0] * ticks for phase in PHASES}
+    update, draw, flip = (times[phase] for phase in PHASES)
+    clock = time.perf_counter
+    with patched(module, constants):
+        for tick in range(-warmup, ticks):
+            inputs = script(tick + warmup)
+            t0 = clock()
+            game.step(*inputs)
+            t1 = clock()
+            game.draw()
+            t2 = clock()
+            game.present()
+            t3 = clock()
+            if tick >= 0:
+                update[tick] = t1 - t0
+                draw[tick] = t2 - t1
+                flip[tick] = t3 - t2
+    result = {"ticks": ticks, "ticks_per_sec": ticks / sum(map(sum, times.values()))}
+    for phase, values in times.items():
+        values.sort()
+        stats = {f"p{p}": percentile(values, p) * 1e3 for p in PERCENTILES}
+        stats["mean"] = sum(values) / ticks * 1e3
+        result[phase] = stats
+    return result
+
+
+def compare(results, baseline, threshold):
+    """和基线比较，返回回归列表 [(场景, 指标, 基线值, 当前值)]"""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if result["ticks_per_sec"] < base["ticks_per_sec"] * (1 - threshold):
+            regressions.append((name, "ticks/s", base["ticks_per_sec"], result["ticks_per_sec"]))
+        for phase in PHASES:
+            for key in ("p50", "p95"):
+                old, new = base[phase][key], result[phase][key]
+                if new > old * (1 + threshold) and new - old > MIN_DELTA_MS:
+                    regressions.append((name, f"{phase} {key} ms", old, new))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--scale", type=int, default=1, help="负载倍数：生成频率、敌人数、棋盘和迷宫边长")
+    parser.add_argument("--ticks", type=int, default=600, help="每个场景计时的 tick 数")
+    parser.add_argument("--warmup", type=int, default=60, help="计时前先跑的 tick 数")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", metavar="PATH", help="把结果写成 JSON，可以作为以后的 --baseline")
+    parser.add_argument("--baseline", metavar="PATH", help="和之前 --json 保存的结果比较")
+    parser.add_argument("--threshold", type=float, default=0.2, help="比基线慢多少（比例）算回归")
+    args = parser.parse_args()
+
+    print(f"{'scenario':>15} {'ticks/s':>9}" + "".join(f" {phase + ' p50/p95/p99 ms':>24}" for phase in PHASES))
+    results = {}
+    for name in sorted(args.scenarios, key=list(SCENARIOS).index):
+        module, setup = SCENARIOS[name]
+        result = run(module, setup, args.scale, args.ticks, args.warmup, args.seed)
+        if result is None:
+            print(f"{name:>15} 跳过（需要 numpy）")
+            continue
+        results[name] = result
+        print(f"{name:>15} {result['ticks_per_sec']:>9.0f}" + "".join(f" {spread(result[phase]):>24}" for phase in PHASES))
+
+    if args.json:
+        meta = {
+            "scale": args.scale, "ticks": args.ticks, "warmup": args.warmup, "seed": args.seed,
+            "python": platform.python_version(), "pygame": pygame.version.ver,
+            "numpy": entities.np.__version__ if entities.np is not None else None,
+            "platform": platform.platform(),
+        }
+        with open(args.json, "w") as fp:
+            json.dump({"meta": meta, "results": results}, fp, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as fp:
+            baseline = json.load(fp)
+        if baseline["meta"]["scale"] != args.scale:
+            print(f"注意：基线的 --scale 是 {baseline['meta']['scale']}，结果不可直接比较")
+        regressions = compare(results, baseline["results"], args.threshold)
+        for name, metric, old, new in regressions:
+            print(f"回归：{name} {metric} {old:.3f} -> {new:.3f}")
+        if not regressions:
+            print(f"没有比基线慢 {args.threshold:.0%} 以上的项目")
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
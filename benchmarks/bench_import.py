@@ -0,0 +1,86 @@
+"""导入每个 pythgames 模块的耗时，以及导入时有没有初始化 pygame、打开窗口
+
+每个模块在单独的子进程里导入，重复 --repeat 次取最小值：
+    total  在新进程里直接导入这个模块的耗时，包括 pygame、numpy 等依赖
+    own    先导入 pygame 和 numpy（装了的话）再导入这个模块的耗时，也就是模块本身的开销
+导入后 pygame 的显示或字体模块已经初始化（打开了窗口、扫描了系统字体）的模块算失败，
+own 超过 --limit 毫秒的也算失败；有失败时退出码为 1。
+
+用法：python benchmarks/bench_import.py [--modules shootit maze] [--repeat 5] [--limit 50]
+"""
+import argparse
+import glob
+import os
+import subprocess
+import sys
+
+PYTHGAMES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "pythgames")
+
+PROBE = """
+import sys, time
+sys.path.insert(0, {path!r})
+if {preload}:
+    import pygame
+    try:
+        import numpy
+    except ImportError:
+        pass
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+import pygame
+print(elapsed, int(pygame.display.get_init()), int(pygame.font.get_init()))
+"""
+
+
+def probe(module, preload):
+    """在新进程里导入 module，返回 (耗时秒数, 显示是否已初始化, 字体是否已初始化)；导入失败时返回 None"""
+    # 万一打开了窗口也不要真的弹出来
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", PYGAME_HIDE_SUPPORT_PROMPT="1")
+    code = PROBE.format(path=PYTHGAMES, preload=preload, module=module)
+    result = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        return None
+    elapsed, display, font = result.stdout.split()[-3:]
+    return float(elapsed), display == "1", font == "1"
+
+
+def main():
+    # __main__.py 是 python pythgames 的入口，导入它就会启动游戏
+    modules = sorted(os.path.splitext(os.path.basename(path))[0]
+                     for path in glob.glob(os.path.join(PYTHGAMES, "*.py")) if not os.path.basename(path).startswith("_"))
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modules", nargs="+", choices=modules, default=modules)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--limit", type=float, default=50.0, help="own 超过这么多毫秒算失败")
+    args = parser.parse_args()
+
+    print(f"{'module':>10} {'total ms':>9} {'own ms':>8}  pygame")
+    failed = []
+    for module in args.modules:
+        runs = {preload: [probe(module, preload) for _ in range(args.repeat)] for preload in (False, True)}
+        if None in runs[False] + runs[True]:
+            print(f"{module:>10} 导入失败（缺少依赖？）")
+            continue
+        total = min(run[0] for run in runs[False]) * 1e3
+        own = min(run[0] for run in runs[True]) * 1e3
+        display = any(run[1] for run in runs[False])
+        font = any(run[2] for run in runs[False])
+        status = []
+        if display:
+            status.append("初始化了显示")
+        if font:
+            status.append("初始化了字体")
+        if own > args.limit:
+            status.append(f"超过 {args.limit:g} ms")
+        if status:
+            failed.append(module)
+        print(f"{module:>10} {total:>9.1f} {own:>8.1f}  {'，'.join(status) or '未初始化'}")
+
+    if failed:
+        print(f"失败：{' '.join(failed)}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""迷宫文件的保存/加载耗时，并检查保存再加载后数据不变
+
+正确性的往返测试（Maze.save / Maze.load 两种模式和加载后的绘制）在 tests/test_mazefile.py。
+
+用法：python benchmarks/bench_maze_file.py [--size 2000] [--algorithm sidewinder]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "pythgames"))
+
+import mazefile  # noqa: E402
+import mazegen  # noqa: E402
+import mazesolve  # noqa: E402
+
+
+def timed(label, func):
+    start = time.perf_counter()
+    result = func()
+    print(f"{label:>28}: {(time.perf_counter() - start) * 1000:>10.1f} ms")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=2000)
+    parser.add_argument("--algorithm", default="sidewinder", choices=list(mazegen.GENERATORS))
+    args = parser.parse_args()
+
+    cols = rows = args.size
+    goal = cols * rows - 1
+    walls = mazegen.GENERATORS[args.algorithm](cols, rows, random.Random(0))
+    solution = mazesolve.solve(walls, cols, rows, 0, goal).path
+    print(f"{cols}x{rows} ({cols * rows:,} 格), {args.algorithm}, 路径 {len(solution):,} 格")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.maze")
+        timed("save", lambda: mazefile.save(path, walls, cols, rows, solution))
+        print(f"{'file size':>28}: {os.path.getsize(path) / 1e6:>10.1f} MB")
+
+        f = timed("load (mmap)", lambda: mazefile.load(path))
+        timed("read cached solution", lambda: list(f.solution))
+        loaded = timed("unpack to bytearray", f.walls.unpack)
+        assert loaded == walls, "round-trip 后墙壁数据不一致"
+        assert list(f.solution) == solution, "round-trip 后路径不一致"
+        timed("bfs on unpacked walls", lambda: mazesolve.solve(loaded, cols, rows, 0, goal))
+        timed("bfs directly on mmap", lambda: mazesolve.solve(f.walls, cols, rows, 0, goal))
+        f.close()
+    print("round-trip ok")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""比较各个迷宫生成算法的速度（格子/秒）
+
+用法：python benchmarks/bench_maze_generators.py [--sizes 100 1000] [--repeat 3]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "pythgames"))
+
+import mazegen  # noqa: E402
+
+
+def best_time(func, repeat):
+    best = float("inf")
+    for seed in range(repeat):
+        random.seed(seed)
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'size':>11} {'algorithm':>12} {'seconds':>9} {'cells/s':>12} {'vs dfs':>7}")
+    for size in args.sizes:
+        cells = size * size
+        dfs = None
+        for name, gen in mazegen.GENERATORS.items():
+            if name in mazegen.NUMPY_GENERATORS and mazegen.np is None:
+                print(f"{size:>5}x{size:<5} {name:>12} {'skipped (numpy not installed)':>30}")
+                continue
+            t = best_time(lambda: gen(size, size), args.repeat)
+            if name == "dfs":
+                dfs = t
+            print(f"{size:>5}x{size:<5} {name:>12} {t:>9.3f} {cells / t:>12,.0f} {dfs / t:>6.1f}x")
+
+if __name__ == "__main__":
+    main()
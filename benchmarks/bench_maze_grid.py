@@ -0,0 +1,78 @@
+"""对比 Cell 对象网格与紧凑掩码网格的内存占用和耗时
+
+超过 --max-cell-grid 个格子的 Cell 网格太占内存（4000x4000 要好几 GB），默认不实际运行，
+表里给出按较小的 Cell 网格实测的每格字节数推算出的 grid MB（前面带 ~），仍然可以和紧凑网格对比；
+要实测就把 --max-cell-grid 调大。
+
+用法：python benchmarks/bench_maze_grid.py [--sizes 100 1000 4000] [--max-cell-grid 1000000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "pythgames"))
+
+import maze  # noqa: E402
+
+
+def measure(size, compact):
+    random.seed(size)
+    start = time.perf_counter()
+    m = maze.Maze(size, size, compact=compact)
+    gen_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    m.solve_bfs()
+    solve_time = time.perf_counter() - start
+    path_len = len(m.solution_path)
+    del m
+
+    # 单独跑一次统计内存峰值，避免 tracemalloc 拖慢计时
+    random.seed(size)
+    tracemalloc.start()
+    m = maze.Maze(size, size, compact=compact)
+    grid_bytes = tracemalloc.get_traced_memory()[0]
+    m.solve_bfs()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return gen_time, solve_time, grid_bytes, peak, path_len
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 4000])
+    parser.add_argument("--max-cell-grid", type=int, default=1_000_000,
+                        help="Cell 网格超过这个格子数就跳过（太大会耗尽内存）")
+    args = parser.parse_args()
+
+    print(f"{'size':>11} {'mode':>8} {'gen s':>9} {'solve s':>9} {'grid MB':>9} {'peak MB':>9} {'B/cell':>7}")
+    cell_bytes = None  # 最近一次实测的 Cell 网格每格字节数，用来推算跳过的大小
+    estimated = False
+    for size in args.sizes:
+        cells = size * size
+        for compact in (False, True):
+            mode = "compact" if compact else "cell"
+            if not compact and cells > args.max_cell_grid:
+                if cell_bytes is None:
+                    print(f"{size:>5}x{size:<5} {mode:>8} {'skipped (--max-cell-grid)':>30}")
+                else:
+                    estimated = True
+                    grid = f"~{cell_bytes * cells / 1e6:.1f}"
+                    print(f"{size:>5}x{size:<5} {mode:>8} {'-':>9} {'-':>9} {grid:>9} {'-':>9} {cell_bytes:>7.1f}")
+                continue
+            gen_time, solve_time, grid_bytes, peak, _ = measure(size, compact)
+            if not compact:
+                cell_bytes = grid_bytes / cells
+            print(f"{size:>5}x{size:<5} {mode:>8} {gen_time:>9.2f} {solve_time:>9.2f} "
+                  f"{grid_bytes / 1e6:>9.1f} {peak / 1e6:>9.1f} {grid_bytes / cells:>7.1f}")
+    if estimated:
+        print(f"~ 超过 --max-cell-grid {args.max_cell_grid} 个格子的 Cell 网格没有实际运行，"
+              f"grid MB 按实测的每格字节数推算；用 --max-cell-grid 调大上限可以实测（注意内存）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""迷宫分块渲染的每帧耗时：视口平移时，绘制开销应该只和屏幕大小有关，和迷宫大小无关
+
+用法：python benchmarks/bench_maze_render.py [--sizes 20 200 2000] [--frames 300]
+"""
+import argparse
+import os
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "pythgames"))
+
+import pygame  # noqa: E402
+
+import maze  # noqa: E402
+
+
+def frame_times(m, camera, frames):
+    screen = pygame.Surface((camera.width, camera.height))
+    times = []
+    for _ in range(frames):
+        start = time.perf_counter()
+        screen.fill(maze.COLOR_BG)
+        m.draw(screen, -1, camera)
+        times.append(time.perf_counter() - start)
+        # 斜着平移，每帧都会有新的分块进入视口
+        camera.move(7, 5)
+        camera.clamp(m.cols, m.rows)
+    times.sort()
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 200, 2000])
+    parser.add_argument("--frames", type=int, default=300)
+    args = parser.parse_args()
+
+    pygame.init()
+    print(f"{'size':>10} {'zoom':>5} {'p50 ms':>8} {'max ms':>8} {'chunks':>7}")
+    for size in args.sizes:
+        m = maze.Maze(size, size, compact=True, algorithm="eller", seed=0)
+        for cell_size in maze.ZOOM_LEVELS:
+            camera = maze.Camera(maze.WIDTH, maze.HEIGHT, cell_size)
+            times = frame_times(m, camera, args.frames)
+            print(f"{size:>5}x{size:<4} {cell_size:>5} {times[len(times) // 2] * 1000:>8.2f} "
+                  f"{times[-1] * 1000:>8.2f} {len(m._chunks):>7}")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
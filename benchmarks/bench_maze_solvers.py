@@ -0,0 +1,35 @@
+"""在同一张迷宫上比较各个求解器展开的节点数和耗时
+
+用法：python benchmarks/bench_maze_solvers.py [--size 500] [--seed 0]
+"""
+import argparse
+import os
+import random
+import sys
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "pythgames"))
+
+import maze  # noqa: E402
+import mazesolve  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    m = maze.Maze(args.size, args.size, compact=True)
+    print(f"{args.size}x{args.size}, seed={args.seed}")
+    print(f"{'solver':>16} {'fill':>5} {'path':>8} {'expanded':>10} {'pruned':>10} {'ms':>9}")
+    for name in mazesolve.SOLVERS:
+        for dead_end_fill in (False, True):
+            r = m.solve(name, dead_end_fill=dead_end_fill)
+            print(f"{name:>16} {'yes' if dead_end_fill else 'no':>5} {len(r.path):>8} "
+                  f"{r.expanded:>10} {r.pruned:>10} {r.elapsed * 1000:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
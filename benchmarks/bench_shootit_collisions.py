@@ -0,0 +1,148 @@
+"""射击游戏在大量敌人和子弹下每帧更新（移动 + 碰撞检测）的耗时
+
+每帧结束后补充新的敌人（从顶部落下）和子弹（从底部射出），让场上数量保持不变。
+--legacy 同时测量原来的写法（每对敌人和子弹都新建 Rect，用 list.remove 删除）作为对比，
+并先用较小的规模逐帧核对两种写法的结果完全一致。
+
+用法：python benchmarks/bench_shootit_collisions.py [--counts 500 2000 5000] [--frames 120] [--legacy]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "pythgames"))
+
+import pygame  # noqa: E402
+
+import shootit  # noqa: E402
+from entities import EntityPool, SpatialHash  # noqa: E402
+
+W, H = shootit.SCREEN_WIDTH, shootit.SCREEN_HEIGHT
+PLAYER_X, PLAYER_Y = W // 2, H - 100
+PLAYER_RECT = pygame.Rect(PLAYER_X, PLAYER_Y, shootit.PLAYER_SIZE, shootit.PLAYER_SIZE)
+
+
+def legacy_update(enemies, bullets, player_x, player_y):
+    """原来 main() 里的子弹、敌人更新逻辑，返回 (击落的敌人数, 玩家是否被撞到)"""
+    hits = 0
+    player_hit = False
+    for bullet in bullets[:]:
+        bullet[1] -= shootit.BULLET_SPEED
+        if bullet[1] < -shootit.BULLET_SIZE:
+            bullets.remove(bullet)
+    for enemy in enemies[:]:
+        enemy[1] += shootit.ENEMY_SPEED
+        player_rect = pygame.Rect(player_x, player_y, shootit.PLAYER_SIZE, shootit.PLAYER_SIZE)
+        enemy_rect = pygame.Rect(enemy[0], enemy[1], shootit.ENEMY_SIZE, shootit.ENEMY_SIZE)
+        if player_rect.colliderect(enemy_rect):
+            player_hit = True
+        for bullet in bullets[:]:
+            bullet_rect = pygame.Rect(bullet[0], bullet[1], shootit.BULLET_SIZE, shootit.BULLET_SIZE)
+            if bullet_rect.colliderect(enemy_rect):
+                if enemy in enemies:
+                    enemies.remove(enemy)
+                if bullet in bullets:
+                    bullets.remove(bullet)
+                hits += 1
+                break
+        if enemy in enemies and enemy[1] > H:
+            enemies.remove(enemy)
+    return hits, player_hit
+
+
+def scene(count, rng):
+    """count 个敌人和 count 颗子弹，随机分布在整个屏幕上，返回 [x, y] 列表"""
+    enemies = [[rng.randint(0, W - shootit.ENEMY_SIZE), rng.randint(-shootit.ENEMY_SIZE, H)] for _ in range(count)]
+    bullets = [[rng.randint(0, W - shootit.BULLET_SIZE), rng.randint(0, H)] for _ in range(count)]
+    return enemies, bullets
+
+
+def pools(enemies, bullets):
+    """把 [x, y] 列表放进 shootit 用的对象池"""
+    enemy_pool = EntityPool(shootit.ENEMY_SIZE, shootit.ENEMY_SIZE)
+    bullet_pool = EntityPool(shootit.BULLET_SIZE, shootit.BULLET_SIZE)
+    for x, y in enemies:
+        enemy_pool.add(x, y)
+    for x, y in bullets:
+        bullet_pool.add(x, y)
+    return enemy_pool, bullet_pool
+
+
+def positions(pool):
+    return [[entity.rect.x, entity.rect.y] for entity in pool]
+
+
+def refill(enemies, bullets, count, rng):
+    """enemies 和 bullets 可以是列表或对象池"""
+    add_enemy = enemies.append if isinstance(enemies, list) else lambda e: enemies.add(*e)
+    add_bullet = bullets.append if isinstance(bullets, list) else lambda b: bullets.add(*b)
+    while len(enemies) < count:
+        add_enemy([rng.randint(0, W - shootit.ENEMY_SIZE), -shootit.ENEMY_SIZE])
+    while len(bullets) < count:
+        add_bullet([rng.randint(0, W - shootit.BULLET_SIZE), H])
+
+
+def new_grid():
+    return SpatialHash(W, H, shootit.GRID_CELL)
+
+
+def check(count=300, frames=100, seed=0):
+    rng = random.Random(seed)
+    old_enemies, old_bullets = scene(count, rng)
+    enemies, bullets = pools(old_enemies, old_bullets)
+    grid = new_grid()
+    total = 0
+    for frame in range(frames):
+        result = shootit.update_entities(enemies, bullets, PLAYER_RECT, grid)
+        assert result == legacy_update(old_enemies, old_bullets, PLAYER_X, PLAYER_Y), f"第 {frame} 帧结果不一致"
+        assert positions(enemies) == old_enemies and positions(bullets) == old_bullets, f"第 {frame} 帧实体不一致"
+        total += result[0]
+        # 两边用同一个随机数种子补充实体
+        state = rng.getstate()
+        refill(enemies, bullets, count, rng)
+        rng.setstate(state)
+        refill(old_enemies, old_bullets, count, rng)
+    return total
+
+
+def time_frames(update, count, frames, seed=0, pooled=True):
+    rng = random.Random(seed)
+    enemies, bullets = scene(count, rng)
+    if pooled:
+        enemies, bullets = pools(enemies, bullets)
+    elapsed = 0.0
+    for _ in range(frames):
+        start = time.perf_counter()
+        update(enemies, bullets)
+        elapsed += time.perf_counter() - start
+        refill(enemies, bullets, count, rng)
+    return elapsed / frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--counts", type=int, nargs="+", default=[500, 2000, 5000], help="敌人和子弹各多少个")
+    parser.add_argument("--frames", type=int, default=120)
+    parser.add_argument("--legacy", action="store_true", help="同时测量原来的写法")
+    args = parser.parse_args()
+
+    if args.legacy:
+        print(f"结果核对通过（击落 {check()} 个敌人）")
+    grid = new_grid()
+    print(f"{'count':>8} {'ms/frame':>10}" + (f" {'legacy ms/frame':>16}" if args.legacy else ""))
+    for count in args.counts:
+        ms = time_frames(lambda e, b: shootit.update_entities(e, b, PLAYER_RECT, grid), count, args.frames)
+        line = f"{count:>8} {ms * 1e3:>10.2f}"
+        if args.legacy:
+            # 原来的写法是 O(敌人数 x 子弹数)，帧数少一点
+            legacy = time_frames(lambda e, b: legacy_update(e, b, PLAYER_X, PLAYER_Y), count, max(1, args.frames // 40),
+                                 pooled=False)
+            line += f" {legacy * 1e3:>16.2f}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
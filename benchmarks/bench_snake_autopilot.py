@@ -0,0 +1,76 @@
+"""贪吃蛇自动驾驶的无界面基准：每秒步数、每步决策耗时和通关率
+
+每局用固定的种子，从开局一直玩到占满棋盘或撞死（或达到 --max-ticks）。
+fill 是结束时蛇身占据的格子占棋盘的比例（撞死时撞上去的那个蛇头不算）；
+行列数都是奇数的棋盘没有哈密顿回路，通常只能做到差一格占满。
+
+用法：python benchmarks/bench_snake_autopilot.py [--sizes 10 20 30] [--games 3]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "pythgames"))
+
+import sanke  # noqa: E402
+import snakeai  # noqa: E402
+
+
+def play(size, seed, max_ticks):
+    """玩一局，返回 (结果, 步数, 最终占据的格子数, 每步决策耗时列表, 总耗时, A* 次数)"""
+    rng = random.Random(seed)
+    snake = sanke.Snake(size, size)
+    food = sanke.Food()
+    food.spawn(snake, rng)
+    pilot = snakeai.Autopilot(size, size)
+    latencies = []
+    result = sanke.MOVED
+    start = time.perf_counter()
+    ticks = 0
+    while result not in (sanke.DIED, sanke.WON) and ticks < max_ticks:
+        t0 = time.perf_counter()
+        direction = pilot.next_direction(snake, food.position)
+        latencies.append(time.perf_counter() - t0)
+        snake.change_direction(direction)
+        result = sanke.step(snake, food, rng)
+        ticks += 1
+    # 撞死时蛇头已经移到墙外或别的蛇身上，只数棋盘内不同的格子
+    cells = {(x, y) for x, y in snake.body if 0 <= x < size and 0 <= y < size}
+    return result, ticks, len(cells), latencies, time.perf_counter() - start, pilot.replans
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 20, 30])
+    parser.add_argument("--games", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-ticks", type=int, default=2_000_000)
+    args = parser.parse_args()
+
+    print(f"{'board':>7} {'won':>5} {'fill':>6} {'ticks':>10} {'ticks/s':>10} {'p50 us':>8} {'p99 us':>8} "
+          f"{'max ms':>8} {'A*':>7}")
+    for size in args.sizes:
+        wins = ticks = replans = filled = 0
+        elapsed = 0.0
+        latencies = []
+        for game in range(args.games):
+            result, n, length, lat, secs, plans = play(size, args.seed + game, args.max_ticks)
+            wins += result == sanke.WON
+            filled += length
+            ticks += n
+            elapsed += secs
+            latencies += lat
+            replans += plans
+        latencies.sort()
+        p50 = latencies[len(latencies) // 2] * 1e6
+        p99 = latencies[len(latencies) * 99 // 100] * 1e6
+        fill = filled / (args.games * size * size)
+        print(f"{size:>3}x{size:<3} {wins:>2}/{args.games:<2} {fill:>6.1%} {ticks:>10,} {ticks / elapsed:>10,.0f} "
+              f"{p50:>8.1f} {p99:>8.1f} {latencies[-1] * 1000:>8.2f} {replans:>7,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""批量贪吃蛇模拟器的吞吐量（环境步数/秒），并和 sanke.Snake 逐步对照规则
+
+用法：python benchmarks/bench_snake_envs.py [--envs 1 64 1024 4096] [--steps 500] [--board 30]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "pythgames"))
+
+import numpy as np  # noqa: E402
+
+import sanke  # noqa: E402
+import snakeenv  # noqa: E402
+
+
+def check_rules(board, envs=16, steps=3000, seed=0):
+    """用相同的动作同时推进 SnakeEnvs 和 sanke.Snake，食物位置从 SnakeEnvs 抄过来，逐步比较"""
+    sim = snakeenv.SnakeEnvs(envs, board, board, seed=seed)
+    snakes = [sanke.Snake(board, board) for _ in range(envs)]
+    foods = [sim.food[i] for i in range(envs)]
+    rng = np.random.default_rng(seed)
+    directions = [sanke.UP, sanke.RIGHT, sanke.DOWN, sanke.LEFT]
+    episodes = 0
+    for _ in range(steps):
+        # 大多数时候保持方向，这样蛇能活得久一点、吃到食物
+        actions = np.where(rng.random(envs) < 0.2, rng.integers(0, 4, envs), -1)
+        _, dones = sim.step(actions)
+        for i, snake in enumerate(snakes):
+            if actions[i] >= 0:
+                snake.change_direction(directions[actions[i]])
+            snake.move()
+            done = snake.check_collision()
+            food = (foods[i] % board, foods[i] // board)
+            if not done and snake.body[0] == food:
+                snake.grow = True
+                done = not len(snake.free)
+            assert done == dones[i], f"第 {i} 个棋盘的结束状态不一致"
+            if done:
+                snake.reset()
+                episodes += 1
+            else:
+                assert list(snake.body) == sim.snake(i), f"第 {i} 个棋盘的蛇身不一致"
+            foods[i] = sim.food[i]
+    return episodes
+
+
+def python_steps_per_sec(board, steps):
+    """对照：单个 sanke.Snake 在 Python 里一步一步走"""
+    snake = sanke.Snake(board, board)
+    food = sanke.Food(snake)
+    directions = [sanke.UP, sanke.RIGHT, sanke.DOWN, sanke.LEFT]
+    start = time.perf_counter()
+    for _ in range(steps):
+        if random.random() < 0.2:
+            snake.change_direction(random.choice(directions))
+        snake.move()
+        if snake.check_collision():
+            snake.reset()
+            food.spawn(snake)
+        elif snake.body[0] == food.position:
+            snake.grow = True
+            if not food.spawn(snake):
+                snake.reset()
+                food.spawn(snake)
+    return steps / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--envs", type=int, nargs="+", default=[1, 64, 1024, 4096])
+    parser.add_argument("--steps", type=int, default=500)
+    parser.add_argument("--board", type=int, default=30)
+    args = parser.parse_args()
+
+    episodes = check_rules(args.board)
+    print(f"规则对照通过（{episodes} 局）")
+    print(f"{'python 1 env':>14}: {python_steps_per_sec(args.board, args.steps * 20):>12,.0f} steps/s")
+    for n in args.envs:
+        sim = snakeenv.SnakeEnvs(n, args.board, args.board, seed=0)
+        rng = np.random.default_rng(0)
+        actions = np.where(rng.random((args.steps, n)) < 0.2, rng.integers(0, 4, (args.steps, n)), -1)
+        start = time.perf_counter()
+        for step_actions in actions:
+            sim.step(step_actions)
+        elapsed = time.perf_counter() - start
+        print(f"{f'{n} envs':>14}: {n * args.steps / elapsed:>12,.0f} steps/s")
+
+
+if __name__ == "__main__":
+    main()
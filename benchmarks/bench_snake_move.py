@@ -0,0 +1,79 @@
+"""贪吃蛇每步移动 + 碰撞检测的耗时，检查它不随蛇身长度增长
+
+蛇身按蛇形排满棋盘上半部分，头朝下方的空白区域一直往下走。
+--legacy 同时测量原来的写法（list.insert(0) + head in body[1:]）作为对比。
+
+用法：python benchmarks/bench_snake_move.py [--board 1000] [--lengths 3 5000 50000 500000] [--legacy]
+"""
+import argparse
+import os
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "pythgames"))
+
+import sanke  # noqa: E402
+
+
+def serpentine(cols, length):
+    """从下往上逐行折返排列的蛇身，头在前，位于最下面一行的最左边"""
+    cells = []
+    y = (length + cols - 1) // cols - 1
+    while len(cells) < length:
+        xs = range(cols) if len(cells) // cols % 2 == 0 else range(cols - 1, -1, -1)
+        for x in xs:
+            cells.append((x, y))
+            if len(cells) == length:
+                break
+        y -= 1
+    return cells
+
+
+def time_ticks(snake, ticks):
+    start = time.perf_counter()
+    for _ in range(ticks):
+        snake.move()
+        if snake.check_collision():
+            raise AssertionError("基准测试中的蛇不应该撞到东西")
+    return (time.perf_counter() - start) / ticks
+
+
+def time_legacy_ticks(body, ticks):
+    start = time.perf_counter()
+    for _ in range(ticks):
+        head_x, head_y = body[0]
+        body.insert(0, (head_x, head_y + 1))
+        body.pop()
+        if body[0] in body[1:]:
+            raise AssertionError("基准测试中的蛇不应该撞到东西")
+    return (time.perf_counter() - start) / ticks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--board", type=int, default=1000, help="棋盘边长（格）")
+    parser.add_argument("--lengths", type=int, nargs="+", default=[3, 5000, 50000, 500000])
+    parser.add_argument("--ticks", type=int, default=200)
+    parser.add_argument("--legacy", action="store_true", help="同时测量原来基于 list 的实现")
+    args = parser.parse_args()
+
+    size = args.board
+    print(f"{size}x{size} 棋盘，每种长度走 {args.ticks} 步")
+    print(f"{'length':>10} {'us/tick':>10}" + (f" {'legacy us/tick':>15}" if args.legacy else ""))
+    for length in args.lengths:
+        cells = serpentine(size, length)
+        if cells[0][1] + args.ticks >= size:
+            raise SystemExit(f"长度 {length} 的蛇下方没有足够的空位走 {args.ticks} 步")
+        snake = sanke.Snake(size, size)
+        snake.set_body(cells)
+        snake.direction = sanke.DOWN
+        line = f"{length:>10} {time_ticks(snake, args.ticks) * 1e6:>10.2f}"
+        if args.legacy:
+            # 原来的写法每步都要复制并扫描整条蛇身，步数少一点
+            line += f" {time_legacy_ticks(list(cells), max(1, args.ticks // 20)) * 1e6:>15.2f}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
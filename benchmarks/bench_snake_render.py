@@ -0,0 +1,61 @@
+"""贪吃蛇每帧绘制耗时：整屏重画和脏矩形重画随蛇长的变化
+
+由自动驾驶来玩，蛇会越来越长；每步都计时脏矩形绘制，每隔几步再计时一次整屏重画作对照。
+
+用法：python benchmarks/bench_snake_render.py [--ticks 60000] [--full-every 10]
+"""
+import argparse
+import os
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "pythgames"))
+
+import sanke  # noqa: E402
+
+BUCKETS = (3, 50, 200, 400, 600, 800)
+
+
+def bucket(length):
+    for lower, upper in zip(BUCKETS, BUCKETS[1:] + (None,)):
+        if upper is None or length < upper:
+            return lower
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ticks", type=int, default=60000)
+    parser.add_argument("--full-every", type=int, default=10, help="每隔多少步测一次整屏重画")
+    args = parser.parse_args()
+
+    game = sanke.Game()
+    game.open()
+    game.toggle_autopilot()
+    game.draw()
+    dirty = {b: [] for b in BUCKETS}
+    full = {b: [] for b in BUCKETS}
+    for tick in range(args.ticks):
+        game.update()
+        if game.game_over:
+            break
+        b = bucket(len(game.snake.body))
+        start = time.perf_counter()
+        game.draw_dirty()
+        game.present()
+        dirty[b].append(time.perf_counter() - start)
+        if not tick % args.full_every:
+            start = time.perf_counter()
+            game.draw_full()
+            game.present()
+            full[b].append(time.perf_counter() - start)
+
+    print(f"{'length':>10} {'ticks':>7} {'dirty us':>10} {'full us':>10}")
+    for b in BUCKETS:
+        if dirty[b]:
+            print(f"{f'{b}+':>10} {len(dirty[b]):>7} {sum(dirty[b]) / len(dirty[b]) * 1e6:>10.1f} "
+                  f"{sum(full[b]) / max(len(full[b]), 1) * 1e6:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,14 @@
+"""打开游戏启动器（launcher.py）
+
+用法（在仓库根目录）：python pythgames    或    python -m pythgames
+游戏模块之间按模块名导入（import runtime），pythgames 不是包，所以先把这个目录加到 sys.path；
+python pythgames 运行时 Python 已经加过了，python -m pythgames 时还没有。
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import launcher  # noqa: E402
+
+launcher.main()
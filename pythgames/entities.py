@@ -0,0 +1,499 @@
+"""射击类游戏（shootit / massquare）共用的实体存储
+
+EntityPool 是普通模式用的对象池：Entity 用 __slots__，每个实体持有一个一直复用的 pygame.Rect，
+死掉的对象留在池子里等下次复用；配合预先分配好格子的 SpatialHash，热身之后每帧不再创建对象。
+画的时候也一样：blits 的参数列表预先建好、每帧原地改写，HUD 的文字用 Label 缓存渲染好的 Surface。
+
+EntityStore 是弹幕模式用的结构数组：同一种大小的实体（敌人、子弹……）的位置和速度分别放在
+连续的 NumPy 数组里，移动、出界剔除、和矩形的相交检测、两组实体之间的碰撞都是整批的向量运算，
+每帧的 Python 开销与实体数量无关。容量不够时自动翻倍，删除实体时原地压缩并保持顺序。
+EntityStore 需要 numpy，其余部分不需要。
+
+绘制时两种存储都用 draw(surface, image) 把同一张预先画好的 Surface（sprite() 缓存）
+一次 Surface.blits 批量画出去；DirtyRects 是可选的脏矩形模式，只把变化的区域交给 display.update()。
+draw() 和 rects() 的 alpha 参数用于固定时间步长下的画面插值（见 timestep.py）：alpha < 1 时
+实体按速度往回退 (1 - alpha) 个 tick，画在上一个 tick 和当前 tick 之间。
+
+用法：
+    bullets = EntityStore(10, 10)
+    bullets.spawn(5, x=(0, 790), y=600, vy=-10)   # 数值或 (下界, 上界) 均匀随机
+    bullets.move()
+    bullets.cull(0, 0, 800, 600)                   # 删除完全离开这个区域的实体
+"""
+from array import array
+from itertools import islice, repeat
+from operator import attrgetter
+
+import pygame
+
+try:
+    import numpy as np
+except ImportError:  # numpy 是可选依赖
+    np = None
+
+# 脏矩形超过这么多个时，整屏 flip 比逐个更新更快
+DIRTY_LIMIT = 400
+# SpatialHash 每个格子预先留的位置数，一般的局面里格子不需要再变长
+BUCKET_SIZE = 8
+
+_sprites = {}
+_blank = None
+_EMPTY_RECT = pygame.Rect(0, 0, 0, 0)  # display.update() 会跳过的空矩形
+_rect_of = attrgetter("rect")
+
+
+def sprite(color, width, height):
+    """纯色方块的 Surface，按 (颜色, 宽, 高) 缓存；需要先 set_mode()"""
+    key = (color, width, height)
+    image = _sprites.get(key)
+    if image is None:
+        image = pygame.Surface((width, height)).convert()
+        image.fill(color)
+        _sprites[key] = image
+    return image
+
+
+def _blank_blit():
+    """什么也不画的 blits 参数：0x0 的 Surface"""
+    global _blank
+    if _blank is None:
+        _blank = (pygame.Surface((0, 0)), pygame.Rect(0, 0, 0, 0))
+    return _blank
+
+
+class Entity:
+    """对象池里的一个实体，rect 在实体的整个生命周期（包括被复用）里都是同一个对象
+
+    view 是画这个实体的位置（rect 加上插值的偏移），blit 是交给 Surface.blits 的 (图像, view)，
+    都只建一次，画的时候原地改写 view。
+    """
+
+    __slots__ = ("rect", "alive", "view", "blit")
+
+    def __init__(self, width, height):
+        self.rect = pygame.Rect(0, 0, width, height)
+        self.alive = False
+        self.view = pygame.Rect(0, 0, width, height)
+        self.blit = None
+
+
+class EntityPool:
+    """预先分配好的 Entity 对象池，不需要 numpy
+
+    活着的实体是 items[:count]，按加入的顺序排列；把实体的 alive 设为 False 后调用 compact()，
+    死掉的对象会被换到后面留着复用。只有池子用完时才会创建新的 Entity。
+    velocity 是所有实体共同的每 tick 位移，只用于画面插值，移动实体仍由调用方负责。
+    """
+
+    def __init__(self, width, height, capacity=64, velocity=(0, 0)):
+        self.width = width
+        self.height = height
+        self.velocity = velocity
+        self.items = [Entity(width, height) for _ in range(capacity)]
+        self.count = 0
+        self._image = None  # 上一次 draw() 用的图像
+        self._blits = []    # draw() 交给 blits 的列表，前面是活着的实体，后面是空白的占位
+        self._drawn = 0     # 上一次 draw() 画了几个实体
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        return islice(self.items, self.count)
+
+    def add(self, x, y):
+        if self.count == len(self.items):
+            self.items.append(Entity(self.width, self.height))
+        entity = self.items[self.count]
+        entity.rect.x = x
+        entity.rect.y = y
+        entity.alive = True
+        self.count += 1
+        return entity
+
+    def clear(self):
+        self.count = 0
+
+    def offset(self, alpha=1.0):
+        """画面插值时实体相对 rect 的位移 (dx, dy)"""
+        if alpha == 1.0:
+            return 0, 0
+        return round(self.velocity[0] * (alpha - 1)), round(self.velocity[1] * (alpha - 1))
+
+    def rects(self, alpha=1.0):
+        if alpha == 1.0 or self.velocity == (0, 0):
+            return map(_rect_of, self)
+        dx, dy = self.offset(alpha)
+        w, h = self.width, self.height
+        return ((rect.x + dx, rect.y + dy, w, h) for rect in map(_rect_of, self))
+
+    def draw(self, surface, image, alpha=1.0):
+        """把所有实体画成 image，一次 blits 调用
+
+        blits 的参数列表和池子一样长，换图像或池子变大时才重新建；每帧只改写活着的实体的 view，
+        上一帧画过、这一帧死掉的位置换成空白的占位，不创建新的对象。
+        """
+        items, blits, count = self.items, self._blits, self.count
+        if image is not self._image or len(blits) != len(items):
+            self._image = image
+            for entity in items:
+                entity.blit = (image, entity.view)
+            blits[:] = [_blank_blit()] * len(items)
+            self._drawn = 0
+        dx, dy = self.offset(alpha)
+        for i in range(count):
+            entity = items[i]
+            view = entity.view
+            view.x = entity.rect.x + dx
+            view.y = entity.rect.y + dy
+            blits[i] = entity.blit
+        if self._drawn > count:
+            blank = _blank
+            for i in range(count, self._drawn):
+                blits[i] = blank
+        self._drawn = count
+        surface.blits(blits, doreturn=False)
+
+    def compact(self):
+        """删除 alive 为 False 的实体，其余实体保持原来的顺序"""
+        items = self.items
+        j = 0
+        for i in range(self.count):
+            entity = items[i]
+            if entity.alive:
+                if i != j:
+                    # items[j] 一定是死掉的实体，换到后面
+                    items[i] = items[j]
+                    items[j] = entity
+                j += 1
+        self.count = j
+
+    def state_bytes(self):
+        """所有实体的坐标打包成 bytes，用于录像回放时核对状态"""
+        return array("i", (v for rect in self.rects() for v in (rect.x, rect.y))).tobytes()
+
+
+class SpatialHash:
+    """均匀网格空间哈希，登记的是实体在 EntityPool 中的下标
+
+    格子按 width x height 的区域预先分配好（四周各多留一圈），区域外的实体算在最边上的格子里，
+    查询时还会做精确的矩形相交检测，所以不影响结果。每个格子的列表预先留好 bucket_size 个位置，
+    不够时才变长，而且不会清空，clear() 只把计数归零，所以每帧重新登记不会创建新对象。
+    """
+
+    def __init__(self, width, height, cell_size, bucket_size=BUCKET_SIZE):
+        self.cell_size = cell_size
+        self.cols = width // cell_size + 3
+        self.rows = height // cell_size + 3
+        self.buckets = [[0] * bucket_size for _ in range(self.cols * self.rows)]
+        self.sizes = [0] * (self.cols * self.rows)
+
+    def clear(self):
+        # 逐个归零；切片赋值 sizes[:] = zeros 会临时分配一块内存
+        sizes = self.sizes
+        for cell in range(len(sizes)):
+            sizes[cell] = 0
+
+    def _span(self, rect):
+        """rect 覆盖的格子范围 (起始列, 结束列, 起始行, 结束行)，都包含在内"""
+        cs, last_col, last_row = self.cell_size, self.cols - 1, self.rows - 1
+        left = rect.left // cs + 1
+        right = (rect.right - 1) // cs + 1
+        top = rect.top // cs + 1
+        bottom = (rect.bottom - 1) // cs + 1
+        return (0 if left < 0 else last_col if left > last_col else left,
+                0 if right < 0 else last_col if right > last_col else right,
+                0 if top < 0 else last_row if top > last_row else top,
+                0 if bottom < 0 else last_row if bottom > last_row else bottom)
+
+    def insert(self, index, rect):
+        buckets, sizes, cols = self.buckets, self.sizes, self.cols
+        left, right, top, bottom = self._span(rect)
+        for row in range(top, bottom + 1):
+            for cell in range(row * cols + left, row * cols + right + 1):
+                n = sizes[cell]
+                bucket = buckets[cell]
+                if n < len(bucket):
+                    bucket[n] = index
+                else:
+                    bucket.append(index)
+                sizes[cell] = n + 1
+
+    def first_hit(self, rect, items):
+        """与 rect 相交、alive 为 True 的已登记实体中下标最小的一个，没有时返回 -1"""
+        buckets, sizes, cols = self.buckets, self.sizes, self.cols
+        left, right, top, bottom = self._span(rect)
+        best = -1
+        for row in range(top, bottom + 1):
+            for cell in range(row * cols + left, row * cols + right + 1):
+                bucket = buckets[cell]
+                # 每个格子里的下标是按登记顺序递增的，找到一个或者超过 best 就可以停下
+                for k in range(sizes[cell]):
+                    index = bucket[k]
+                    if 0 <= best <= index:
+                        break
+                    entity = items[index]
+                    if entity.alive and rect.colliderect(entity.rect):
+                        best = index
+                        break
+        return best
+
+
+class EntityStore:
+    def __init__(self, width, height, capacity=256, seed=None):
+        if np is None:
+            raise ImportError("EntityStore 需要 numpy，请先运行：pip install numpy")
+        self.width = width
+        self.height = height
+        self.count = 0
+        self.rng = np.random.default_rng(seed)
+        self.x = np.zeros(capacity, dtype=np.float32)
+        self.y = np.zeros(capacity, dtype=np.float32)
+        self.vx = np.zeros(capacity, dtype=np.float32)
+        self.vy = np.zeros(capacity, dtype=np.float32)
+
+    def __len__(self):
+        return self.count
+
+    def _reserve(self, n):
+        """保证能再放下 n 个实体，容量至少翻倍，避免频繁复制"""
+        capacity = len(self.x)
+        if self.count + n <= capacity:
+            return
+        capacity = max(self.count + n, capacity * 2)
+        for name in ("x", "y", "vx", "vy"):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+
+    def add(self, x, y, vx=0.0, vy=0.0):
+        """添加实体，参数可以是数值或等长的数组"""
+        x, y, vx, vy = np.broadcast_arrays(x, y, vx, vy)
+        n = x.size
+        self._reserve(n)
+        end = self.count + n
+        self.x[self.count:end] = x.ravel()
+        self.y[self.count:end] = y.ravel()
+        self.vx[self.count:end] = vx.ravel()
+        self.vy[self.count:end] = vy.ravel()
+        self.count = end
+
+    def spawn(self, n, x, y, vx=0.0, vy=0.0):
+        """添加 n 个实体，参数是 (下界, 上界) 时在区间内均匀随机取值"""
+        def sample(value):
+            if isinstance(value, tuple):
+                return self.rng.uniform(value[0], value[1], n)
+            return np.full(n, value)
+        self.add(sample(x), sample(y), sample(vx), sample(vy))
+
+    def clear(self):
+        self.count = 0
+
+    def move(self, dt=1.0):
+        n = self.count
+        self.x[:n] += self.vx[:n] * dt
+        self.y[:n] += self.vy[:n] * dt
+
+    def compact(self, keep):
+        """只保留 keep 为 True 的实体（keep 的长度为 len(self)），保持原有顺序"""
+        index = np.flatnonzero(keep)
+        n = len(index)
+        if n == self.count:
+            return
+        for array in (self.x, self.y, self.vx, self.vy):
+            array[:n] = array[index]
+        self.count = n
+
+    def remove(self, mask):
+        self.compact(~mask)
+
+    def overlaps(self, x, y, w, h):
+        """每个实体是否与矩形 (x, y, w, h) 相交，规则与 pygame.Rect.colliderect 相同"""
+        n = self.count
+        ex, ey = self.x[:n], self.y[:n]
+        return (ex < x + w) & (x < ex + self.width) & (ey < y + h) & (y < ey + self.height)
+
+    def cull(self, left, top, right, bottom):
+        """删除完全离开矩形区域的实体，返回删除的个数"""
+        n = self.count
+        self.compact(self.overlaps(left, top, right - left, bottom - top))
+        return n - self.count
+
+    def collide(self, other):
+        """找出两组实体之间相交的配对，返回 (self 中被击中的掩码, other 中被击中的掩码)
+
+        先按格子把 other 排序，self 中的每个实体只和可能相交的 2x2 个格子里的实体比较。
+        每个实体最多配对一次：self 中的实体取相交的 other 中下标最小的一个，
+        other 中同一个实体被多个 self 实体取到时，只算下标最小的那个。
+        """
+        n, m = self.count, other.count
+        hit_self = np.zeros(n, dtype=bool)
+        hit_other = np.zeros(m, dtype=bool)
+        if not n or not m:
+            return hit_self, hit_other
+        # 格子边长不小于两种实体的尺寸之和，相交的 other 的左上角只可能落在 2x2 个格子里
+        cell = float(max(self.width + other.width, self.height + other.height))
+        ox, oy = other.x[:m], other.y[:m]
+        keys = _cell_keys(np.floor(ox / cell), np.floor(oy / cell))
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+
+        sx, sy = self.x[:n], self.y[:n]
+        cx = np.floor((sx - other.width) / cell)
+        cy = np.floor((sy - other.height) / cell)
+        near = np.stack([_cell_keys(cx + dx, cy + dy) for dx in (0, 1) for dy in (0, 1)], axis=1)
+        starts = np.searchsorted(sorted_keys, near, "left").ravel()
+        counts = np.searchsorted(sorted_keys, near, "right").ravel() - starts
+        total = int(counts.sum())
+        if not total:
+            return hit_self, hit_other
+        # 把每个 (实体, 格子) 展开成格子里的所有候选配对
+        first = np.repeat(np.arange(n).repeat(4), counts)
+        offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        second = order[np.repeat(starts, counts) + offsets]
+        touching = (
+            (sx[first] < ox[second] + other.width) & (ox[second] < sx[first] + self.width)
+            & (sy[first] < oy[second] + other.height) & (oy[second] < sy[first] + self.height)
+        )
+        first, second = first[touching], second[touching]
+        if not len(first):
+            return hit_self, hit_other
+        # 每个 self 实体取下标最小的 other，再让每个 other 只配给下标最小的 self 实体
+        pairs = np.lexsort((second, first))
+        first, second = first[pairs], second[pairs]
+        _, chosen = np.unique(first, return_index=True)
+        first, second = first[chosen], second[chosen]
+        _, chosen = np.unique(second, return_index=True)
+        hit_self[first[chosen]] = True
+        hit_other[second[chosen]] = True
+        return hit_self, hit_other
+
+    def state_bytes(self):
+        """所有实体的位置和速度打包成 bytes，用于录像回放时核对状态"""
+        n = self.count
+        return b"".join(array[:n].tobytes() for array in (self.x, self.y, self.vx, self.vy))
+
+    def positions(self, alpha=1.0):
+        """所有实体的整数坐标 (x, y)，用于绘制"""
+        n = self.count
+        x, y = self.x[:n], self.y[:n]
+        if alpha != 1.0:
+            x = x + self.vx[:n] * (alpha - 1)
+            y = y + self.vy[:n] * (alpha - 1)
+        return zip(x.astype(np.int32).tolist(), y.astype(np.int32).tolist())
+
+    def rects(self, alpha=1.0):
+        return ((x, y, self.width, self.height) for x, y in self.positions(alpha))
+
+    def draw(self, surface, image, alpha=1.0):
+        """把所有实体画成 image，一次 blits 调用"""
+        surface.blits(zip(repeat(image), self.positions(alpha)), doreturn=False)
+
+
+class Label:
+    """HUD 上的一行文字：渲染好的 Surface 缓存起来，显示的值变了才重新 render()
+
+    text 是固定的字符串，或者把值变成字符串的函数（比如 "Score: {}".format）。
+    draw() 每帧调用，值没变时只是一次 blits，返回的 rect 一直是同一个对象。
+    """
+
+    def __init__(self, font, color, x, y, text):
+        self.font = font
+        self.color = color
+        self.text = text
+        self.rect = pygame.Rect(x, y, 0, 0)
+        self._value = None
+        self._blit = None  # ((Surface, rect),)
+
+    def draw(self, surface, value=None):
+        if self._blit is None or value != self._value:
+            self._value = value
+            text = self.text(value) if callable(self.text) else self.text
+            image = self.font.render(text, True, self.color)
+            self.rect.size = image.get_size()
+            self._blit = ((image, self.rect),)
+        surface.blits(self._blit, doreturn=False)
+        return self.rect
+
+
+class DirtyRects:
+    """脏矩形模式：每帧把这一帧和上一帧画过的矩形交给 display.update()，代替整屏 flip()
+
+    画面仍然每帧整屏重画，只是提交给窗口的区域变小了。矩形太多、或者调用了 invalidate()
+    （切换到结算画面等）时改为整屏 flip()，下一帧也会整屏更新，因为上一帧的矩形没有记全。
+    记录用的 Rect 预先分配好 limit 个，这一帧和上一帧各一组，present() 时交换；交给 display.update()
+    的列表也一直是同一个，只会变长，多出来的位置填空矩形，所以每帧记录和提交都不创建新对象。
+    """
+
+    def __init__(self, limit=DIRTY_LIMIT):
+        self.limit = limit
+        self.previous = [pygame.Rect(0, 0, 0, 0) for _ in range(limit)]
+        self.current = [pygame.Rect(0, 0, 0, 0) for _ in range(limit)]
+        self.previous_count = 0  # previous / current 里前多少个是有效的
+        self.current_count = 0
+        self.full = True       # 这一帧必须整屏更新
+        self.overflow = False  # 这一帧的矩形太多，没有记录
+        self._rects = []       # 交给 display.update() 的列表
+        self._filled = 0       # _rects 里上一次填了多少个矩形
+
+    def add(self, rect):
+        if self.overflow:
+            return
+        n = self.current_count
+        if n == self.limit:
+            self.overflow = True
+            return
+        self.current[n].update(rect)
+        self.current_count = n + 1
+
+    def extend(self, entities, alpha=1.0):
+        """记录 EntityPool / EntityStore 中所有实体的矩形，alpha 与画实体时用的相同"""
+        if self.overflow or self.current_count + len(entities) > self.limit:
+            self.overflow = True
+            return
+        current, n = self.current, self.current_count
+        if isinstance(entities, EntityPool):
+            # 对象池直接复制每个实体的 rect 再挪到插值的位置，不经过 rects() 生成元组
+            dx, dy = entities.offset(alpha)
+            items = entities.items
+            for i in range(entities.count):
+                rect = current[n]
+                rect.update(items[i].rect)
+                rect.move_ip(dx, dy)
+                n += 1
+        else:
+            for rect in entities.rects(alpha):
+                current[n].update(rect)
+                n += 1
+        self.current_count = n
+
+    def invalidate(self):
+        self.full = True
+
+    def present(self):
+        if self.full or self.overflow:
+            pygame.display.flip()
+        else:
+            rects, previous, current = self._rects, self.previous, self.current
+            n = self.previous_count + self.current_count
+            while len(rects) < n:
+                rects.append(_EMPTY_RECT)
+            for i in range(self.previous_count):
+                rects[i] = previous[i]
+            offset = self.previous_count
+            for i in range(self.current_count):
+                rects[offset + i] = current[i]
+            for i in range(n, self._filled):
+                rects[i] = _EMPTY_RECT
+            self._filled = n
+            pygame.display.update(rects)
+        self.full = self.overflow
+        self.previous, self.current = self.current, self.previous
+        self.previous_count, self.current_count = self.current_count, 0
+        self.overflow = False
+
+
+def _cell_keys(cx, cy):
+    # 格子坐标编码成一个整数，坐标范围 ±2^20 个格子
+    return (cy.astype(np.int64) + (1 << 20)) * (1 << 21) + (cx.astype(np.int64) + (1 << 20))
@@ -0,0 +1,127 @@
+"""四个游戏的启动器：只初始化一次 pygame、窗口和字体，游戏作为场景在同一个窗口里切换
+
+启动时创建全部四个游戏并各 open() 一次，字体、预先画好的图像都在这时建好；之后切换场景只是
+调用对方的 open()（取缓存的窗口和字体、重置计时），不重新 set_mode()，远小于一帧的时间。
+游戏对象一直保留，离开再回来时一局还在原处：贪吃蛇的最高分、当前的迷宫都不会丢，
+射击游戏离开期间暂停。
+
+菜单里按 1-4 进入游戏，游戏里按 ESC 回到菜单，菜单里按 ESC 或关闭窗口退出。
+
+用法（在仓库根目录）：python pythgames    或    python -m pythgames    或    python pythgames/launcher.py
+"""
+import time
+
+import pygame
+
+import massquare
+import maze
+import runtime
+import sanke
+import shootit
+
+WIDTH, HEIGHT = 800, 600  # 所有游戏里最大的窗口
+FPS = 60
+CAPTION = "Pygame 小游戏合集"
+COLOR_BG = (30, 30, 30)
+COLOR_TEXT = (255, 255, 255)
+COLOR_DIM = (160, 160, 160)
+
+# (名称, 菜单里的说明, 创建游戏, 菜单里显示的状态)
+GAMES = [
+    ("shootit", f"Shoot It - shoot the red squares for {shootit.WIN_TIME} s", shootit.Game,
+     lambda game: f"{game.state.lower()}, score {game.score}"),
+    ("massquare", f"Mass Square - dodge the red squares for {massquare.WIN_TIME} s", massquare.Game,
+     lambda game: f"{game.state.lower()}, {game.elapsed_seconds:.1f}s"),
+    ("sanke", "Snake - P toggles the autopilot", sanke.Game,
+     lambda game: f"score {game.score}, high score {game.high_score}"),
+    ("maze", "Maze - generate and solve", maze.Game,
+     lambda game: f"{game.cols}x{game.rows}, {game.algorithms[game.algorithm_index]}"),
+]
+
+
+class Menu:
+    """选择游戏的场景，接口和游戏相同：open() / frame()"""
+
+    def __init__(self, launcher):
+        self.launcher = launcher
+        self.choice = None  # 选中的游戏名，None 表示退出
+
+    def open(self):
+        rt = runtime.get()
+        self.screen = rt.display((WIDTH, HEIGHT), CAPTION)
+        self.clock = rt.clock
+        self.font = rt.font("arial", 36)
+        self.small_font = rt.font("arial", 24)
+        self.choice = None
+
+    def frame(self):
+        self.clock.tick(FPS)
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                return False
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:
+                    return False
+                index = event.key - pygame.K_1
+                if 0 <= index < len(GAMES):
+                    self.choice = GAMES[index][0]
+                    return False
+
+        screen = self.screen
+        screen.fill(COLOR_BG)
+        screen.blit(self.font.render("Choose a game", True, COLOR_TEXT), (60, 50))
+        for i, (name, title, _, status) in enumerate(GAMES):
+            y = 130 + i * 90
+            screen.blit(self.font.render(f"{i + 1}  {title}", True, COLOR_TEXT), (60, y))
+            screen.blit(self.small_font.render(status(self.launcher.games[name]), True, COLOR_DIM), (100, y + 40))
+        footer = "ESC in a game returns here, ESC here quits"
+        if self.launcher.switch_time is not None:
+            footer += f"  |  last switch {self.launcher.switch_time * 1e3:.2f} ms"
+        screen.blit(self.small_font.render(footer, True, COLOR_DIM), (60, HEIGHT - 50))
+        pygame.display.flip()
+        return True
+
+
+class Launcher:
+    def __init__(self):
+        rt = runtime.get()
+        rt.fixed = True
+        self.screen = rt.display((WIDTH, HEIGHT), CAPTION)
+        self.switch_time = None  # 上一次切换场景的耗时（秒）
+        self.menu = Menu(self)
+        # 提前创建全部游戏并 open() 一次，字体和图像都在这里建好
+        self.games = {}
+        for name, _, create, _ in GAMES:
+            game = self.games[name] = create()
+            game.open()
+        self.menu.open()
+
+    def run(self):
+        scene = self.menu
+        while scene is not None:
+            start = time.perf_counter()
+            self.screen.fill(COLOR_BG)  # 比窗口小的游戏不会画满整个窗口
+            scene.open()
+            self.switch_time = time.perf_counter() - start
+            while True:
+                if pygame.event.peek(pygame.QUIT):  # 关闭窗口时直接退出，不回菜单
+                    scene = None
+                    break
+                if not scene.frame():
+                    # 游戏结束（ESC）回到菜单；菜单结束时进入选中的游戏，没选中就退出
+                    if scene is self.menu:
+                        scene = self.games.get(self.menu.choice)
+                    else:
+                        scene = self.menu
+                    break
+        for game in self.games.values():
+            game.close()
+        runtime.shutdown()
+
+
+def main():
+    Launcher().run()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,17 @@
+import math
 import pygame
 import random
-from collections import deque
+import time
+from array import array
+from collections import OrderedDict, deque
+
+import mazefile
+import mazegen
+import mazesolve
+import profiler
+import replay
+import runtime
+from mazegrid import WALL_TOP, WALL_RIGHT, WALL_BOTTOM, WALL_LEFT, WALL_BITS, new_walls
 
 # --- 配置常量 ---
 WIDTH, HEIGHT = 800, 600
@@ -8,18 +19,114 @@ CELL_SIZE = 40
 COLS = WIDTH // CELL_SIZE
 ROWS = HEIGHT // CELL_SIZE
 FPS = 60
+CAPTION = "Pygame 迷宫生成与求解演示"
 
 # 颜色定义
 COLOR_BG = (30, 30, 30)
 COLOR_WALL = (200, 200, 200)
 COLOR_PATH = (100, 255, 100)      # 最终路径颜色
 COLOR_VISITED = (50, 100, 200)    # 搜索过程中的访问颜色
+COLOR_FRONTIER = (255, 200, 50)   # 本帧新展开的格子（搜索前沿）
 COLOR_START = (255, 50, 50)
 COLOR_END = (50, 50, 255)
 COLOR_TEXT = (255, 255, 255)
 
-# 墙壁方向索引：0:上，1:右，2:下，3:左
-WALL_TOP, WALL_RIGHT, WALL_BOTTOM, WALL_LEFT = 0, 1, 2, 3
+# 视口和分块渲染
+ZOOM_LEVELS = (4, 8, 12, 20, 40)  # 可选的格子像素大小，从小到大
+CHUNK_CELLS = 16                  # 每个分块的边长（格子数）
+CHUNK_CACHE_SIZE = 256            # 最多缓存多少个分块图层，要大于一屏能看到的分块数
+SCROLL_SPEED = 800                # 方向键平移速度（像素/秒）
+
+# 格子标记位：搜索访问过、在最终路径上
+MARK_VISITED = 1
+MARK_PATH = 2
+_CLEAR_VISITED = bytes(b & ~MARK_VISITED for b in range(256))
+_CLEAR_PATH = bytes(b & ~MARK_PATH for b in range(256))
+
+
+def draw_walls(surface, x, y, walls, size=CELL_SIZE, width=2):
+    """绘制一个格子的墙壁，walls 可以是布尔列表或 4 位掩码"""
+    if isinstance(walls, int):
+        walls = [walls & bit for bit in WALL_BITS]
+    if walls[WALL_TOP]:
+        pygame.draw.line(surface, COLOR_WALL, (x, y), (x + size, y), width)
+    if walls[WALL_RIGHT]:
+        pygame.draw.line(surface, COLOR_WALL, (x + size, y), (x + size, y + size), width)
+    if walls[WALL_BOTTOM]:
+        pygame.draw.line(surface, COLOR_WALL, (x, y + size), (x + size, y + size), width)
+    if walls[WALL_LEFT]:
+        pygame.draw.line(surface, COLOR_WALL, (x, y), (x, y + size), width)
+
+
+def wall_width(cell_size):
+    """缩小后墙壁改用 1 像素，避免把通道盖住"""
+    return 2 if cell_size >= 16 else 1
+
+
+_tile_cache = {}
+
+def wall_tiles(cell_size):
+    """16 种掩码各自对应的格子贴图，只画上墙和左墙
+
+    相邻格子共用同一面墙，右墙和下墙由右边、下边的格子画，所以整块分块可以用
+    Surface.blits 一次贴完；迷宫最右列和最下行的外墙单独补画。
+    """
+    tiles = _tile_cache.get(cell_size)
+    if tiles is None:
+        tiles = []
+        for mask in range(16):
+            tile = pygame.Surface((cell_size, cell_size))
+            tile.fill(COLOR_BG)
+            width = wall_width(cell_size)
+            draw_walls(tile, 0, 0, mask & (WALL_BITS[WALL_TOP] | WALL_BITS[WALL_LEFT]), cell_size, width)
+            # 左上角的墙角：完美迷宫里每个墙角都至少连着一面墙，邻居的墙端点会落在这里
+            tile.fill(COLOR_WALL, (0, 0, width, width))
+            tiles.append(tile)
+        _tile_cache[cell_size] = tiles
+    return tiles
+
+
+class Camera:
+    """视口摄像机：(x, y) 是屏幕左上角对应的迷宫像素坐标，cell_size 是当前缩放下的格子边长"""
+
+    def __init__(self, width=WIDTH, height=HEIGHT, cell_size=CELL_SIZE):
+        self.width = width
+        self.height = height
+        self.cell_size = cell_size
+        self.x = 0.0
+        self.y = 0.0
+
+    def move(self, dx, dy):
+        self.x += dx
+        self.y += dy
+
+    def zoom(self, step, anchor=None):
+        """在 ZOOM_LEVELS 中放大（step > 0）或缩小，anchor 处的迷宫位置在缩放前后保持不动"""
+        levels = ZOOM_LEVELS
+        index = levels.index(self.cell_size) if self.cell_size in levels else len(levels) - 1
+        cell_size = levels[max(0, min(index + step, len(levels) - 1))]
+        ax, ay = anchor if anchor is not None else (self.width / 2, self.height / 2)
+        scale = cell_size / self.cell_size
+        self.x = (self.x + ax) * scale - ax
+        self.y = (self.y + ay) * scale - ay
+        self.cell_size = cell_size
+
+    def clamp(self, cols, rows):
+        """不让视口移出迷宫，迷宫比屏幕小时停在左上角"""
+        self.x = max(0.0, min(self.x, cols * self.cell_size + 2 - self.width))
+        self.y = max(0.0, min(self.y, rows * self.cell_size + 2 - self.height))
+
+    def screen_to_cell(self, pos):
+        """屏幕坐标 -> 格子坐标（可能落在迷宫外）"""
+        return (int((pos[0] + self.x) // self.cell_size), int((pos[1] + self.y) // self.cell_size))
+
+# BFS 的四个移动方向及对应的墙壁：0:上，1:右，2:下，3:左
+MOVES = (
+    ((0, -1), WALL_TOP),
+    ((1, 0), WALL_RIGHT),
+    ((0, 1), WALL_BOTTOM),
+    ((-1, 0), WALL_LEFT),
+)
 
 class Cell:
     def __init__(self, x, y):
@@ -34,45 +141,87 @@ class Cell:
         y = self.y * CELL_SIZE
         
         # 绘制墙壁
-        if self.walls[WALL_TOP]:
-            pygame.draw.line(surface, COLOR_WALL, (x, y), (x + CELL_SIZE, y), 2)
-        if self.walls[WALL_RIGHT]:
-            pygame.draw.line(surface, COLOR_WALL, (x + CELL_SIZE, y), (x + CELL_SIZE, y + CELL_SIZE), 2)
-        if self.walls[WALL_BOTTOM]:
-            pygame.draw.line(surface, COLOR_WALL, (x, y + CELL_SIZE), (x + CELL_SIZE, y + CELL_SIZE), 2)
-        if self.walls[WALL_LEFT]:
-            pygame.draw.line(surface, COLOR_WALL, (x, y), (x, y + CELL_SIZE), 2)
-
-        # 绘制起点和终点背景
-        if (self.x, self.y) == (0, 0):
-            pygame.draw.rect(surface, COLOR_START, (x + 5, y + 5, CELL_SIZE - 10, CELL_SIZE - 10))
-        if (self.x, self.y) == (COLS - 1, ROWS - 1):
-            pygame.draw.rect(surface, COLOR_END, (x + 5, y + 5, CELL_SIZE - 10, CELL_SIZE - 10))
-
-    def check_neighbors(self, grid):
+        draw_walls(surface, x, y, self.walls)
+
+    def check_neighbors(self, grid, rng=random):
         neighbors = []
+        rows, cols = len(grid), len(grid[0])
         # 上、右、下、左
         directions = [(0, -1), (1, 0), (0, 1), (-1, 0)]
         
         for dx, dy in directions:
             nx, ny = self.x + dx, self.y + dy
-            if 0 <= nx < COLS and 0 <= ny < ROWS:
+            if 0 <= nx < cols and 0 <= ny < rows:
                 if not grid[ny][nx].visited:
                     neighbors.append((nx, ny))
         
         if neighbors:
-            return random.choice(neighbors)
+            return rng.choice(neighbors)
         return None
 
 class Maze:
-    def __init__(self):
-        self.grid = [[Cell(x, y) for x in range(COLS)] for y in range(ROWS)]
-        self.generate()
+    # 可选的生成算法，由 mazegen 提供，默认为 DFS + 回溯
+    ALGORITHMS = tuple(mazegen.GENERATORS)
+
+    def __init__(self, cols=COLS, rows=ROWS, compact=False, walls=None, algorithm="dfs", seed=None,
+                 generate=True):
+        if algorithm not in self.ALGORITHMS:
+            raise ValueError(f"未知的生成算法：{algorithm!r}，可选 {', '.join(self.ALGORITHMS)}")
+        self.cols = cols
+        self.rows = rows
+        self.algorithm = algorithm
+        # 给定 seed 时使用独立的随机数发生器，同一个 seed 总是生成同一张迷宫
+        self.rng = random.Random(seed) if seed is not None else random
+        # 紧凑模式：不创建 Cell 对象，墙壁存放在一维 bytearray 中（每格一个 4 位掩码），
+        # 适合百万级以上的格子数
+        # 传入 walls（现成的掩码数组，例如 mazegen 生成或从文件读取）时直接使用，不再生成
+        self.compact = compact or walls is not None
+        if self.compact:
+            self.grid = None
+            self.walls = walls if walls is not None else new_walls(cols, rows)
+        else:
+            self.grid = [[Cell(x, y) for x in range(cols)] for y in range(rows)]
+        self._field = None  # 缓存的距离场：(终点下标, dist, next_hop)
+        self.invalidate_layers()
         self.solution_path = []
-        self.searched_cells = [] # 用于动画展示搜索过程
+        self.searched_cells = [] # 用于动画展示搜索过程（紧凑模式下为一维下标数组）
+        self.file = None  # Maze.load() 在 mmap 上读取墙壁时打开的 mazefile.MazeFile
+        # generate=False 时只建立四面都是墙的网格，之后可以用 generate_steps() 分段生成
+        if walls is None and generate:
+            self.generate()
         
     def generate(self):
-        """使用 DFS + 回溯算法生成迷宫"""
+        """按 self.algorithm 生成迷宫，默认使用 DFS + 回溯算法"""
+        for _ in self.generate_steps():
+            pass
+
+    def generate_steps(self):
+        """generate() 的逐步版本，每打通一面墙（eller 为每生成一行）yield 一次格子下标"""
+        self.invalidate_layers()
+        self._field = None
+        if self.compact:
+            self.walls = new_walls(self.cols, self.rows)
+            if self.algorithm == "dfs":
+                for n in mazegen.dfs_steps(self.walls, self.cols, self.rows, self.rng):
+                    self._touch_cell(n)
+                    yield n
+                return
+        if self.algorithm == "eller":
+            for y, row in enumerate(mazegen.eller_rows(self.cols, self.rows, self.rng)):
+                self._load_row(y, row)
+                self._touch_row(y)
+                yield y * self.cols
+            return
+        if self.algorithm != "dfs":
+            # 向量化的算法本身很快，一次完成
+            self._load_walls(mazegen.GENERATORS[self.algorithm](self.cols, self.rows, self.rng))
+            self.invalidate_layers()
+            return
+
+        for row in self.grid:
+            for cell in row:
+                cell.walls = [True, True, True, True]
+
         stack = []
         start_cell = self.grid[0][0]
         start_cell.visited = True
@@ -80,7 +229,7 @@ class Maze:
         
         while stack:
             current = stack[-1]
-            neighbor_pos = current.check_neighbors(self.grid)
+            neighbor_pos = current.check_neighbors(self.grid, self.rng)
             
             if neighbor_pos:
                 nx, ny = neighbor_pos
@@ -103,6 +252,8 @@ class Maze:
                 
                 next_cell.visited = True
                 stack.append(next_cell)
+                self._touch_cell(ny * self.cols + nx)
+                yield ny * self.cols + nx
             else:
                 stack.pop()
                 
@@ -111,10 +262,63 @@ class Maze:
             for cell in row:
                 cell.visited = False
 
+    def _load_walls(self, walls):
+        """用一维掩码数组覆盖当前的墙壁"""
+        if self.compact:
+            self.walls = walls
+            return
+        for y in range(self.rows):
+            self._load_row(y, walls[y * self.cols:(y + 1) * self.cols])
+
+    def _load_row(self, y, row):
+        """用一行掩码覆盖第 y 行的墙壁"""
+        if self.compact:
+            self.walls[y * self.cols:(y + 1) * self.cols] = row
+            return
+        for cell, mask in zip(self.grid[y], row):
+            cell.walls = [bool(mask & bit) for bit in WALL_BITS]
+
+    def save(self, path, with_solution=True):
+        """保存到迷宫文件（格式见 mazefile），可以顺带缓存当前的求解路径"""
+        solution = None
+        if with_solution:
+            solution = [y * self.cols + x for x, y in self.solution_path]
+        mazefile.save(path, self.wall_masks(), self.cols, self.rows, solution)
+
+    @classmethod
+    def load(cls, path, in_memory=False):
+        """从迷宫文件加载；默认直接在 mmap 上读取墙壁，in_memory=True 时整体解码到内存"""
+        f = mazefile.load(path)
+        solution = list(f.solution) if f.solution is not None else []
+        if in_memory:
+            walls = f.walls.unpack()
+            f.close()
+        else:
+            walls = f.walls
+        maze = cls(f.cols, f.rows, walls=walls)
+        if not in_memory:
+            maze.file = f  # mmap 模式下保持文件映射，随迷宫对象一起释放
+        maze.solution_path = [(i % f.cols, i // f.cols) for i in solution]
+        return maze
+
+    def wall_mask(self, x, y):
+        """返回格子 (x, y) 的 4 位墙壁掩码，两种模式通用"""
+        if self.compact:
+            return self.walls[y * self.cols + x]
+        mask = 0
+        for d, wall in enumerate(self.grid[y][x].walls):
+            if wall:
+                mask |= WALL_BITS[d]
+        return mask
+
     def solve_bfs(self):
         """使用 BFS 寻找最短路径"""
+        if self.compact:
+            self.solve("bfs")
+            return
+
         start = (0, 0)
-        end = (COLS - 1, ROWS - 1)
+        end = (self.cols - 1, self.rows - 1)
         
         queue = deque([start])
         visited = {start}
@@ -135,18 +339,10 @@ class Maze:
             current_cell = self.grid[y][x]
             
             # 检查四个方向，注意要检查墙壁
-            # 0:上，1:右，2:下，3:左
-            moves = [
-                ((0, -1), WALL_TOP),
-                ((1, 0), WALL_RIGHT),
-                ((0, 1), WALL_BOTTOM),
-                ((-1, 0), WALL_LEFT)
-            ]
-            
-            for (dx, dy), wall_idx in moves:
+            for (dx, dy), wall_idx in MOVES:
                 if not current_cell.walls[wall_idx]:
                     nx, ny = x + dx, y + dy
-                    if 0 <= nx < COLS and 0 <= ny < ROWS and (nx, ny) not in visited:
+                    if 0 <= nx < self.cols and 0 <= ny < self.rows and (nx, ny) not in visited:
                         visited.add((nx, ny))
                         parent[(nx, ny)] = current
                         queue.append((nx, ny))
@@ -162,94 +358,584 @@ class Maze:
         else:
             self.solution_path = []
 
-    def draw(self, surface, solve_step=-1):
-        for row in self.grid:
-            for cell in row:
-                cell.draw(surface)
-        
-        # 绘制搜索过程 (动画)
-        if 0 <= solve_step < len(self.searched_cells):
-            for i in range(solve_step + 1):
-                x, y = self.searched_cells[i]
-                rect = pygame.Rect(x * CELL_SIZE + 5, y * CELL_SIZE + 5, CELL_SIZE - 10, CELL_SIZE - 10)
-                pygame.draw.rect(surface, COLOR_VISITED, rect)
-
-        # 绘制最终路径
-        if self.solution_path:
-            for x, y in self.solution_path:
-                rect = pygame.Rect(x * CELL_SIZE + 10, y * CELL_SIZE + 10, CELL_SIZE - 20, CELL_SIZE - 20)
-                pygame.draw.rect(surface, COLOR_PATH, rect)
+    def wall_masks(self):
+        """返回整张迷宫按行展开的墙壁掩码数组，紧凑模式下直接返回内部缓冲区"""
+        if self.compact:
+            return self.walls
+        return bytearray(self.wall_mask(x, y) for y in range(self.rows) for x in range(self.cols))
+
+    def solve(self, solver="bfs", start=(0, 0), goal=None, dead_end_fill=False):
+        """用指定的求解器从 start 求解到 goal（默认右下角），返回 mazesolve.SolveResult"""
+        begin = time.perf_counter()
+        result = mazesolve.run(self.solve_steps(solver, start, goal, dead_end_fill))
+        result.elapsed = time.perf_counter() - begin
+        return result
+
+    def solve_steps(self, solver="bfs", start=(0, 0), goal=None, dead_end_fill=False):
+        """solve() 的逐步版本：每展开一个格子 yield 一次，searched_cells 实时增长
+
+        结束时返回 SolveResult，其中的耗时由调用方负责统计。
+        """
+        if goal is None:
+            goal = (self.cols - 1, self.rows - 1)
+        cols = self.cols
+        steps = mazesolve.solve_steps(self.wall_masks(), cols, self.rows,
+                                      start[1] * cols + start[0], goal[1] * cols + goal[0],
+                                      solver=solver, dead_end_fill=dead_end_fill)
+        return self._track_search(steps)
+
+    def _track_search(self, steps):
+        cols = self.cols
+        self.solution_path = []
+        searched = self.searched_cells = array('i') if self.compact else []
+        while True:
+            try:
+                i = next(steps)
+            except StopIteration as stop:
+                result = stop.value
+                break
+            if i != mazesolve.NO_CELL:
+                searched.append(i if self.compact else (i % cols, i // cols))
+            yield i
+        path = []
+        for i in result.path:
+            path.append((i % cols, i // cols))
+            if not len(path) % mazesolve.YIELD_EVERY:
+                yield mazesolve.NO_CELL
+        self.solution_path = path
+        return result
+
+    def distance_field(self, goal=None):
+        """返回到 goal（默认右下角）的距离场 (dist, next_hop)，只在第一次调用时计算"""
+        return mazesolve.run(self.distance_field_steps(goal))
+
+    def distance_field_steps(self, goal=None):
+        """distance_field() 的逐步版本；已经缓存时不会 yield，直接返回结果"""
+        if goal is None:
+            goal = (self.cols - 1, self.rows - 1)
+        g = goal[1] * self.cols + goal[0]
+        if self._field is None or self._field[0] != g:
+            dist, next_hop = yield from mazesolve.distance_field_steps(
+                self.wall_masks(), self.cols, self.rows, g)
+            self._field = (g, dist, next_hop)
+        return self._field[1], self._field[2]
+
+    def has_distance_field(self, goal=None):
+        """到 goal 的距离场是否已经缓存"""
+        if goal is None:
+            goal = (self.cols - 1, self.rows - 1)
+        return self._field is not None and self._field[0] == goal[1] * self.cols + goal[0]
+
+    def distance_to_goal(self, start, goal=None):
+        """start 到 goal 的步数，走不到时为 -1"""
+        dist, _ = self.distance_field(goal)
+        return dist[start[1] * self.cols + start[0]]
+
+    def route_from(self, start, goal=None):
+        """利用缓存的距离场得到 start 到 goal 的路径，代价只与路径长度有关"""
+        if goal is None:
+            goal = (self.cols - 1, self.rows - 1)
+        cols = self.cols
+        _, next_hop = self.distance_field(goal)
+        path = mazesolve.follow(next_hop, start[1] * cols + start[0], goal[1] * cols + goal[0])
+        return [(i % cols, i // cols) for i in path]
+
+    def invalidate_layers(self):
+        """丢弃所有缓存的分块图层和格子标记，墙壁整体改变后调用"""
+        self._chunks = OrderedDict()  # (分块 x, 分块 y) -> Surface，按最近使用排序
+        self._chunk_cell_size = None  # 缓存的分块对应的格子像素大小
+        self._marks = None            # 每格一个字节的 MARK_* 标记，第一次绘制时创建
+        self._visited_src = None
+        self._visited_step = 0
+        self._path_src = None
+
+    def _touch_cell(self, i):
+        """格子 i 和它的邻居的墙壁变了，丢弃包含它们的缓存分块"""
+        if self._chunks:
+            x, y = i % self.cols, i // self.cols
+            for nx, ny in ((x, y), (x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+                self._chunks.pop((nx // CHUNK_CELLS, ny // CHUNK_CELLS), None)
+
+    def _touch_row(self, y):
+        """第 y 行整行的墙壁变了"""
+        cy = y // CHUNK_CELLS
+        for key in [key for key in self._chunks if key[1] == cy]:
+            del self._chunks[key]
+
+    def _cell_index(self, cell):
+        if self.compact:
+            return cell
+        return cell[1] * self.cols + cell[0]
+
+    def _chunk(self, cx, cy):
+        """取出一个分块图层，没有缓存时渲染，超出容量时丢弃最久没用过的分块"""
+        key = (cx, cy)
+        layer = self._chunks.get(key)
+        if layer is None:
+            layer = self._chunks[key] = self._render_chunk(cx, cy)
+            if len(self._chunks) > CHUNK_CACHE_SIZE:
+                self._chunks.popitem(last=False)
+        else:
+            self._chunks.move_to_end(key)
+        return layer
+
+    def _render_chunk(self, cx, cy):
+        """把一个分块的墙壁、起点/终点和已有的标记画到新图层上"""
+        cs = self._chunk_cell_size
+        x0, y0 = cx * CHUNK_CELLS, cy * CHUNK_CELLS
+        x1, y1 = min(x0 + CHUNK_CELLS, self.cols), min(y0 + CHUNK_CELLS, self.rows)
+        # 最右列、最下行的分块多留 2 像素给外墙
+        width = (x1 - x0) * cs + (2 if x1 == self.cols else 0)
+        height = (y1 - y0) * cs + (2 if y1 == self.rows else 0)
+        layer = pygame.Surface((width, height))
+        layer.fill(COLOR_BG)
+
+        tiles = wall_tiles(cs)
+        walls = self.walls if self.compact else None
+        blits = []
+        for y in range(y0, y1):
+            py = (y - y0) * cs
+            if walls is not None:
+                base = y * self.cols
+                # bytearray 和 Maze.load() 的 mmap 墙壁（mazefile.PackedWalls）都能按行切片
+                masks = walls[base + x0:base + x1]
+            else:
+                masks = [self.wall_mask(x, y) for x in range(x0, x1)]
+            for x, mask in enumerate(masks):
+                blits.append((tiles[mask], (x * cs, py)))
+        layer.blits(blits, doreturn=False)
+
+        line = wall_width(cs)
+        if x1 == self.cols:
+            right = WALL_BITS[WALL_RIGHT]
+            for y in range(y0, y1):
+                draw_walls(layer, (x1 - 1 - x0) * cs, (y - y0) * cs, self.wall_mask(x1 - 1, y) & right, cs, line)
+        if y1 == self.rows:
+            bottom = WALL_BITS[WALL_BOTTOM]
+            for x in range(x0, x1):
+                draw_walls(layer, (x - x0) * cs, (y1 - 1 - y0) * cs, self.wall_mask(x, y1 - 1) & bottom, cs, line)
+
+        # 起点和终点背景
+        inset = max(1, cs // 8)
+        if x0 == 0 and y0 == 0:
+            pygame.draw.rect(layer, COLOR_START, (inset, inset, cs - 2 * inset, cs - 2 * inset))
+        if x1 == self.cols and y1 == self.rows:
+            end_x, end_y = (x1 - 1 - x0) * cs, (y1 - 1 - y0) * cs
+            pygame.draw.rect(layer, COLOR_END, (end_x + inset, end_y + inset, cs - 2 * inset, cs - 2 * inset))
+
+        # 访问过的格子和路径
+        path_inset = max(1, cs // 4)
+        for y in range(y0, y1):
+            base = y * self.cols
+            row = self._marks[base + x0:base + x1]
+            if not any(row):
+                continue
+            py = (y - y0) * cs
+            for x, mark in enumerate(row):
+                if mark & MARK_VISITED:
+                    pygame.draw.rect(layer, COLOR_VISITED, (x * cs + inset, py + inset, cs - 2 * inset, cs - 2 * inset))
+                if mark & MARK_PATH:
+                    pygame.draw.rect(layer, COLOR_PATH,
+                                     (x * cs + path_inset, py + path_inset, cs - 2 * path_inset, cs - 2 * path_inset))
+        return layer
+
+    def _mark(self, cells, bit, color, inset):
+        """给格子打上标记，并直接补画到已经缓存的分块上（没缓存的分块渲染时会带上标记）"""
+        marks = self._marks
+        chunks = self._chunks
+        cols = self.cols
+        cs = self._chunk_cell_size
+        size = cs - 2 * inset
+        for i in cells:
+            marks[i] |= bit
+            if chunks:
+                x, y = i % cols, i // cols
+                layer = chunks.get((x // CHUNK_CELLS, y // CHUNK_CELLS))
+                if layer is not None:
+                    rect = ((x % CHUNK_CELLS) * cs + inset, (y % CHUNK_CELLS) * cs + inset, size, size)
+                    pygame.draw.rect(layer, color, rect)
+
+    def _sync_marks(self, solve_step):
+        """把 searched_cells 和 solution_path 的变化同步到格子标记上，返回这一帧新访问的格子"""
+        if self._marks is None:
+            self._marks = bytearray(self.cols * self.rows)
+        cs = self._chunk_cell_size
+        searched = self.searched_cells
+        end = max(0, min(solve_step + 1, len(searched)))
+        if self._visited_src is not searched or end < self._visited_step:
+            if self._visited_step:
+                # 搜索重新开始：清掉旧的访问标记，已缓存的分块全部作废
+                self._marks = self._marks.translate(_CLEAR_VISITED)
+                self._chunks.clear()
+            self._visited_src = searched
+            self._visited_step = 0
+        new = [self._cell_index(c) for c in searched[self._visited_step:end]]
+        self._visited_step = end
+        self._mark(new, MARK_VISITED, COLOR_VISITED, max(1, cs // 8))
+
+        if self._path_src is not self.solution_path:
+            if self._path_src:
+                self._marks = self._marks.translate(_CLEAR_PATH)
+                self._chunks.clear()
+            self._path_src = self.solution_path
+            cols = self.cols
+            self._mark([y * cols + x for x, y in self.solution_path], MARK_PATH, COLOR_PATH, max(1, cs // 4))
+        return new
+
+    def draw(self, surface, solve_step=-1, camera=None):
+        """通过 camera（默认为从左上角开始、原始大小的视口）绘制迷宫
+
+        迷宫按 CHUNK_CELLS x CHUNK_CELLS 分块，每块预先渲染成图层放在 LRU 缓存里，
+        每帧只贴出落在视口内的分块，所以绘制开销只和屏幕大小有关，和迷宫大小无关。
+        """
+        if camera is None:
+            camera = Camera(*surface.get_size())
+        cs = camera.cell_size
+        if cs != self._chunk_cell_size:
+            self._chunks.clear()
+            self._chunk_cell_size = cs
+        frontier = self._sync_marks(solve_step)
+
+        width, height = surface.get_size()
+        ox, oy = int(camera.x), int(camera.y)
+        chunk_px = CHUNK_CELLS * cs
+        cx0, cy0 = max(0, ox // chunk_px), max(0, oy // chunk_px)
+        cx1 = min((self.cols - 1) // CHUNK_CELLS, (ox + width) // chunk_px)
+        cy1 = min((self.rows - 1) // CHUNK_CELLS, (oy + height) // chunk_px)
+        for cy in range(cy0, cy1 + 1):
+            for cx in range(cx0, cx1 + 1):
+                surface.blit(self._chunk(cx, cy), (cx * chunk_px - ox, cy * chunk_px - oy))
+
+        # 这一帧新展开的格子就是搜索的前沿，直接画在屏幕上高亮显示
+        inset = max(1, cs // 8)
+        size = cs - 2 * inset
+        cols = self.cols
+        for i in frontier:
+            sx, sy = (i % cols) * cs - ox, (i // cols) * cs - oy
+            if -cs < sx < width and -cs < sy < height:
+                pygame.draw.rect(surface, COLOR_FRONTIER, (sx + inset, sy + inset, size, size))
+
+class SlicedTask:
+    """按帧分段推进的逐步任务（生成器），每帧只运行一小段时间，保证画面不卡顿"""
+
+    def __init__(self, steps):
+        self.steps = steps
+        self.done = False
+        self.result = None   # 生成器的返回值
+        self.elapsed = 0.0   # 实际用于计算的时间（秒），不含帧之间的等待
+        self.count = 0       # 已经推进的步数
+
+    def advance(self, budget_ms, max_steps=None):
+        """最多运行 budget_ms 毫秒或 max_steps 步，返回这次推进的步数"""
+        begin = time.perf_counter()
+        deadline = begin + budget_ms / 1000
+        count = 0
+        try:
+            while max_steps is None or count < max_steps:
+                next(self.steps)
+                count += 1
+                # 每 16 步才看一次时钟，减少计时本身的开销
+                if not count & 15 and time.perf_counter() >= deadline:
+                    break
+        except StopIteration as stop:
+            self.done = True
+            self.result = stop.value
+        self.elapsed += time.perf_counter() - begin
+        self.count += count
+        return count
 
 # --- 主程序 ---
-def main():
-    pygame.init()
-    screen = pygame.display.set_mode((WIDTH, HEIGHT))
-    pygame.display.set_caption("Pygame 迷宫生成与求解演示")
-    clock = pygame.time.Clock()
-    font = pygame.font.SysFont("Arial", 20)
-
-    maze = Maze()
-    
-    solving = False
-    solve_animation_index = 0
-    animation_timer = 0
-    animation_delay = 50 # 毫秒，控制求解动画速度
-
-    running = True
-    while running:
-        clock.tick(FPS)
-        dt = clock.get_time()
-        
-        # 1. 事件处理
+WORK_BUDGET_MS = 8          # 每帧最多用于生成/求解的时间（毫秒），其余留给事件和绘制
+WORK_STEPS = 4096           # 固定步长模式下每帧最多推进的步数，代替 WORK_BUDGET_MS
+SOLVE_SPEEDS = (20, 80, 320, 1280, None)  # 求解动画速度（每秒展开的格子数），None 为不限速
+
+# 一帧里的命令，Game.step() 按顺序执行；点击格子是 CMD_CLICK, x, y 三个数
+(CMD_GENERATE, CMD_SOLVE, CMD_RESET, CMD_ALGORITHM, CMD_SOLVER, CMD_DEAD_END,
+ CMD_FASTER, CMD_SLOWER, CMD_CLICK) = range(1, 10)
+KEY_COMMANDS = {
+    pygame.K_g: CMD_GENERATE,
+    pygame.K_s: CMD_SOLVE,
+    pygame.K_r: CMD_RESET,
+    pygame.K_a: CMD_ALGORITHM,
+    pygame.K_TAB: CMD_SOLVER,
+    pygame.K_d: CMD_DEAD_END,
+    pygame.K_EQUALS: CMD_FASTER, pygame.K_PLUS: CMD_FASTER, pygame.K_KP_PLUS: CMD_FASTER,
+    pygame.K_MINUS: CMD_SLOWER, pygame.K_KP_MINUS: CMD_SLOWER,
+}
+
+class Game:
+    """迷宫演示的全部状态：step() 推进一帧，draw() 画出当前状态
+
+    生成、求解和距离场都是逐步任务（SlicedTask），每帧推进一段。平时每帧按时间预算推进；
+    fixed_step=True 时每帧固定 dt、固定步数，结果与机器快慢无关，同样的 seed 和命令序列
+    总是得到同样的状态，录制和回放（replay.py）时使用。
+    视口（平移、缩放）只影响画面，不属于模拟状态。
+    """
+
+    def __init__(self, cols=COLS, rows=ROWS, compact=False, seed=None, fixed_step=False):
+        self.screen = self.clock = None  # 窗口、时钟和字体在 open() 里从 runtime 取得
+        self.cols = cols
+        self.rows = rows
+        self.compact = compact
+        self.fixed_step = fixed_step
+        # 每张迷宫的种子都从 self.rng 抽取
+        self.seed = seed if seed is not None else random.getrandbits(32)
+        self.rng = random.Random(self.seed)
+        self.commands = []     # 这一帧收到的命令，由 step() 执行
+        self.recorder = None   # replay.Recorder，录制时逐帧记录命令
+        self.profiler = profiler.FrameProfiler()  # 逐帧分阶段计时，F3 显示帧时间图
+
+        # 没装 numpy 时跳过依赖它的生成算法
+        self.algorithms = [name for name in Maze.ALGORITHMS
+                           if mazegen.np is not None or name not in mazegen.NUMPY_GENERATORS]
+        self.algorithm_index = 0
+        self.solver_names = list(mazesolve.SOLVERS)
+        self.solver_index = 0
+        self.dead_end_fill = False
+        self.last_result = None
+
+        # 生成、求解和距离场都是逐步任务，由 step() 按帧分段推进
+        self.camera = Camera(WIDTH, HEIGHT)
+        self.new_maze()
+        self.solve_task = None
+        self.field_task = None
+        self.route_start = None       # 等距离场算好后要显示路线的起点
+        self.speed_index = 0
+        self.step_credit = 0.0
+
+    def new_maze(self):
+        self.maze = Maze(self.cols, self.rows, compact=self.compact,
+                         algorithm=self.algorithms[self.algorithm_index],
+                         seed=self.rng.getrandbits(32), generate=False)
+        self.gen_task = SlicedTask(self.maze.generate_steps())
+
+    def open(self):
+        """取得共用的窗口、时钟和字体（runtime.get()）；draw() 之前调用，只调用 step() 时不需要。
+        fixed_step=False 时每帧的时间预算取自这里的时钟，没有 open() 时按固定步长推进"""
+        rt = runtime.get()
+        self.screen = rt.display((WIDTH, HEIGHT), CAPTION)
+        self.clock = rt.clock
+        self.font = rt.font("Arial", 20)
+
+    def handle_events(self):
+        """按键和点击转换成命令存进 self.commands，视口操作直接生效；返回是否继续运行"""
+        camera = self.camera
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
-                running = False
+                return False
             if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_g: # 生成新迷宫
-                    maze = Maze()
-                    solving = False
-                    solve_animation_index = 0
-                if event.key == pygame.K_s: # 开始求解
-                    if not maze.solution_path:
-                        maze.solve_bfs()
-                    solving = True
-                    solve_animation_index = -1
-                if event.key == pygame.K_r: # 重置路径
-                    solving = False
-                    solve_animation_index = 0
-                    maze.solution_path = []
-                    maze.searched_cells = []
                 if event.key == pygame.K_ESCAPE:
-                    running = False
-
-        # 2. 逻辑更新 (求解动画)
-        if solving and maze.searched_cells:
-            animation_timer += dt
-            if animation_timer > animation_delay:
-                animation_timer = 0
-                solve_animation_index += 1
-                if solve_animation_index >= len(maze.searched_cells):
-                    solving = False # 动画结束
-
-        # 3. 绘制
+                    return False
+                if event.key == pygame.K_F3:
+                    self.profiler.toggle_overlay()
+                if event.key in KEY_COMMANDS:
+                    self.commands.append(KEY_COMMANDS[event.key])
+            if event.type == pygame.MOUSEWHEEL: # 以鼠标位置为中心缩放
+                camera.zoom(event.y, pygame.mouse.get_pos())
+            if event.type == pygame.MOUSEMOTION and event.buttons[2]: # 按住右键拖动平移
+                camera.move(-event.rel[0], -event.rel[1])
+            if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                x, y = camera.screen_to_cell(event.pos)
+                if 0 <= x < self.cols and 0 <= y < self.rows:
+                    self.commands += (CMD_CLICK, x, y)
+        return True
+
+    def scroll(self, dt):
+        """方向键平移视口"""
+        keys = pygame.key.get_pressed()
+        scroll = SCROLL_SPEED * dt / 1000
+        self.camera.move((keys[pygame.K_RIGHT] - keys[pygame.K_LEFT]) * scroll,
+                         (keys[pygame.K_DOWN] - keys[pygame.K_UP]) * scroll)
+        self.camera.clamp(self.cols, self.rows)
+
+    def step(self, *commands):
+        """推进一帧：按顺序执行这一帧的命令，再按帧推进正在进行的任务"""
+        commands = iter(commands)
+        for command in commands:
+            if command == CMD_GENERATE: # 生成新迷宫
+                self.new_maze()
+                self.solve_task = self.field_task = None
+                self.last_result = None
+            elif command == CMD_SOLVE: # 开始求解
+                if self.gen_task is None and self.solve_task is None and not self.maze.solution_path:
+                    self.solve_task = SlicedTask(self.maze.solve_steps(self.solver_names[self.solver_index],
+                                                                       dead_end_fill=self.dead_end_fill))
+                    self.field_task = None
+                    self.step_credit = 0.0
+            elif command == CMD_RESET: # 重置路径
+                self.solve_task = self.field_task = None
+                self.maze.solution_path = []
+                self.maze.searched_cells = []
+            elif command == CMD_ALGORITHM: # 切换生成算法，下次按 G 时生效
+                self.algorithm_index = (self.algorithm_index + 1) % len(self.algorithms)
+            elif command == CMD_SOLVER: # 切换求解器
+                self.solver_index = (self.solver_index + 1) % len(self.solver_names)
+            elif command == CMD_DEAD_END: # 开关死路填充预处理
+                self.dead_end_fill = not self.dead_end_fill
+            elif command == CMD_FASTER: # 加快动画
+                self.speed_index = min(self.speed_index + 1, len(SOLVE_SPEEDS) - 1)
+            elif command == CMD_SLOWER: # 减慢动画
+                self.speed_index = max(self.speed_index - 1, 0)
+            elif command == CMD_CLICK:
+                x, y = next(commands), next(commands)
+                if self.gen_task is None:
+                    # 点击任意格子，用缓存的距离场给出到终点的路径；距离场没算好时先分段计算
+                    self.solve_task = None
+                    self.maze.searched_cells = []
+                    self.maze.solution_path = []
+                    self.last_result = None
+                    self.route_start = (x, y)
+                    if self.field_task is None and not self.maze.has_distance_field():
+                        self.field_task = SlicedTask(self.maze.distance_field_steps())
+        self.update()
+
+    def update(self):
+        """按帧推进正在进行的任务；没有时钟（没调用 open()）时和 fixed_step=True 一样按固定步长推进"""
+        if self.fixed_step or self.clock is None:
+            dt, budget_ms, limit = 1000 / FPS, math.inf, WORK_STEPS
+        else:
+            dt, budget_ms, limit = self.clock.get_time(), WORK_BUDGET_MS, None
+        if self.gen_task is not None:
+            self.gen_task.advance(budget_ms, limit)
+            if self.gen_task.done:
+                self.gen_task = None
+        elif self.solve_task is not None:
+            speed = SOLVE_SPEEDS[self.speed_index]
+            max_steps = limit
+            if speed is not None:
+                self.step_credit += dt * speed / 1000
+                max_steps = int(self.step_credit)
+                self.step_credit -= max_steps
+                if limit is not None:
+                    max_steps = min(max_steps, limit)
+            self.solve_task.advance(budget_ms, max_steps)
+            if self.solve_task.done:
+                self.last_result = self.solve_task.result
+                self.last_result.elapsed = self.solve_task.elapsed
+                self.solve_task = None
+        elif self.field_task is not None:
+            self.field_task.advance(budget_ms, limit)
+            if self.field_task.done:
+                self.field_task = None
+        if self.route_start is not None and self.field_task is None and self.gen_task is None:
+            self.maze.solution_path = self.maze.route_from(self.route_start)
+            self.route_start = None
+
+    def state_hash(self):
+        """模拟状态的摘要（不含视口和耗时），回放时核对用"""
+        maze = self.maze
+        tasks = tuple(task.count if task is not None else None
+                      for task in (self.gen_task, self.solve_task, self.field_task))
+        result = None
+        if self.last_result is not None:
+            result = (self.last_result.expanded, self.last_result.pruned)
+        return replay.state_hash(maze.algorithm, bytes(maze.wall_masks()), maze.solution_path,
+                                 len(maze.searched_cells), tasks, result, self.route_start,
+                                 self.algorithm_index, self.solver_index, self.dead_end_fill,
+                                 self.speed_index, self.step_credit, self.rng.getstate())
+
+    def draw(self):
+        screen = self.screen
+        maze = self.maze
         screen.fill(COLOR_BG)
-        maze.draw(screen, solve_animation_index if solving else -1)
+        maze.draw(screen, len(maze.searched_cells) - 1, self.camera)
         
         # UI 提示
+        if self.gen_task is not None:
+            status = f"生成中... 已打通 {self.gen_task.count} 格"
+        elif self.solve_task is not None:
+            status = f"求解中... 已展开 {len(maze.searched_cells)} 格"
+        elif self.field_task is not None:
+            status = f"计算距离场... {self.field_task.count}/{maze.cols * maze.rows}"
+        else:
+            status = "就绪"
+        speed = SOLVE_SPEEDS[self.speed_index]
         info_text = [
-            "按 [G] 生成新迷宫",
-            "按 [S] 自动求解 (BFS)",
-            "按 [R] 重置路径",
-            f"状态：{'求解中...' if solving else '就绪'}"
+            f"按 [G] 生成新迷宫 ({self.algorithms[self.algorithm_index]})，[A] 切换生成算法",
+            f"按 [S] 自动求解 ({self.solver_names[self.solver_index]}{' + 死路填充' if self.dead_end_fill else ''})",
+            "按 [TAB] 切换求解器，[D] 开关死路填充",
+            f"按 [+]/[-] 调整动画速度 ({'不限速' if speed is None else f'{speed} 格/秒'})",
+            "按 [R] 重置路径，鼠标点击格子显示到终点的路线",
+            "方向键或按住右键拖动平移，滚轮缩放",
+            f"状态：{status}"
         ]
+        if self.last_result is not None:
+            info_text.append(f"展开 {self.last_result.expanded} 格，填充 {self.last_result.pruned} 格，"
+                             f"耗时 {self.last_result.elapsed * 1000:.2f}ms")
         
         for i, text in enumerate(info_text):
-            surf = font.render(text, True, COLOR_TEXT)
+            surf = self.font.render(text, True, COLOR_TEXT)
             screen.blit(surf, (10, 10 + i * 25))
 
+    def present(self):
         pygame.display.flip()
 
-    pygame.quit()
+    def frame(self):
+        """主循环的一帧：处理事件、推进正在进行的任务、画出并提交画面；返回是否继续运行"""
+        prof = self.profiler
+        prof.begin()
+        self.clock.tick(FPS)
+        prof.mark("wait")
+
+        # 1. 事件处理
+        running = self.handle_events()
+        self.scroll(self.clock.get_time())
+        prof.mark("events")
+
+        # 2. 逻辑更新：执行这一帧的命令，按帧推进正在进行的任务
+        commands = tuple(self.commands)
+        self.commands.clear()
+        if self.recorder is not None:
+            self.recorder.record(commands)
+        self.step(*commands)
+        prof.mark("update")
+
+        # 3. 绘制，打开了帧时间图时画在最上面
+        self.draw()
+        prof.mark("draw")
+        prof.draw(self.screen)
+        self.present()
+        prof.mark("flip")
+        prof.end(searched=len(self.maze.searched_cells), path=len(self.maze.solution_path))
+        return running
+
+    def close(self):
+        """结束时保存录像和 trace"""
+        if self.recorder is not None:
+            self.recorder.save(self.state_hash())
+        self.profiler.close()
+
+    def run(self):
+        self.open()
+        while self.frame():
+            pass
+        self.close()
+        runtime.shutdown()
+
+def main(cols=COLS, rows=ROWS, compact=False, trace=None):
+    game = Game(cols, rows, compact)
+    if trace:
+        game.profiler = profiler.FrameProfiler(trace)
+    game.run()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Pygame 迷宫生成与求解演示")
+    parser.add_argument("--size", type=int, nargs=2, default=(COLS, ROWS), metavar=("COLS", "ROWS"),
+                        help="迷宫大小，可以远大于屏幕，用方向键和滚轮浏览")
+    parser.add_argument("--compact", action="store_true", help="使用紧凑网格，适合很大的迷宫")
+    parser.add_argument("--seed", type=int, help="随机数种子，种子和操作相同时结果相同")
+    parser.add_argument("--record", metavar="FILE",
+                        help="把种子和操作录制到文件，用 replay.py 回放；录制时每帧的工作量固定，不按时间预算")
+    parser.add_argument("--trace", metavar="FILE",
+                        help="把每帧各阶段的耗时和搜索格数写成 Chrome trace JSON（演示中按 F3 显示帧时间图）")
+    args = parser.parse_args()
+    cols, rows = args.size
+    game = Game(cols, rows, args.compact, args.seed, fixed_step=args.record is not None)
+    if args.record:
+        game.recorder = replay.Recorder(args.record, "maze", game.seed,
+                                        cols=cols, rows=rows, compact=args.compact, fixed_step=True)
+    if args.trace:
+        game.profiler = profiler.FrameProfiler(args.trace)
+    game.run()
\ No newline at end of file
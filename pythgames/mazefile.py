@@ -0,0 +1,179 @@
+"""迷宫的二进制文件格式
+
+文件布局（小端序）：
+    头部 32 字节：魔数 b"MAZE"、版本 u8、标志 u8、保留 u16、cols u32、rows u32、
+                  路径长度 u64、保留 u64
+    墙壁：每格 4 位，两个格子一个字节，偶数下标在低 4 位，共 ceil(cols*rows/2) 字节
+    路径（标志位 FLAG_SOLUTION）：路径长度个 u32 一维下标，从起点到终点
+
+load() 通过 mmap 打开文件，墙壁按需从映射的内存里解码，不会把整张迷宫读成
+Python 对象，所以上亿个格子的迷宫也能直接打开求解或显示。
+"""
+import mmap
+import struct
+import sys
+from array import array
+
+MAGIC = b"MAZE"
+VERSION = 1
+FLAG_SOLUTION = 1
+HEADER = struct.Struct("<4sBBHIIQQ")
+
+# bytes.translate 用的查找表：取低/高 4 位，以及左移 4 位
+_LOW = bytes(b & 0x0F for b in range(256))
+_HIGH = bytes(b >> 4 for b in range(256))
+_SHIFT = bytes((b << 4) & 0xFF for b in range(256))
+
+
+def pack(walls):
+    """把每格一个字节的掩码数组打包成每格 4 位"""
+    walls = walls.unpack() if isinstance(walls, PackedWalls) else bytes(walls)
+    if len(walls) % 2:
+        walls += b"\x00"
+    low = walls[0::2]
+    high = walls[1::2].translate(_SHIFT)
+    # 两个字节串逐字节做或运算：转成大整数在 C 层面完成
+    merged = int.from_bytes(low, "little") | int.from_bytes(high, "little")
+    return merged.to_bytes(len(low), "little")
+
+
+def unpack(packed, count):
+    """pack() 的逆运算，返回长度为 count 的 bytearray"""
+    packed = bytes(packed[:(count + 1) // 2])
+    walls = bytearray(len(packed) * 2)
+    walls[0::2] = packed.translate(_LOW)
+    walls[1::2] = packed.translate(_HIGH)
+    del walls[count:]
+    return walls
+
+
+class PackedWalls:
+    """只读的墙壁掩码视图，直接在打包后的缓冲区（例如 mmap）上按下标解码"""
+
+    def __init__(self, buffer, count):
+        self.buffer = buffer
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        return iter(self.unpack())
+
+    def __getitem__(self, i):
+        """按下标取一格的掩码；切片时只解码覆盖到的那段字节，返回 bytearray（和内存里的掩码数组一样）"""
+        if isinstance(i, slice):
+            cells = range(*i.indices(self.count))
+            if not cells:
+                return bytearray()
+            first = min(cells[0], cells[-1]) & ~1  # 从整字节开始解码
+            last = max(cells[0], cells[-1]) + 1
+            span = unpack(self.buffer[first >> 1:(last + 1) >> 1], last - first)
+            return span[cells[0] - first::cells.step][:len(cells)]
+        if i < 0:
+            i += self.count
+        if not 0 <= i < self.count:
+            raise IndexError("墙壁下标超出范围")
+        return (self.buffer[i >> 1] >> ((i & 1) << 2)) & 0x0F
+
+    def unpack(self):
+        """整体解码成 bytearray，内存允许时求解会快很多"""
+        return unpack(self.buffer, self.count)
+
+
+def _header(cols, rows, solution_length):
+    flags = FLAG_SOLUTION if solution_length else 0
+    return HEADER.pack(MAGIC, VERSION, flags, 0, cols, rows, solution_length, 0)
+
+
+def _solution_bytes(solution):
+    data = array("I", solution)
+    if sys.byteorder != "little":
+        data.byteswap()
+    return data.tobytes()
+
+
+def save(path, walls, cols, rows, solution=None):
+    """保存整张迷宫，solution 为可选的一维下标路径"""
+    if len(walls) != cols * rows:
+        raise ValueError(f"墙壁数组长度 {len(walls)} 与 {cols}x{rows} 不符")
+    solution = solution or []
+    with open(path, "wb") as fp:
+        fp.write(_header(cols, rows, len(solution)))
+        fp.write(pack(walls))
+        if solution:
+            fp.write(_solution_bytes(solution))
+
+
+def save_rows(path, cols, rows, row_iter):
+    """把逐行生成的掩码（例如 mazegen.eller_rows）直接写入文件，内存占用只有一行"""
+    written = 0
+    pending = b""  # cols 为奇数时，上一行剩下的半个字节
+    with open(path, "wb") as fp:
+        fp.write(_header(cols, rows, 0))
+        for row in row_iter:
+            data = pending + bytes(row)
+            written += len(row)
+            if len(data) % 2:
+                data, pending = data[:-1], data[-1:]
+            else:
+                pending = b""
+            fp.write(pack(data))
+        if pending:
+            fp.write(pack(pending))
+    if written != cols * rows:
+        raise ValueError(f"写入了 {written} 个格子，预期 {cols * rows} 个")
+
+
+class MazeFile:
+    """用 mmap 打开的迷宫文件，可以用作上下文管理器"""
+
+    def __init__(self, path):
+        with open(path, "rb") as fp:
+            self._mmap = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, flags, _, cols, rows, length, _ = HEADER.unpack_from(self._mmap, 0)
+            if magic != MAGIC:
+                raise ValueError(f"{path} 不是迷宫文件")
+            if version != VERSION:
+                raise ValueError(f"不支持的迷宫文件版本：{version}")
+            count = cols * rows
+            walls_end = HEADER.size + (count + 1) // 2
+            solution_end = walls_end + (length * 4 if flags & FLAG_SOLUTION else 0)
+            if len(self._mmap) < solution_end:
+                raise ValueError(f"{path} 已被截断")
+        except Exception:
+            self._mmap.close()
+            raise
+
+        self.cols = cols
+        self.rows = rows
+        self._view = memoryview(self._mmap)
+        self.walls = PackedWalls(self._view[HEADER.size:walls_end], count)
+        self.solution = None
+        if flags & FLAG_SOLUTION and sys.byteorder == "little":
+            self.solution = self._view[walls_end:solution_end].cast("I")
+        elif flags & FLAG_SOLUTION:
+            data = array("I")
+            data.frombytes(self._view[walls_end:solution_end])
+            data.byteswap()
+            self.solution = data
+
+    def close(self):
+        # 先释放所有基于 mmap 的视图，否则 mmap 无法关闭
+        if isinstance(self.solution, memoryview):
+            self.solution.release()
+        self.walls.buffer.release()
+        self._view.release()
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def load(path):
+    """用 mmap 打开迷宫文件，返回 MazeFile"""
+    return MazeFile(path)
@@ -0,0 +1,239 @@
+"""迷宫生成算法
+
+所有生成器的签名都是 generator(cols, rows, rng=random) -> bytearray，结果是紧凑网格
+（见 mazegrid）格式的墙壁掩码，可以直接交给 maze.Maze 或 mazesolve 使用。
+binary_tree / sidewinder / kruskal 需要 numpy。
+"""
+import random
+
+try:
+    import numpy as np
+except ImportError:  # numpy 是可选依赖
+    np = None
+
+from mazegrid import (ALL_WALLS, WALL_BITS, WALL_TOP, WALL_RIGHT, WALL_BOTTOM, WALL_LEFT, OPPOSITE,
+                      new_walls, offsets)
+
+_TOP, _RIGHT, _BOTTOM, _LEFT = (WALL_BITS[d] for d in (WALL_TOP, WALL_RIGHT, WALL_BOTTOM, WALL_LEFT))
+
+
+def dfs(cols, rows, rng=random):
+    """DFS + 回溯算法，用显式栈代替递归，visited 用位图保存"""
+    walls = new_walls(cols, rows)
+    for _ in dfs_steps(walls, cols, rows, rng):
+        pass
+    return walls
+
+
+def dfs_steps(walls, cols, rows, rng=random):
+    """dfs() 的逐步版本：直接修改传入的 walls，每打通一面墙 yield 一次新到达的格子"""
+    visited = bytearray((cols * rows + 7) // 8)
+    step = offsets(cols)
+    last_x = cols - 1
+    last_row = (rows - 1) * cols
+    choice = rng.choice
+
+    visited[0] |= 1
+    stack = [0]
+    while stack:
+        i = stack[-1]
+        x = i % cols
+        # 上、右、下、左，顺序与 Cell.check_neighbors 保持一致
+        neighbors = []
+        if i >= cols:
+            n = i - cols
+            if not visited[n >> 3] & (1 << (n & 7)):
+                neighbors.append(WALL_TOP)
+        if x < last_x:
+            n = i + 1
+            if not visited[n >> 3] & (1 << (n & 7)):
+                neighbors.append(WALL_RIGHT)
+        if i < last_row:
+            n = i + cols
+            if not visited[n >> 3] & (1 << (n & 7)):
+                neighbors.append(WALL_BOTTOM)
+        if x > 0:
+            n = i - 1
+            if not visited[n >> 3] & (1 << (n & 7)):
+                neighbors.append(WALL_LEFT)
+
+        if neighbors:
+            d = choice(neighbors)
+            n = i + step[d]
+            walls[i] &= ALL_WALLS ^ WALL_BITS[d]
+            walls[n] &= ALL_WALLS ^ WALL_BITS[OPPOSITE[d]]
+            visited[n >> 3] |= 1 << (n & 7)
+            stack.append(n)
+            yield n
+        else:
+            stack.pop()
+
+
+def eller_rows(cols, rows, rng=random):
+    """Eller 算法：逐行生成完美迷宫，每次 yield 一行的墙壁掩码（长度为 cols 的 bytearray）
+
+    任何时刻只保存当前一行的集合信息，内存占用为 O(cols)，与行数无关。
+    配合 mazefile.save_rows() 可以边生成边写入磁盘。
+    """
+    sets = [-1] * cols          # 当前行每一列所属的集合，-1 表示还没有
+    members = {}                # 集合 -> 该行中属于它的列
+    next_set = 0
+    top = bytearray([ALL_WALLS]) * cols  # 上一行向下打通后，本行的顶墙状态
+
+    for y in range(rows):
+        row = top
+        # 1. 没有集合的格子分配新集合
+        for x in range(cols):
+            if sets[x] < 0:
+                sets[x] = next_set
+                members[next_set] = [x]
+                next_set += 1
+
+        # 2. 随机合并左右相邻、属于不同集合的格子；最后一行必须全部合并
+        last = y == rows - 1
+        for x in range(cols - 1):
+            a, b = sets[x], sets[x + 1]
+            if a != b and (last or rng.random() < 0.5):
+                row[x] &= ~_RIGHT
+                row[x + 1] &= ~_LEFT
+                # 小集合并入大集合，保证每行的合并总开销是 O(cols log cols)
+                if len(members[a]) < len(members[b]):
+                    a, b = b, a
+                for col in members[b]:
+                    sets[col] = a
+                members[a].extend(members.pop(b))
+
+        if last:
+            yield row
+            return
+
+        # 3. 每个集合至少有一个格子向下打通，其余格子的下一行重新分配集合
+        top = bytearray([ALL_WALLS]) * cols
+        next_sets = [-1] * cols
+        next_members = {}
+        for s, cells in members.items():
+            down = [x for x in cells if rng.random() < 0.5]
+            if not down:
+                down = [rng.choice(cells)]
+            for x in down:
+                row[x] &= ~_BOTTOM
+                top[x] &= ~_TOP
+                next_sets[x] = s
+            next_members[s] = down
+        sets, members = next_sets, next_members
+        yield row
+
+
+def eller(cols, rows, rng=random):
+    """用 Eller 算法生成整张迷宫，返回墙壁掩码数组"""
+    walls = bytearray()
+    for row in eller_rows(cols, rows, rng):
+        walls += row
+    return walls
+
+
+def _numpy_rng(rng):
+    if np is None:
+        raise ImportError("这个生成算法需要 numpy，请先运行：pip install numpy")
+    # 从传入的 random 实例派生种子，保证同一个种子得到同一张迷宫
+    return np.random.default_rng(rng.getrandbits(64))
+
+
+def _carve_north(walls, cells, cols):
+    walls[cells] &= ALL_WALLS ^ _TOP
+    walls[cells - cols] &= ALL_WALLS ^ _BOTTOM
+
+
+def _carve_east(walls, cells):
+    walls[cells] &= ALL_WALLS ^ _RIGHT
+    walls[cells + 1] &= ALL_WALLS ^ _LEFT
+
+
+def binary_tree(cols, rows, rng=random):
+    """二叉树算法：每个格子随机向北或向东打通，整张网格一次向量化完成"""
+    gen = _numpy_rng(rng)
+    walls = np.full(cols * rows, ALL_WALLS, dtype=np.uint8)
+    cells = np.arange(cols * rows).reshape(rows, cols)
+
+    east = gen.random((rows, cols)) < 0.5
+    east[0, :] = True        # 第一行只能向东
+    east[:, -1] = False      # 最后一列只能向北
+    north = ~east
+    north[0, -1] = False     # 右上角什么都不做
+
+    _carve_east(walls, cells[east])
+    _carve_north(walls, cells[north], cols)
+    return bytearray(walls.tobytes())
+
+
+def sidewinder(cols, rows, rng=random):
+    """Sidewinder 算法：每行随机切成若干段，段内向东打通，再从每段随机选一格向北打通"""
+    gen = _numpy_rng(rng)
+    walls = np.full(cols * rows, ALL_WALLS, dtype=np.uint8)
+
+    east = gen.random((rows, cols)) < 0.5
+    east[0, :] = True        # 第一行整行打通
+    east[:, -1] = False      # 每行最后一格一定结束当前段，所以段不会跨行
+    east = east.ravel()
+    _carve_east(walls, np.flatnonzero(east))
+
+    # 每段的结尾是 east 为 False 的格子，开头是上一段结尾的下一格
+    ends = np.flatnonzero(~east)
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    picks = starts + (gen.random(len(ends)) * (ends - starts + 1)).astype(np.int64)
+    _carve_north(walls, picks[picks >= cols], cols)
+    return bytearray(walls.tobytes())
+
+
+def kruskal(cols, rows, rng=random):
+    """随机 Kruskal 算法：打乱所有内部的墙，用数组实现的并查集决定是否打通"""
+    gen = _numpy_rng(rng)
+    size = cols * rows
+    cells = np.arange(size).reshape(rows, cols)
+    # 每条内部的墙用 (格子, 方向) 表示：方向 0 为右墙，1 为下墙
+    edge_cells = np.concatenate((cells[:, :-1].ravel(), cells[:-1, :].ravel()))
+    edge_dirs = np.concatenate((np.zeros(rows * (cols - 1), dtype=np.int8),
+                                np.ones((rows - 1) * cols, dtype=np.int8)))
+    order = gen.permutation(len(edge_cells))
+    edge_cells = edge_cells[order].tolist()
+    edge_dirs = edge_dirs[order].tolist()
+
+    walls = new_walls(cols, rows)
+    # 并查集用一维数组保存父节点（list 的下标访问比 array 快，不需要装箱）
+    parent = list(range(size))
+    remaining = size - 1
+    open_right, open_left = ALL_WALLS ^ _RIGHT, ALL_WALLS ^ _LEFT
+    open_bottom, open_top = ALL_WALLS ^ _BOTTOM, ALL_WALLS ^ _TOP
+    for a, down in zip(edge_cells, edge_dirs):
+        b = a + cols if down else a + 1
+        # 查找根节点，顺带做路径减半
+        ra = a
+        while parent[ra] != ra:
+            parent[ra] = ra = parent[parent[ra]]
+        rb = b
+        while parent[rb] != rb:
+            parent[rb] = rb = parent[parent[rb]]
+        if ra == rb:
+            continue
+        parent[rb] = ra
+        if down:
+            walls[a] &= open_bottom
+            walls[b] &= open_top
+        else:
+            walls[a] &= open_right
+            walls[b] &= open_left
+        remaining -= 1
+        if not remaining:
+            break
+    return walls
+
+
+GENERATORS = {
+    "dfs": dfs,
+    "eller": eller,
+    "binary_tree": binary_tree,
+    "sidewinder": sidewinder,
+    "kruskal": kruskal,
+}
+
+NUMPY_GENERATORS = ("binary_tree", "sidewinder", "kruskal")
@@ -0,0 +1,24 @@
+"""迷宫的紧凑网格格式
+
+每个格子用一个 4 位掩码表示四面墙（第 i 位对应方向 i），整张迷宫按行展开成
+一维数组，格子 (x, y) 的下标是 y * cols + x。
+生成算法从不打通外圈的墙，所以沿着打开的墙走时不需要再做越界检查。
+"""
+
+# 墙壁方向索引：0:上，1:右，2:下，3:左
+WALL_TOP, WALL_RIGHT, WALL_BOTTOM, WALL_LEFT = 0, 1, 2, 3
+
+WALL_BITS = (1 << WALL_TOP, 1 << WALL_RIGHT, 1 << WALL_BOTTOM, 1 << WALL_LEFT)
+ALL_WALLS = 0b1111
+DIRECTIONS = ((0, -1), (1, 0), (0, 1), (-1, 0))  # 与墙壁方向索引一一对应
+OPPOSITE = (WALL_BOTTOM, WALL_LEFT, WALL_TOP, WALL_RIGHT)
+
+
+def offsets(cols):
+    """四个方向在一维数组中的下标偏移"""
+    return (-cols, 1, cols, -1)
+
+
+def new_walls(cols, rows):
+    """四面都有墙的空白网格"""
+    return bytearray([ALL_WALLS]) * (cols * rows)
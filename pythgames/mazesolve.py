@@ -0,0 +1,313 @@
+"""迷宫求解器
+
+所有求解器都直接在紧凑网格（见 mazegrid）上工作，并且写成逐步执行的生成器：
+    solver(walls, cols, rows, start, goal, blocked=None)
+每展开一个格子就 yield 它的一维下标，结束时 return 一个 SolveResult，这样调用方可以
+按帧分段推进（见 maze.main）。start / goal 是一维下标，blocked 是可选的屏蔽位数组
+（非 0 的格子视为不可走），由 fill_dead_ends() 预处理得到。
+需要一次性得到结果时用 solve()。
+"""
+import heapq
+import time
+from array import array
+from collections import deque
+
+from mazegrid import WALL_BITS, offsets
+
+# 预处理这类不展开节点的工作每隔这么多格 yield 一次 NO_CELL，让出执行权
+YIELD_EVERY = 256
+NO_CELL = -1
+
+
+class SolveResult:
+    """一次求解的结果和统计信息"""
+
+    def __init__(self, solver, path, searched, expanded, elapsed, pruned=0):
+        self.solver = solver
+        self.path = path            # 一维下标列表，从起点到终点；无解时为空
+        self.searched = searched    # 按展开顺序记录的一维下标，用于动画
+        self.expanded = expanded    # 展开的节点数（不含预处理）
+        self.elapsed = elapsed      # 耗时（秒，包含预处理）
+        self.pruned = pruned        # 死路填充预处理填掉的格子数
+
+    def __repr__(self):
+        return (f"SolveResult({self.solver!r}, path={len(self.path)}, expanded={self.expanded}, "
+                f"pruned={self.pruned}, elapsed={self.elapsed * 1000:.2f}ms)")
+
+
+def run(steps):
+    """把逐步执行的生成器一口气跑完，返回它的返回值"""
+    while True:
+        try:
+            next(steps)
+        except StopIteration as stop:
+            return stop.value
+
+
+def _trace(parent, end):
+    """沿 parent 数组回溯路径；路径可能很长，所以也分段 yield NO_CELL"""
+    path = []
+    i = end
+    while i != -1:
+        path.append(i)
+        i = parent[i]
+        if not len(path) % YIELD_EVERY:
+            yield NO_CELL
+    path.reverse()
+    return path
+
+
+def bfs(walls, cols, rows, start, goal, blocked=None):
+    """广度优先搜索，保证最短路径"""
+    step = offsets(cols)
+    parent = array('i', [-1]) * (cols * rows)
+    seen = bytearray(blocked) if blocked is not None else bytearray(cols * rows)
+    seen[start] = 1
+    queue = deque([start])
+
+    expanded = 0
+    found = False
+    while queue:
+        i = queue.popleft()
+        expanded += 1
+        yield i
+        if i == goal:
+            found = True
+            break
+        mask = walls[i]
+        for d in range(4):
+            if not mask & WALL_BITS[d]:
+                n = i + step[d]
+                if not seen[n]:
+                    seen[n] = 1
+                    parent[n] = i
+                    queue.append(n)
+
+    path = (yield from _trace(parent, goal)) if found else []
+    return SolveResult("bfs", path, None, expanded, 0.0)
+
+
+def astar(walls, cols, rows, start, goal, blocked=None):
+    """A* 搜索，启发函数为曼哈顿距离"""
+    step = offsets(cols)
+    gx, gy = goal % cols, goal // cols
+    parent = array('i', [-1]) * (cols * rows)
+    cost = array('i', [-1]) * (cols * rows)
+    closed = bytearray(blocked) if blocked is not None else bytearray(cols * rows)
+
+    cost[start] = 0
+    h = abs(start % cols - gx) + abs(start // cols - gy)
+    heap = [(h, h, start)]
+
+    expanded = 0
+    found = False
+    while heap:
+        _, _, i = heapq.heappop(heap)
+        if closed[i]:
+            continue
+        closed[i] = 1
+        expanded += 1
+        yield i
+        if i == goal:
+            found = True
+            break
+        g = cost[i] + 1
+        mask = walls[i]
+        for d in range(4):
+            if not mask & WALL_BITS[d]:
+                n = i + step[d]
+                if not closed[n] and (cost[n] == -1 or g < cost[n]):
+                    cost[n] = g
+                    parent[n] = i
+                    h = abs(n % cols - gx) + abs(n // cols - gy)
+                    # f 相同时优先展开离终点更近的格子
+                    heapq.heappush(heap, (g + h, h, n))
+
+    path = (yield from _trace(parent, goal)) if found else []
+    return SolveResult("astar", path, None, expanded, 0.0)
+
+
+def bidirectional(walls, cols, rows, start, goal, blocked=None):
+    """双向 BFS：每次从较小的一侧扩展一整层，两侧相遇即得最短路径"""
+    step = offsets(cols)
+    size = cols * rows
+    # side: 0 未访问，1 起点一侧，2 终点一侧，3 被屏蔽
+    side = bytearray(blocked).replace(b"\x01", b"\x03") if blocked is not None else bytearray(size)
+    parents = {1: array('i', [-1]) * size, 2: array('i', [-1]) * size}
+    dist = array('i', [0]) * size
+    side[start] = 1
+    side[goal] = 2
+    frontiers = {1: [start], 2: [goal]}
+
+    expanded = 0
+    best = None  # (总长度, 起点侧的格子, 终点侧的格子)
+    if start == goal:
+        best = (0, start, goal)
+    while best is None and frontiers[1] and frontiers[2]:
+        me = 1 if len(frontiers[1]) <= len(frontiers[2]) else 2
+        other = 3 - me
+        parent = parents[me]
+        next_frontier = []
+        for i in frontiers[me]:
+            expanded += 1
+            yield i
+            mask = walls[i]
+            for d in range(4):
+                if not mask & WALL_BITS[d]:
+                    n = i + step[d]
+                    s = side[n]
+                    if s == 0:
+                        side[n] = me
+                        parent[n] = i
+                        dist[n] = dist[i] + 1
+                        next_frontier.append(n)
+                    elif s == other:
+                        # 把这一层扫完再取最短的相遇点
+                        total = dist[i] + 1 + dist[n]
+                        if best is None or total < best[0]:
+                            best = (total, i, n) if me == 1 else (total, n, i)
+        frontiers[me] = next_frontier
+
+    path = []
+    if best is not None:
+        _, a, b = best
+        path = yield from _trace(parents[1], a)
+        if b != a:
+            tail = yield from _trace(parents[2], b)
+            tail.reverse()
+            path.extend(tail)
+    return SolveResult("bidirectional", path, None, expanded, 0.0)
+
+
+def fill_dead_ends_steps(walls, cols, rows, start, goal):
+    """fill_dead_ends() 的逐步版本，每处理 YIELD_EVERY 个格子 yield 一次 NO_CELL"""
+    step = offsets(cols)
+    size = cols * rows
+    degree = bytearray(size)
+    stack = []
+    for i in range(size):
+        mask = walls[i]
+        degree[i] = k = (not mask & 1) + (not mask & 2) + (not mask & 4) + (not mask & 8)
+        if k <= 1 and i != start and i != goal:
+            stack.append(i)
+        if not i % YIELD_EVERY:
+            yield NO_CELL
+
+    blocked = bytearray(size)
+    filled = 0
+    while stack:
+        i = stack.pop()
+        if blocked[i]:
+            continue
+        blocked[i] = 1
+        filled += 1
+        if not filled % YIELD_EVERY:
+            yield NO_CELL
+        mask = walls[i]
+        for d in range(4):
+            if not mask & WALL_BITS[d]:
+                n = i + step[d]
+                if not blocked[n]:
+                    degree[n] -= 1
+                    if degree[n] <= 1 and n != start and n != goal:
+                        stack.append(n)
+    return blocked, filled
+
+
+def fill_dead_ends(walls, cols, rows, start, goal):
+    """死路填充：反复填掉只有一个出口的格子，返回屏蔽位数组和填掉的格子数
+
+    对完美迷宫来说，剩下的格子正好就是起点到终点的唯一路径。
+    """
+    return run(fill_dead_ends_steps(walls, cols, rows, start, goal))
+
+
+def distance_field(walls, cols, rows, goal):
+    """从终点做一次 BFS，返回 (dist, next_hop) 两个一维整数数组
+
+    dist[i] 是格子 i 到终点的步数，next_hop[i] 是从 i 出发朝终点走的下一格，
+    走不到的格子两者都是 -1。之后任意起点的路径只需沿 next_hop 走，代价为路径长度。
+    """
+    return run(distance_field_steps(walls, cols, rows, goal))
+
+
+def distance_field_steps(walls, cols, rows, goal):
+    """distance_field() 的逐步版本，每访问一个格子 yield 一次"""
+    step = offsets(cols)
+    size = cols * rows
+    dist = array('i', [-1]) * size
+    next_hop = array('i', [-1]) * size
+    dist[goal] = 0
+    queue = deque([goal])
+    while queue:
+        i = queue.popleft()
+        yield i
+        d = dist[i] + 1
+        mask = walls[i]
+        for k in range(4):
+            if not mask & WALL_BITS[k]:
+                n = i + step[k]
+                if dist[n] < 0:
+                    dist[n] = d
+                    next_hop[n] = i
+                    queue.append(n)
+    return dist, next_hop
+
+
+def follow(next_hop, start, goal):
+    """沿 distance_field() 的 next_hop 从 start 走到 goal，走不到时返回空列表"""
+    if start != goal and next_hop[start] < 0:
+        return []
+    path = [start]
+    i = start
+    while i != goal:
+        i = next_hop[i]
+        path.append(i)
+    return path
+
+
+SOLVERS = {
+    "bfs": bfs,
+    "astar": astar,
+    "bidirectional": bidirectional,
+}
+
+
+def solve_steps(walls, cols, rows, start, goal, solver="bfs", dead_end_fill=False):
+    """按名字选择求解器并逐步执行，可选先做死路填充预处理
+
+    返回的生成器 yield 展开的格子（预处理期间为 NO_CELL），结束时返回 SolveResult
+    （不含 searched 和耗时）。
+    """
+    try:
+        func = SOLVERS[solver]
+    except KeyError:
+        raise ValueError(f"未知的求解器：{solver!r}，可选 {', '.join(SOLVERS)}") from None
+    return _solve_steps(func, walls, cols, rows, start, goal, dead_end_fill)
+
+
+def _solve_steps(func, walls, cols, rows, start, goal, dead_end_fill):
+    blocked, pruned = None, 0
+    if dead_end_fill:
+        blocked, pruned = yield from fill_dead_ends_steps(walls, cols, rows, start, goal)
+    result = yield from func(walls, cols, rows, start, goal, blocked)
+    result.pruned = pruned
+    return result
+
+
+def solve(walls, cols, rows, start, goal, solver="bfs", dead_end_fill=False):
+    """一次性求解，返回带有展开顺序和耗时的 SolveResult"""
+    begin = time.perf_counter()
+    searched = array('i')
+    steps = solve_steps(walls, cols, rows, start, goal, solver, dead_end_fill)
+    while True:
+        try:
+            i = next(steps)
+        except StopIteration as stop:
+            result = stop.value
+            break
+        if i != NO_CELL:
+            searched.append(i)
+    result.searched = searched
+    result.elapsed = time.perf_counter() - begin
+    return result
@@ -0,0 +1,140 @@
+"""逐帧分阶段计时：屏幕上的帧时间图（F3）和 Chrome trace 导出
+
+主循环在每个阶段结束时调用 mark(阶段名)，记下从上一个标记到现在的耗时：
+    profiler.begin()
+    clock.tick(FPS);        profiler.mark("wait")
+    handle_events();        profiler.mark("events")
+    step();                 profiler.mark("update")
+    draw();                 profiler.mark("draw")
+    profiler.draw(screen)   # 打开时画帧时间图，自身耗时记为 "profiler"
+    present();              profiler.mark("flip")
+    profiler.end(enemies=len(enemies))   # 这一帧的实体数等计数
+没打开图表、也没有录制 trace 时，每个调用只是检查一个属性就返回，几乎没有开销。
+开关在下一帧的 begin() 生效，不会出现半帧的数据。
+
+trace 保存为 Chrome trace 格式的 JSON（chrome://tracing 或 https://ui.perfetto.dev 打开）：
+每帧一个 "frame" 区间，里面是各个阶段的区间，计数是 counter 事件。
+"""
+import json
+import time
+from collections import deque
+
+import pygame
+
+HISTORY = 240              # 图表里保留的帧数，每帧 1 像素宽
+GRAPH_MS = 40              # 图表高度对应的毫秒数
+FRAME_BUDGET_MS = 1000 / 60
+PANEL_BG = (20, 20, 20)
+PHASE_COLORS = {
+    "wait": (70, 70, 70),
+    "events": (200, 120, 255),
+    "update": (80, 200, 80),
+    "draw": (80, 140, 255),
+    "profiler": (220, 220, 220),
+    "flip": (255, 160, 40),
+}
+OTHER_COLOR = (255, 80, 80)
+
+
+class FrameProfiler:
+    def __init__(self, trace_path=None):
+        self.overlay = False        # 是否显示帧时间图（F3）
+        self.trace_path = trace_path
+        self.trace = [] if trace_path else None  # (名称, 开始 us, 时长 us) 或 (计数 dict, 时间 us)
+        self.history = deque(maxlen=HISTORY)      # 每帧 (总耗时, {阶段: 耗时}, {计数})，单位秒
+        self._active = False
+        self._origin = time.perf_counter()
+        self._start = self._last = 0.0
+        self._phases = None
+        self._font = None
+
+    def toggle_overlay(self):
+        self.overlay = not self.overlay
+        if not self.overlay:
+            self.history.clear()
+
+    def begin(self):
+        self._active = self.overlay or self.trace is not None
+        if self._active:
+            self._start = self._last = time.perf_counter()
+            self._phases = {}
+
+    def mark(self, phase):
+        """上一个标记（或 begin()）到现在的时间记到 phase 上"""
+        if not self._active:
+            return
+        now = time.perf_counter()
+        self._phases[phase] = self._phases.get(phase, 0.0) + (now - self._last)
+        if self.trace is not None:
+            self.trace.append((phase, (self._last - self._origin) * 1e6, (now - self._last) * 1e6))
+        self._last = now
+
+    def end(self, **counts):
+        if not self._active:
+            return
+        self.history.append((self._last - self._start, self._phases, counts))
+        if self.trace is not None:
+            start = (self._start - self._origin) * 1e6
+            self.trace.append(("frame", start, (self._last - self._start) * 1e6))
+            if counts:
+                self.trace.append((counts, start))
+
+    def draw(self, surface):
+        """打开图表时在右上角画出最近每帧的分阶段耗时，返回画过的矩形；没打开时返回 None"""
+        if not (self._active and self.overlay):
+            return None
+        if self._font is None:
+            self._font = pygame.font.SysFont("arial", 14)
+        rect = pygame.Rect(surface.get_width() - HISTORY - 20, 10, HISTORY + 10, 130)
+        surface.fill(PANEL_BG, rect)
+
+        # 每帧一根竖条，按阶段分段堆叠，超出 GRAPH_MS 的部分裁掉
+        graph = pygame.Rect(rect.left, rect.top + 40, rect.width, rect.height - 45)
+        bottom = graph.bottom
+        scale = graph.height / GRAPH_MS
+        clip = surface.get_clip()
+        surface.set_clip(graph)
+        x = rect.right - 5 - len(self.history)
+        totals = {}
+        for frame_time, phases, _ in self.history:
+            y = bottom
+            for phase, seconds in phases.items():
+                totals[phase] = totals.get(phase, 0.0) + seconds
+                height = int(seconds * 1e3 * scale)
+                if height:
+                    surface.fill(PHASE_COLORS.get(phase, OTHER_COLOR), (x, y - height, 1, height))
+                    y -= height
+            x += 1
+        surface.set_clip(clip)
+        budget_y = bottom - int(FRAME_BUDGET_MS * scale)
+        pygame.draw.line(surface, (255, 255, 255), (rect.left + 5, budget_y), (rect.right - 5, budget_y))
+
+        # 文字：最近这些帧的平均耗时，以及上一帧的计数
+        frames = max(len(self.history), 1)
+        average = " ".join(f"{phase} {seconds / frames * 1e3:.2f}" for phase, seconds in totals.items()
+                           if phase != "wait")
+        frame_ms = sum(frame[0] for frame in self.history) / frames * 1e3
+        counts = self.history[-1][2] if self.history else {}
+        lines = (f"frame {frame_ms:.1f} ms  " + " ".join(f"{k} {v}" for k, v in counts.items()), average + " ms")
+        for i, text in enumerate(lines):
+            surface.blit(self._font.render(text, True, (255, 255, 255)), (rect.left + 5, rect.top + 4 + i * 17))
+        self.mark("profiler")
+        return rect
+
+    def save_trace(self, path=None):
+        """把录下的 trace 写成 Chrome trace JSON"""
+        path = path or self.trace_path
+        events = [{"name": "thread_name", "ph": "M", "pid": 1, "tid": 1, "args": {"name": "main loop"}}]
+        for item in self.trace:
+            if isinstance(item[0], dict):
+                events.append({"name": "counts", "ph": "C", "ts": item[1], "pid": 1, "tid": 1, "args": item[0]})
+            else:
+                name, start, duration = item
+                events.append({"name": name, "ph": "X", "ts": start, "dur": duration, "pid": 1, "tid": 1})
+        with open(path, "w") as fp:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, fp)
+
+    def close(self):
+        """录制 trace 时写入文件"""
+        if self.trace is not None:
+            self.save_trace()
@@ -0,0 +1,194 @@
+"""游戏录像：随机数种子 + 逐 tick 的输入，以及无头高速回放
+
+四个游戏（shootit、massquare、sanke、maze）的 Game 都满足同一个约定：
+    Game(seed=..., **options)   所有随机数都从 seed 派生
+    game.step(*inputs)          推进一个 tick，inputs 是这个 tick 的输入（若干个非负整数）
+    game.state_hash()           当前模拟状态的摘要（replay.state_hash 的返回值）
+同样的 seed 和输入序列总是得到同样的状态，所以录像只需要保存这两样东西，
+回放时不画画面、不限帧率，逐 tick 重新执行，最后核对状态摘要。
+
+文件布局（小端序）：
+    头部 32 字节：魔数 b"PGRP"、版本 u8、保留 u8、元数据长度 u16、seed u64、tick 数 u64、输入长度 u64
+    元数据：UTF-8 JSON {"game": 模块名, "options": Game 的参数}
+    状态摘要：32 字节 SHA-256，录制结束时的 game.state_hash()
+    输入：只在输入变化时写一条记录，每条记录是若干个 varint：
+          距离上一次变化的 tick 数、输入的个数、各个输入值
+          第一条记录之前的输入为空，最后一条记录之后的 tick 沿用最后的输入
+
+用法：python pythgames/replay.py 录像文件 [--repeat 3]
+"""
+import hashlib
+import importlib
+import json
+import struct
+import time
+
+MAGIC = b"PGRP"
+VERSION = 1
+HEADER = struct.Struct("<4sBBHQQQ")
+HASH_SIZE = 32
+
+
+def state_hash(*parts):
+    """把若干个状态量合成一个 SHA-256 摘要；bytes 类的直接使用，其余用 repr()"""
+    digest = hashlib.sha256()
+    for part in parts:
+        if not isinstance(part, (bytes, bytearray, memoryview)):
+            part = repr(part).encode()
+        digest.update(part)
+        digest.update(b"\x00")
+    return digest.digest()
+
+
+def _write_varint(out, n):
+    if n < 0:
+        raise ValueError(f"输入必须是非负整数：{n}")
+    while n >= 0x80:
+        out.append(n & 0x7F | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _read_varint(data, pos):
+    n = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        n |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return n, pos
+        shift += 7
+
+
+class Recorder:
+    """逐 tick 记录输入，结束时调用 save() 写入文件
+
+    每个 tick（包括输入为空的 tick）都要调用一次 record()，输入不变时不占空间。
+    """
+
+    def __init__(self, path, game, seed, **options):
+        self.path = path
+        self.game = game
+        self.seed = seed
+        self.options = options
+        self.ticks = 0
+        self.data = bytearray()
+        self._last = ()
+        self._changed = 0  # 上一次输入变化的 tick
+
+    def record(self, inputs):
+        if inputs != self._last:
+            _write_varint(self.data, self.ticks - self._changed)
+            _write_varint(self.data, len(inputs))
+            for value in inputs:
+                _write_varint(self.data, value)
+            self._last = inputs
+            self._changed = self.ticks
+        self.ticks += 1
+
+    def save(self, final_hash):
+        meta = json.dumps({"game": self.game, "options": self.options}).encode()
+        with open(self.path, "wb") as fp:
+            fp.write(HEADER.pack(MAGIC, VERSION, 0, len(meta), self.seed, self.ticks, len(self.data)))
+            fp.write(meta)
+            fp.write(final_hash)
+            fp.write(self.data)
+
+
+class Recording:
+    def __init__(self, game, seed, options, ticks, final_hash, data):
+        self.game = game
+        self.seed = seed
+        self.options = options
+        self.ticks = ticks
+        self.final_hash = final_hash
+        self.data = data
+
+    def inputs(self):
+        """逐 tick 产生输入元组，共 self.ticks 个"""
+        data = self.data
+        pos = tick = 0
+        current = ()
+        while pos < len(data):
+            gap, pos = _read_varint(data, pos)
+            for _ in range(gap):
+                yield current
+            tick += gap
+            count, pos = _read_varint(data, pos)
+            values = []
+            for _ in range(count):
+                value, pos = _read_varint(data, pos)
+                values.append(value)
+            current = tuple(values)
+        for _ in range(self.ticks - tick):
+            yield current
+
+
+def load(path):
+    with open(path, "rb") as fp:
+        raw = fp.read()
+    if len(raw) < HEADER.size:
+        raise ValueError(f"{path} 不是录像文件")
+    magic, version, _, meta_size, seed, ticks, data_size = HEADER.unpack_from(raw, 0)
+    if magic != MAGIC:
+        raise ValueError(f"{path} 不是录像文件")
+    if version != VERSION:
+        raise ValueError(f"不支持的录像文件版本：{version}")
+    pos = HEADER.size
+    if len(raw) < pos + meta_size + HASH_SIZE + data_size:
+        raise ValueError(f"{path} 已被截断")
+    meta = json.loads(raw[pos:pos + meta_size])
+    pos += meta_size
+    final_hash = raw[pos:pos + HASH_SIZE]
+    pos += HASH_SIZE
+    return Recording(meta["game"], seed, meta["options"], ticks, final_hash, raw[pos:pos + data_size])
+
+
+def create(recording):
+    """按录像的元数据创建游戏对象，状态和录制开始时相同"""
+    module = importlib.import_module(recording.game)
+    return module.Game(seed=recording.seed, **recording.options)
+
+
+def play(game, recording):
+    """不画画面、不限帧率，逐 tick 执行录像里的全部输入"""
+    step = game.step
+    for inputs in recording.inputs():
+        step(*inputs)
+
+
+def replay(recording):
+    """重新创建录像里的游戏并执行全部输入，返回游戏对象"""
+    game = create(recording)
+    play(game, recording)
+    return game
+
+
+def main():
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", help="游戏用 --record 录下的文件")
+    parser.add_argument("--repeat", type=int, default=1, help="回放几遍，每一遍的结果都要一致")
+    args = parser.parse_args()
+
+    recording = load(args.path)
+    print(f"{recording.game} seed={recording.seed} options={recording.options} "
+          f"{recording.ticks} ticks，输入 {len(recording.data)} 字节")
+    ok = True
+    for _ in range(args.repeat):
+        game = create(recording)
+        start = time.perf_counter()
+        play(game, recording)
+        elapsed = time.perf_counter() - start
+        final_hash = game.state_hash()
+        match = final_hash == recording.final_hash
+        ok = ok and match
+        print(f"回放 {elapsed:.3f}s，{recording.ticks / max(elapsed, 1e-9):.0f} ticks/s，"
+              f"状态摘要 {final_hash.hex()[:16]} {'一致' if match else '不一致，录制时为 ' + recording.final_hash.hex()[:16]}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""四个游戏共用的运行环境：pygame 初始化、窗口、时钟和字体
+
+导入游戏模块时不初始化 pygame、不打开窗口，第一次调用 get() 时才创建 Runtime。
+游戏在 Game.open() 里取得运行环境、设置窗口大小和标题；只调用 step() 的回放、无头模拟和基准测试
+用不到窗口，也就不会打开它。SysFont 要扫描系统字体，所以字体按 (名称, 字号) 缓存，每种只建一次。
+launcher.py 把窗口固定下来（fixed = True），比窗口小的游戏画在窗口左上角的子 Surface 上，
+切换游戏时不用重新 set_mode()。
+
+用法：
+    rt = runtime.get()
+    screen = rt.display((800, 600), "标题")
+    font = rt.font("arial", 36)
+    rt.clock.tick(FPS)
+"""
+import pygame
+
+
+class Runtime:
+    def __init__(self):
+        pygame.init()
+        self.clock = pygame.time.Clock()
+        self.screen = None
+        self.fixed = False  # 窗口放得下时不改变窗口大小
+        self._fonts = {}
+        self._views = {}    # 大小 -> 窗口左上角的子 Surface
+
+    def display(self, size, caption=None):
+        """返回 size 大小的画布：窗口大小不同时重新 set_mode()，返回窗口的 Surface；
+        fixed 为 True 且窗口放得下时不改变窗口，返回窗口左上角的子 Surface"""
+        size = tuple(size)
+        screen = self.screen
+        if screen is None or screen.get_size() != size and not (
+                self.fixed and screen.get_width() >= size[0] and screen.get_height() >= size[1]):
+            screen = self.screen = pygame.display.set_mode(size)
+            self._views.clear()
+        if caption is not None:
+            pygame.display.set_caption(caption)
+        if screen.get_size() == size:
+            return screen
+        view = self._views.get(size)
+        if view is None:
+            view = self._views[size] = screen.subsurface((0, 0) + size)
+        return view
+
+    def font(self, name, size):
+        key = (name.lower(), size)
+        font = self._fonts.get(key)
+        if font is None:
+            font = self._fonts[key] = pygame.font.SysFont(name, size)
+        return font
+
+
+_runtime = None
+
+
+def get():
+    """返回共用的 Runtime，第一次调用时初始化 pygame"""
+    global _runtime
+    if _runtime is None:
+        _runtime = Runtime()
+    return _runtime
+
+
+def shutdown():
+    """关闭窗口、退出 pygame；之后再调用 get() 会重新初始化"""
+    global _runtime
+    _runtime = None
+    pygame.quit()
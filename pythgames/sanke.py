@@ -1,6 +1,13 @@
 import pygame
 import random
 import sys
+from array import array
+from collections import deque
+
+import profiler
+import replay
+import runtime
+import snakeai
 
 # --- 配置常量 ---
 WIDTH, HEIGHT = 600, 600
@@ -8,6 +15,7 @@ CELL_SIZE = 20
 GRID_WIDTH = WIDTH // CELL_SIZE
 GRID_HEIGHT = HEIGHT // CELL_SIZE
 FPS = 10  # 控制游戏速度
+CAPTION = "🐍 贪吃蛇 - Pygame 版"
 
 # 颜色定义
 COLOR_BG = (30, 30, 30)
@@ -23,19 +31,78 @@ DOWN = (0, 1)
 LEFT = (-1, 0)
 RIGHT = (1, 0)
 
+class FreeCells:
+    """棋盘上所有空格子的集合，增删和均匀随机抽取都是 O(1)
+
+    cells 是空格子一维下标的紧凑数组，index[i] 是格子 i 在 cells 中的位置（被占用时为 -1）。
+    删除时把最后一个元素换到被删的位置上再弹出末尾。
+    """
+
+    def __init__(self, size):
+        self.cells = array('i', range(size))
+        self.index = array('i', range(size))
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __contains__(self, i):
+        return self.index[i] >= 0
+
+    def remove(self, i):
+        pos = self.index[i]
+        last = self.cells.pop()
+        if last != i:
+            self.cells[pos] = last
+            self.index[last] = pos
+        self.index[i] = -1
+
+    def add(self, i):
+        self.index[i] = len(self.cells)
+        self.cells.append(i)
+
+    def choice(self, rng=random):
+        """均匀随机取一个空格子，没有空格子时返回 None"""
+        if not self.cells:
+            return None
+        return self.cells[rng.randrange(len(self.cells))]
+
 class Snake:
-    def __init__(self):
+    def __init__(self, cols=GRID_WIDTH, rows=GRID_HEIGHT):
+        self.cols = cols
+        self.rows = rows
         self.reset()
     
     def reset(self):
         # 蛇身初始位置（从中间开始）
-        start_x = GRID_WIDTH // 2
-        start_y = GRID_HEIGHT // 2
-        self.body = [(start_x, start_y), 
-                     (start_x - 1, start_y), 
-                     (start_x - 2, start_y)]
+        start_x = self.cols // 2
+        start_y = self.rows // 2
+        self.set_body([(start_x, start_y),
+                       (start_x - 1, start_y),
+                       (start_x - 2, start_y)])
         self.direction = RIGHT
         self.grow = False  # 是否要生长
+
+    def set_body(self, cells):
+        """用给定的格子序列（头在前）替换蛇身，并重建占用表和空格子索引"""
+        # 蛇身用 deque 保存，头部插入和尾部删除都是 O(1)
+        self.body = deque(cells)
+        # 占用表：每格一个计数，记录有几节蛇身在这一格上，撞自己检测只需看头部这一格
+        self.occupied = bytearray(self.cols * self.rows)
+        # 空格子索引随蛇的移动同步更新，生成食物时直接从中抽取
+        self.free = FreeCells(self.cols * self.rows)
+        for x, y in self.body:
+            self._occupy(x, y, 1)
+
+    def _occupy(self, x, y, delta):
+        # 出界的格子不记录，撞墙由 check_collision 负责
+        if 0 <= x < self.cols and 0 <= y < self.rows:
+            i = y * self.cols + x
+            count = self.occupied[i]
+            if count == 0 and delta > 0:
+                self.free.remove(i)
+            elif count == 1 and delta < 0:
+                self.free.add(i)
+            self.occupied[i] = count + delta
     
     def move(self):
         # 计算新头部位置
@@ -44,11 +111,13 @@ class Snake:
         new_head = (head_x + dir_x, head_y + dir_y)
         
         # 插入新头部
-        self.body.insert(0, new_head)
+        self.body.appendleft(new_head)
+        self._occupy(new_head[0], new_head[1], 1)
         
         # 如果不生长，移除尾部
         if not self.grow:
-            self.body.pop()
+            tail_x, tail_y = self.body.pop()
+            self._occupy(tail_x, tail_y, -1)
         else:
             self.grow = False  # 生长后重置标志
     
@@ -62,13 +131,13 @@ class Snake:
         head = self.body[0]
         
         # 撞墙检测
-        if head[0] < 0 or head[0] >= GRID_WIDTH:
+        if head[0] < 0 or head[0] >= self.cols:
             return True
-        if head[1] < 0 or head[1] >= GRID_HEIGHT:
+        if head[1] < 0 or head[1] >= self.rows:
             return True
         
-        # 撞自己检测（从第二节开始检查）
-        if head in self.body[1:]:
+        # 撞自己检测：头部所在格子上还有别的蛇身
+        if self.occupied[head[1] * self.cols + head[0]] > 1:
             return True
         
         return False
@@ -82,159 +151,369 @@ class Snake:
             pygame.draw.rect(surface, color, rect)
 
 class Food:
-    def __init__(self):
+    def __init__(self, snake=None, rng=random):
         self.position = (0, 0)
-        self.spawn()
+        self.spawn(snake, rng)
     
-    def spawn(self, snake_body=None):
-        # 随机生成食物，确保不在蛇身上
-        while True:
-            x = random.randint(0, GRID_WIDTH - 1)
-            y = random.randint(0, GRID_HEIGHT - 1)
-            if snake_body is None or (x, y) not in snake_body:
-                self.position = (x, y)
-                break
+    def spawn(self, snake=None, rng=random):
+        """随机生成食物，确保不在蛇身上；棋盘已经被蛇占满时返回 False，position 为 None"""
+        if snake is None:
+            self.position = (rng.randint(0, GRID_WIDTH - 1), rng.randint(0, GRID_HEIGHT - 1))
+            return True
+        # 从空格子索引里均匀抽取一个，O(1)
+        i = snake.free.choice(rng)
+        if i is None:
+            self.position = None
+            return False
+        self.position = (i % snake.cols, i // snake.cols)
+        return True
     
     def draw(self, surface):
+        if self.position is None:
+            return
         x, y = self.position
         rect = pygame.Rect(x * CELL_SIZE + 2, y * CELL_SIZE + 2, 
                          CELL_SIZE - 4, CELL_SIZE - 4)
         pygame.draw.rect(surface, COLOR_FOOD, rect)
 
+# step() 的结果
+MOVED, ATE, DIED, WON = range(4)
+
+def step(snake, food, rng=random):
+    """推进一步游戏逻辑（不涉及 pygame），返回 MOVED / ATE / DIED / WON"""
+    # 移动蛇
+    snake.move()
+    
+    # 检查碰撞
+    if snake.check_collision():
+        return DIED
+    
+    # 检查是否吃到食物
+    if snake.body[0] == food.position:
+        snake.grow = True
+        if not food.spawn(snake, rng):
+            # 没有空格子可以放食物了：蛇占满了棋盘，获胜
+            return WON
+        return ATE
+    return MOVED
+
+# 一帧里按下的键，Game.step() 按顺序执行；录像里每帧记录的就是这些编号
+CMD_UP, CMD_DOWN, CMD_LEFT, CMD_RIGHT, CMD_SPACE, CMD_AUTOPILOT = range(1, 7)
+KEY_COMMANDS = {
+    pygame.K_UP: CMD_UP, pygame.K_w: CMD_UP,
+    pygame.K_DOWN: CMD_DOWN, pygame.K_s: CMD_DOWN,
+    pygame.K_LEFT: CMD_LEFT, pygame.K_a: CMD_LEFT,
+    pygame.K_RIGHT: CMD_RIGHT, pygame.K_d: CMD_RIGHT,
+    pygame.K_SPACE: CMD_SPACE,
+    pygame.K_p: CMD_AUTOPILOT,
+}
+COMMAND_DIRECTIONS = {CMD_UP: UP, CMD_DOWN: DOWN, CMD_LEFT: LEFT, CMD_RIGHT: RIGHT}
+
 class Game:
-    def __init__(self):
-        pygame.init()
-        self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
-        pygame.display.set_caption("🐍 贪吃蛇 - Pygame 版")
-        self.clock = pygame.time.Clock()
-        self.font = pygame.font.SysFont("Arial", 24)
-        self.big_font = pygame.font.SysFont("Arial", 48)
+    def __init__(self, seed=None, cols=GRID_WIDTH, rows=GRID_HEIGHT):
+        # 窗口大小跟着棋盘大小走，默认 30x30 格
+        self.width = cols * CELL_SIZE
+        self.height = rows * CELL_SIZE
+        self.screen = None  # 窗口、时钟和字体在 open() 里从 runtime 取得
         
-        self.snake = Snake()
-        self.food = Food()
+        # 食物位置都从 self.rng 抽取，同样的 seed 和按键序列总是得到同样的一局（见 replay.py）
+        self.seed = seed if seed is not None else random.getrandbits(32)
+        self.rng = random.Random(self.seed)
+        self.commands = []     # 这一帧收到的按键命令，由 step() 执行
+        self.recorder = None   # replay.Recorder，录制时逐帧记录命令
+        self.profiler = profiler.FrameProfiler()  # 逐帧分阶段计时，F3 显示帧时间图
+        self.snake = Snake(cols, rows)
+        self.food = Food(self.snake, self.rng)
         self.score = 0
         self.high_score = 0
         self.game_over = False
+        self.won = False  # 蛇占满整个棋盘
         self.paused = False
+        self.autopilot = None  # 按 P 开启自动驾驶（snakeai.Autopilot）
+
+        # 脏矩形渲染：背景和网格预先画好，平时每帧只重画发生变化的格子
+        self.background = self.render_background()
+        self.dirty = set()        # 这一帧需要重画的格子
+        self.full_redraw = True   # 暂停、结束、重新开始等整屏变化时整屏重画
+        self._hud_key = None
+        self._hud = []            # 缓存的分数文字：[(Surface, 位置)]
+        self._hud_rect = pygame.Rect(0, 0, 0, 0)
+        self.update_rects = []     # draw() 画过、等待 present() 提交的矩形
+        self.flip_pending = False  # draw() 整屏重画过，present() 要整屏提交
     
+    def open(self):
+        """取得共用的窗口、时钟和字体（runtime.get()），窗口大小跟着棋盘走；draw() 之前调用，只调用 step() 时不需要"""
+        rt = runtime.get()
+        self.screen = rt.display((self.width, self.height), CAPTION)
+        self.clock = rt.clock
+        self.font = rt.font("Arial", 24)
+        self.big_font = rt.font("Arial", 48)
+        self.full_redraw = True  # 窗口里原来的内容不是这一局的
+
     def handle_events(self):
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 return False
+            if event.type == pygame.VIDEOEXPOSE:
+                self.full_redraw = True
             
             if event.type == pygame.KEYDOWN:
-                if self.game_over:
-                    if event.key == pygame.K_SPACE:
-                        self.restart()
-                    elif event.key == pygame.K_ESCAPE:
-                        return False
-                else:
-                    if event.key == pygame.K_UP or event.key == pygame.K_w:
-                        self.snake.change_direction(UP)
-                    elif event.key == pygame.K_DOWN or event.key == pygame.K_s:
-                        self.snake.change_direction(DOWN)
-                    elif event.key == pygame.K_LEFT or event.key == pygame.K_a:
-                        self.snake.change_direction(LEFT)
-                    elif event.key == pygame.K_RIGHT or event.key == pygame.K_d:
-                        self.snake.change_direction(RIGHT)
-                    elif event.key == pygame.K_SPACE:
-                        self.paused = not self.paused
-                    elif event.key == pygame.K_ESCAPE:
-                        return False
+                if event.key == pygame.K_ESCAPE:
+                    return False
+                if event.key == pygame.K_F3:
+                    # 帧时间图只画在脏矩形上面，关掉时整屏重画把它擦掉
+                    self.profiler.toggle_overlay()
+                    self.full_redraw = True
+                if event.key in KEY_COMMANDS:
+                    self.commands.append(KEY_COMMANDS[event.key])
         
         return True
+
+    def step(self, *commands):
+        """推进一帧：按顺序执行这一帧的按键命令，再更新游戏逻辑"""
+        for command in commands:
+            if self.game_over:
+                if command == CMD_SPACE:
+                    self.restart()
+            elif command in COMMAND_DIRECTIONS:
+                self.snake.change_direction(COMMAND_DIRECTIONS[command])
+            elif command == CMD_SPACE:
+                self.paused = not self.paused
+                self.full_redraw = True
+            elif command == CMD_AUTOPILOT:
+                self.toggle_autopilot()
+        self.update()
+
+    def state_hash(self):
+        """游戏状态的摘要，回放时核对用"""
+        snake = self.snake
+        return replay.state_hash(tuple(snake.body), snake.direction, snake.grow, self.food.position,
+                                 self.score, self.high_score, self.game_over, self.won, self.paused,
+                                 self.autopilot is not None, self.rng.getstate())
     
     def update(self):
         if self.game_over or self.paused:
             return
         
-        # 移动蛇
-        self.snake.move()
-        
-        # 检查碰撞
-        if self.snake.check_collision():
-            self.game_over = True
-            if self.score > self.high_score:
-                self.high_score = self.score
-            return
-        
-        # 检查是否吃到食物
-        if self.snake.body[0] == self.food.position:
-            self.snake.grow = True
+        if self.autopilot is not None:
+            self.snake.change_direction(self.autopilot.next_direction(self.snake, self.food.position))
+        # 一步之内只有旧头、新头、尾巴和食物所在的格子可能变化
+        snake = self.snake
+        self.dirty.update((snake.body[0], snake.body[-1], self.food.position))
+        result = step(self.snake, self.food, self.rng)
+        self.dirty.update((snake.body[0], self.food.position))
+        if result == DIED:
+            self.end_game()
+        elif result != MOVED:
             self.score += 10
-            self.food.spawn(self.snake.body)
+            if result == WON:
+                self.end_game(won=True)
+
+    def toggle_autopilot(self):
+        if self.autopilot is None:
+            self.autopilot = snakeai.Autopilot(self.snake.cols, self.snake.rows)
+        else:
+            self.autopilot = None
+
+    def end_game(self, won=False):
+        self.game_over = True
+        self.won = won
+        self.full_redraw = True
+        if self.score > self.high_score:
+            self.high_score = self.score
     
-    def draw(self):
-        self.screen.fill(COLOR_BG)
+    def render_background(self):
+        """背景和网格线只画一次"""
+        background = pygame.Surface((self.width, self.height))
+        background.fill(COLOR_BG)
         
         # 绘制网格（可选，帮助视觉）
-        for x in range(0, WIDTH, CELL_SIZE):
-            pygame.draw.line(self.screen, (40, 40, 40), 
-                           (x, 0), (x, HEIGHT))
-        for y in range(0, HEIGHT, CELL_SIZE):
-            pygame.draw.line(self.screen, (40, 40, 40), 
-                           (0, y), (WIDTH, y))
+        for x in range(0, self.width, CELL_SIZE):
+            pygame.draw.line(background, (40, 40, 40), 
+                           (x, 0), (x, self.height))
+        for y in range(0, self.height, CELL_SIZE):
+            pygame.draw.line(background, (40, 40, 40), 
+                           (0, y), (self.width, y))
+        return background
+
+    def update_hud(self):
+        """分数变化时才重新渲染文字，返回文字区域是否变化"""
+        key = (self.score, self.high_score, self.autopilot is not None)
+        if key == self._hud_key:
+            return False
+        lines = [f"分数：{self.score}", f"最高分：{self.high_score}"]
+        if self.autopilot is not None:
+            lines.append("自动驾驶中（按 P 关闭）")
+        self._hud = [(self.font.render(text, True, COLOR_TEXT), (10, 10 + i * 30))
+                     for i, text in enumerate(lines)]
+        self._hud_key = key
+        return True
+
+    def hud_bounds(self):
+        rects = [surf.get_rect(topleft=pos) for surf, pos in self._hud]
+        return rects[0].unionall(rects[1:])
+
+    def paint_cell(self, x, y):
+        """用背景盖住一个格子，再画上格子里的食物或蛇身，返回格子的矩形"""
+        rect = pygame.Rect(x * CELL_SIZE, y * CELL_SIZE, CELL_SIZE, CELL_SIZE)
+        self.screen.blit(self.background, rect, rect)
+        if self.food.position == (x, y):
+            self.food.draw(self.screen)
+        if self.snake.occupied[y * self.snake.cols + x]:
+            color = COLOR_SNAKE_HEAD if self.snake.body[0] == (x, y) else COLOR_SNAKE
+            pygame.draw.rect(self.screen, color, (rect.x, rect.y, CELL_SIZE - 1, CELL_SIZE - 1))
+        return rect
+
+    def draw(self):
+        if self.full_redraw:
+            self.draw_full()
+        elif not (self.game_over or self.paused):
+            # 暂停和结束画面是静止的，整屏画过一次之后不用再画
+            self.draw_dirty()
+
+    def draw_dirty(self):
+        """只重画变化的格子，present() 用 display.update 提交这些矩形，开销与蛇长无关"""
+        cols, rows = self.snake.cols, self.snake.rows
+        rects = [self.paint_cell(x, y) for x, y in (cell for cell in self.dirty if cell is not None)
+                 if 0 <= x < cols and 0 <= y < rows]
+        self.dirty.clear()
+
+        # 文字压在格子上面：文字变了，或者下面的格子被重画了，就把文字区域整块重画
+        old_hud = self._hud_rect
+        if self.update_hud() or old_hud.collidelist(rects) >= 0:
+            hud_rect = old_hud.union(self.hud_bounds())
+            self.screen.blit(self.background, hud_rect, hud_rect)
+            for y in range(hud_rect.top // CELL_SIZE, min(rows, hud_rect.bottom // CELL_SIZE + 1)):
+                for x in range(hud_rect.left // CELL_SIZE, min(cols, hud_rect.right // CELL_SIZE + 1)):
+                    self.paint_cell(x, y)
+            self.screen.blits(self._hud, doreturn=False)
+            self._hud_rect = hud_rect
+            rects.append(hud_rect)
+
+        self.update_rects = rects
+
+    def draw_full(self):
+        self.screen.blit(self.background, (0, 0))
         
         # 绘制游戏对象
         self.food.draw(self.screen)
         self.snake.draw(self.screen)
         
         # 绘制分数
-        score_text = self.font.render(f"分数：{self.score}", True, COLOR_TEXT)
-        high_score_text = self.font.render(f"最高分：{self.high_score}", True, COLOR_TEXT)
-        self.screen.blit(score_text, (10, 10))
-        self.screen.blit(high_score_text, (10, 40))
+        self.update_hud()
+        self.screen.blits(self._hud, doreturn=False)
+        self._hud_rect = self.hud_bounds()
+        self.dirty.clear()
+        self.full_redraw = False
         
         # 游戏结束画面
         if self.game_over:
-            overlay = pygame.Surface((WIDTH, HEIGHT))
+            overlay = pygame.Surface((self.width, self.height))
             overlay.set_alpha(150)
             overlay.fill((0, 0, 0))
             self.screen.blit(overlay, (0, 0))
             
-            game_over_text = self.big_font.render("游戏结束!", True, COLOR_GAME_OVER)
+            if self.won:
+                game_over_text = self.big_font.render("你赢了!", True, COLOR_SNAKE)
+            else:
+                game_over_text = self.big_font.render("游戏结束!", True, COLOR_GAME_OVER)
             restart_text = self.font.render("按 SPACE 重新开始", True, COLOR_TEXT)
             quit_text = self.font.render("按 ESC 退出", True, COLOR_TEXT)
             
             self.screen.blit(game_over_text, 
-                           (WIDTH//2 - game_over_text.get_width()//2, HEIGHT//2 - 60))
+                           (self.width//2 - game_over_text.get_width()//2, self.height//2 - 60))
             self.screen.blit(restart_text, 
-                           (WIDTH//2 - restart_text.get_width()//2, HEIGHT//2))
+                           (self.width//2 - restart_text.get_width()//2, self.height//2))
             self.screen.blit(quit_text, 
-                           (WIDTH//2 - quit_text.get_width()//2, HEIGHT//2 + 40))
+                           (self.width//2 - quit_text.get_width()//2, self.height//2 + 40))
         
         # 暂停画面
         if self.paused and not self.game_over:
-            overlay = pygame.Surface((WIDTH, HEIGHT))
+            overlay = pygame.Surface((self.width, self.height))
             overlay.set_alpha(100)
             overlay.fill((0, 0, 0))
             self.screen.blit(overlay, (0, 0))
             
             pause_text = self.big_font.render("已暂停", True, COLOR_TEXT)
             self.screen.blit(pause_text, 
-                           (WIDTH//2 - pause_text.get_width()//2, HEIGHT//2))
+                           (self.width//2 - pause_text.get_width()//2, self.height//2))
         
-        pygame.display.flip()
+        self.flip_pending = True
+
+    def present(self):
+        """把 draw() 画好的内容提交给窗口：整屏重画过就 flip，否则只更新脏矩形"""
+        if self.flip_pending:
+            pygame.display.flip()
+        elif self.update_rects:
+            pygame.display.update(self.update_rects)
+        self.flip_pending = False
+        self.update_rects = []
     
     def restart(self):
         self.snake.reset()
-        self.food.spawn()
+        self.food.spawn(self.snake, self.rng)
         self.score = 0
         self.game_over = False
+        self.won = False
         self.paused = False
+        self.full_redraw = True
+        if self.autopilot is not None:
+            self.autopilot.reset()
     
+    def frame(self):
+        """主循环的一帧：处理按键、推进一步、画出并提交画面、限制帧率；返回是否继续运行"""
+        prof = self.profiler
+        prof.begin()
+        running = self.handle_events()
+        prof.mark("events")
+        commands = tuple(self.commands)
+        self.commands.clear()
+        if self.recorder is not None:
+            self.recorder.record(commands)
+        self.step(*commands)
+        prof.mark("update")
+        self.draw()
+        prof.mark("draw")
+        overlay = prof.draw(self.screen)
+        if overlay is not None:
+            self.update_rects.append(overlay)
+        self.present()
+        prof.mark("flip")
+        self.clock.tick(FPS)
+        prof.mark("wait")
+        prof.end(length=len(self.snake.body))
+        return running
+
+    def close(self):
+        """结束时保存录像和 trace"""
+        if self.recorder is not None:
+            self.recorder.save(self.state_hash())
+        self.profiler.close()
+
     def run(self):
-        running = True
-        while running:
-            running = self.handle_events()
-            self.update()
-            self.draw()
-            self.clock.tick(FPS)
-        
-        pygame.quit()
+        self.open()
+        while self.frame():
+            pass
+        self.close()
+        runtime.shutdown()
         sys.exit()
 
 # --- 主程序入口 ---
 if __name__ == "__main__":
-    game = Game()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="贪吃蛇")
+    parser.add_argument("--seed", type=int, help="随机数种子，种子和按键相同时每一局都相同")
+    parser.add_argument("--record", metavar="FILE", help="把这一局的种子和按键录制到文件，用 replay.py 回放")
+    parser.add_argument("--size", type=int, nargs=2, default=(GRID_WIDTH, GRID_HEIGHT), metavar=("COLS", "ROWS"),
+                        help="棋盘大小（格数），窗口随之变化")
+    parser.add_argument("--trace", metavar="FILE",
+                        help="把每帧各阶段的耗时和蛇长写成 Chrome trace JSON（游戏中按 F3 显示帧时间图）")
+    args = parser.parse_args()
+    cols, rows = args.size
+    game = Game(args.seed, cols, rows)
+    if args.record:
+        game.recorder = replay.Recorder(args.record, "sanke", game.seed, cols=cols, rows=rows)
+    if args.trace:
+        game.profiler = profiler.FrameProfiler(args.trace)
     game.run()
\ No newline at end of file
@@ -2,13 +2,17 @@ import pygame
 import random
 import sys
 
-# --- 初始化 ---
-pygame.init()
+import entities
+import profiler
+import replay
+import runtime
+import timestep
 
 # --- 常量设置 ---
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
-FPS = 60
+FPS = 60          # 渲染帧率上限
+TICK_RATE = 60    # 模拟每秒推进的 tick 数，下面的速度、间隔、冷却都以 tick 为单位
 
 # 颜色定义 (R, G, B)
 WHITE = (255, 255, 255)
@@ -22,24 +26,36 @@ PLAYER_SIZE = 50
 PLAYER_SPEED = 7
 ENEMY_SIZE = 40
 ENEMY_SPEED = 5
-ENEMY_SPAWN_RATE = 30  # 敌人生成频率
+ENEMY_SPAWN_RATE = 30  # 敌人生成频率 (tick 间隔)
 WIN_TIME = 10         # 胜利所需时间 (秒)
 
 # 子弹设置
 BULLET_SIZE = 10
 BULLET_SPEED = 10
-SHOOT_COOLDOWN = 15    # 射击冷却帧数 (数值越大射得越慢)
+SHOOT_COOLDOWN = 15    # 射击冷却 tick 数 (数值越大射得越慢)
 
-# 设置屏幕
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-pygame.display.set_caption("绿色方块射击生存战")
-clock = pygame.time.Clock()
-font = pygame.font.SysFont("arial", 36)
-big_font = pygame.font.SysFont("arial", 72)
+# 碰撞检测的空间哈希 (entities.SpatialHash) 格子边长 (像素)，取敌人大小附近的值，一个敌人最多覆盖 2x2 个格子
+GRID_CELL = 64
+
+# 弹幕模式 (--bullet-hell)：上万个小敌人，保存在 entities.EntityStore 里整批计算，需要 numpy。
+# 被敌人碰到不会结束游戏，只记录被击中的次数
+HELL_ENEMY_SIZE = 8
+HELL_ENEMY_SPEED = (1.5, 4.0)  # 敌人下落速度的范围
+HELL_SPAWN = 50        # 每个 tick 生成的敌人数
+HELL_SPREAD = 7        # 每次射击扇形发出的子弹数
+HELL_COOLDOWN = 3
+HELL_HITBOX = 6        # 玩家的判定框边长，位于玩家方块中央
+HELL_MARGIN = 50       # 实体离开屏幕超过这么多像素后删除
+
+# 一个 tick 的输入，按住的键按位组合；RESTART 是结算画面上按下的 R 键
+LEFT, RIGHT, UP, DOWN, SHOOT, RESTART = 1, 2, 4, 8, 16, 32
+
+# 窗口标题；窗口、时钟和字体由 Game.open() 从 runtime 取得，导入模块时不打开窗口
+CAPTION = "绿色方块射击生存战"
 
 # --- 函数定义 ---
 
-def draw_text(text, font, color, x, y, center=False):
+def draw_text(screen, text, font, color, x, y, center=False):
     surface = font.render(text, True, color)
     rect = surface.get_rect()
     if center:
@@ -47,140 +63,381 @@ def draw_text(text, font, color, x, y, center=False):
     else:
         rect.topleft = (x, y)
     screen.blit(surface, rect)
+    return rect
+
+def update_entities(enemies, bullets, player_rect, grid):
+    """移动子弹和敌人并处理碰撞，返回 (击落的敌人数, 玩家是否被撞到)
+
+    enemies 和 bullets 是 entities.EntityPool，实体的 Rect 原地更新，热身之后不再创建对象。
+    子弹每个 tick 登记进空间哈希，每个敌人只和它附近格子里的子弹比较；
+    一个敌人同时碰到多颗子弹时，消耗列表中最靠前的那颗。
+    """
+    # --- 子弹移动，移除超出屏幕顶部的子弹 ---
+    for bullet in bullets:
+        bullet.rect.y -= BULLET_SPEED # 子弹向上飞
+        if bullet.rect.y < -BULLET_SIZE:
+            bullet.alive = False
+    bullets.compact()
+
+    grid.clear()
+    items = bullets.items
+    for i in range(len(bullets)):
+        grid.insert(i, items[i].rect)
+
+    # --- 敌人移动与碰撞检测 ---
+    hits = 0
+    player_hit = False
+    for enemy in enemies:
+        rect = enemy.rect
+        rect.y += ENEMY_SPEED # 敌人向下落
+
+        # 1. 玩家碰到敌人 -> 游戏结束
+        if player_rect.colliderect(rect):
+            player_hit = True
+
+        # 2. 子弹碰到敌人 -> 敌人和子弹都消失
+        hit = grid.first_hit(rect, items)
+        if hit >= 0:
+            items[hit].alive = False
+            enemy.alive = False
+            hits += 1
+        elif rect.y > SCREEN_HEIGHT:
+            # 移除超出屏幕底部的敌人
+            enemy.alive = False
 
-def reset_game():
-    player_x = SCREEN_WIDTH // 2 - PLAYER_SIZE // 2
-    player_y = SCREEN_HEIGHT - 100
-    enemies = []
-    bullets = []
-    start_ticks = pygame.time.get_ticks()
-    state = "PLAYING"
-    score = 0
-    cooldown = 0
-    return player_x, player_y, enemies, bullets, start_ticks, state, score, cooldown
+    bullets.compact()
+    enemies.compact()
+    return hits, player_hit
+
+def update_bullet_hell(enemies, bullets, player_x, player_y):
+    """弹幕模式下的 update_entities，enemies 和 bullets 是 EntityStore，每一步都是整批运算
+
+    返回 (击落的敌人数, 碰到玩家判定框的敌人数)，碰到玩家的敌人也会消失。
+    """
+    bullets.move()
+    enemies.move()
+    bounds = (-HELL_MARGIN, -HELL_MARGIN, SCREEN_WIDTH + HELL_MARGIN, SCREEN_HEIGHT + HELL_MARGIN)
+    bullets.cull(*bounds)
+    enemies.cull(*bounds)
+
+    hit_enemies, hit_bullets = enemies.collide(bullets)
+    enemies.remove(hit_enemies)
+    bullets.remove(hit_bullets)
+
+    offset = (PLAYER_SIZE - HELL_HITBOX) // 2
+    touching = enemies.overlaps(player_x + offset, player_y + offset, HELL_HITBOX, HELL_HITBOX)
+    enemies.remove(touching)
+    return int(hit_enemies.sum()), int(touching.sum())
 
 # --- 主程序 ---
 
-def main():
-    player_x, player_y, enemies, bullets, start_ticks, state, score, cooldown = reset_game()
-    spawn_timer = 0
-    running = True
+def read_buttons():
+    """把当前按住的键转换成一个 tick 的输入位"""
+    keys = pygame.key.get_pressed()
+    buttons = 0
+    if keys[pygame.K_a] or keys[pygame.K_LEFT]:
+        buttons |= LEFT
+    if keys[pygame.K_d] or keys[pygame.K_RIGHT]:
+        buttons |= RIGHT
+    if keys[pygame.K_w] or keys[pygame.K_UP]:
+        buttons |= UP
+    if keys[pygame.K_s] or keys[pygame.K_DOWN]:
+        buttons |= DOWN
+    if keys[pygame.K_SPACE]:
+        buttons |= SHOOT
+    return buttons
+
+class Game:
+    """一局游戏的全部状态：step() 按固定的 tick 推进模拟，draw() 只负责画面
+
+    模拟只依赖输入和 seed，不读时钟，所以同样的 seed 和输入序列总是得到同样的结果（可以录制回放，见 replay.py）；
+    run() 用 timestep.FixedTimestep 按真实时间决定每帧模拟几个 tick，run_headless() 不画画面、尽快模拟。
+    """
+
+    def __init__(self, bullet_hell=False, dirty=False, seed=None):
+        self.bullet_hell = bullet_hell
+        self.seed = seed if seed is not None else random.getrandbits(32)
+        self.rng = random.Random(self.seed)
+        self.pending = 0      # 事件处理得到的命令（RESTART），并入下一个 tick 的输入
+        self.recorder = None  # replay.Recorder，录制时逐 tick 记录输入
+        self.grid = entities.SpatialHash(SCREEN_WIDTH, SCREEN_HEIGHT, GRID_CELL)
+        self.dirty_rects = entities.DirtyRects() if dirty else None
+        self.timestep = timestep.FixedTimestep(TICK_RATE)
+        self.profiler = profiler.FrameProfiler()  # 逐帧分阶段计时，F3 显示帧时间图
+        self.screen = None    # open() 之后才有窗口
+        self.reset()
+
+    def open(self):
+        """取得共用的窗口、时钟和字体（runtime.get()），准备好画面用的图像；draw() 之前调用，只调用 step() 时不需要"""
+        rt = runtime.get()
+        self.screen = rt.display((SCREEN_WIDTH, SCREEN_HEIGHT), CAPTION)
+        self.clock = rt.clock
+        self.font = rt.font("arial", 36)
+        self.big_font = rt.font("arial", 72)
+        # 从别的场景切回来时：离开期间的时间不模拟，窗口里原来的内容要整屏更新
+        self.timestep.reset()
+        if self.dirty_rects is not None:
+            self.dirty_rects.invalidate()
+        # 预先画好的方块，每种实体一次 blits 画完
+        self.player_image = entities.sprite(GREEN, PLAYER_SIZE, PLAYER_SIZE)
+        self.enemy_image = entities.sprite(RED, self.enemies.width, self.enemies.height)
+        self.bullet_image = entities.sprite(YELLOW, BULLET_SIZE, BULLET_SIZE)
+        self.player_view = pygame.Rect(0, 0, PLAYER_SIZE, PLAYER_SIZE)  # 画玩家的位置，每帧原地改写
+        self.player_blit = ((self.player_image, self.player_view),)
+        # HUD 的文字缓存在 Label 里，显示的值变了才重新 render
+        self.time_label = entities.Label(self.font, WHITE, 10, 10, lambda seconds: f"Time: {seconds:.1f}s / {WIN_TIME}s")
+        self.score_label = entities.Label(self.font, WHITE, 10, 50, "Score: {}".format)
+        self.controls_label = entities.Label(self.font, (200, 200, 200), 10, SCREEN_HEIGHT - 40, "Controls: WASD Move, SPACE Shoot, ESC Exit")
+        self.damage_label = entities.Label(self.font, WHITE, 10, 90, "Hits taken: {}".format)
+        self.labels = [self.time_label, self.score_label, self.controls_label]
+        if self.bullet_hell:
+            self.labels.append(self.damage_label)
+
+    def reset(self):
+        self.player_x = SCREEN_WIDTH // 2 - PLAYER_SIZE // 2
+        self.player_y = SCREEN_HEIGHT - 100
+        self.prev_x, self.prev_y = self.player_x, self.player_y  # 上一个 tick 的位置，画面插值用
+        self.player_rect = pygame.Rect(self.player_x, self.player_y, PLAYER_SIZE, PLAYER_SIZE)
+        if self.bullet_hell:
+            # 随机数都从 self.rng 派生
+            self.enemies = entities.EntityStore(HELL_ENEMY_SIZE, HELL_ENEMY_SIZE, seed=self.rng.getrandbits(32))
+            self.bullets = entities.EntityStore(BULLET_SIZE, BULLET_SIZE)
+        else:
+            self.enemies = entities.EntityPool(ENEMY_SIZE, ENEMY_SIZE, velocity=(0, ENEMY_SPEED))
+            self.bullets = entities.EntityPool(BULLET_SIZE, BULLET_SIZE, velocity=(0, -BULLET_SPEED))
+        self.state = "PLAYING"
+        self.ticks = 0
+        self.score = 0
+        self.cooldown = 0
+        self.spawn_timer = 0
+        self.damage = 0  # 弹幕模式下被击中的次数
 
-    while running:
-        clock.tick(FPS)
-        
-        # 1. 事件处理
+    @property
+    def elapsed_seconds(self):
+        return self.ticks / TICK_RATE
+
+    def handle_events(self):
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
-                running = False
+                return False
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:  # 按 ESC 退出
-                    running = False
-                if event.key == pygame.K_r and state != "PLAYING":
-                    player_x, player_y, enemies, bullets, start_ticks, state, score, cooldown = reset_game()
-
-        # 2. 游戏逻辑更新
-        if state == "PLAYING":
-            # --- 玩家移动 (WASD) ---
-            keys = pygame.key.get_pressed()
-            if (keys[pygame.K_a] or keys[pygame.K_LEFT]) and player_x > 0:
-                player_x -= PLAYER_SPEED
-            if (keys[pygame.K_d] or keys[pygame.K_RIGHT]) and player_x < SCREEN_WIDTH - PLAYER_SIZE:
-                player_x += PLAYER_SPEED
-            if (keys[pygame.K_w] or keys[pygame.K_UP]) and player_y > 0:
-                player_y -= PLAYER_SPEED
-            if (keys[pygame.K_s] or keys[pygame.K_DOWN]) and player_y < SCREEN_HEIGHT - PLAYER_SIZE:
-                player_y += PLAYER_SPEED
-
-            # --- 射击逻辑 ---
-            if cooldown > 0:
-                cooldown -= 1
-            if keys[pygame.K_SPACE] and cooldown == 0:
-                # 发射子弹：从玩家中心顶部出发
-                bullet_x = player_x + PLAYER_SIZE // 2 - BULLET_SIZE // 2
-                bullet_y = player_y
-                bullets.append([bullet_x, bullet_y])
-                cooldown = SHOOT_COOLDOWN
-
-            # --- 计时器与胜利条件 ---
-            current_ticks = pygame.time.get_ticks()
-            elapsed_seconds = (current_ticks - start_ticks) / 1000
-            if elapsed_seconds >= WIN_TIME:
-                state = "WIN"
-
-            # --- 敌人生成 ---
-            spawn_timer += 1
-            if spawn_timer >= ENEMY_SPAWN_RATE:
-                spawn_timer = 0
-                enemy_x = random.randint(0, SCREEN_WIDTH - ENEMY_SIZE)
+                    return False
+                if event.key == pygame.K_r and self.state != "PLAYING":
+                    self.pending |= RESTART
+                if event.key == pygame.K_F3:
+                    self.profiler.toggle_overlay()
+        return True
+
+    def step(self, buttons=0):
+        """模拟一个 tick，buttons 是这个 tick 的输入位（read_buttons() 的返回值加上 RESTART）"""
+        if buttons & RESTART and self.state != "PLAYING":
+            self.reset()
+        if self.state != "PLAYING":
+            return
+        self.ticks += 1
+
+        # --- 玩家移动 (WASD) ---
+        self.prev_x, self.prev_y = self.player_x, self.player_y
+        if buttons & LEFT and self.player_x > 0:
+            self.player_x -= PLAYER_SPEED
+        if buttons & RIGHT and self.player_x < SCREEN_WIDTH - PLAYER_SIZE:
+            self.player_x += PLAYER_SPEED
+        if buttons & UP and self.player_y > 0:
+            self.player_y -= PLAYER_SPEED
+        if buttons & DOWN and self.player_y < SCREEN_HEIGHT - PLAYER_SIZE:
+            self.player_y += PLAYER_SPEED
+
+        # --- 射击逻辑 ---
+        if self.cooldown > 0:
+            self.cooldown -= 1
+        if buttons & SHOOT and self.cooldown == 0:
+            # 发射子弹：从玩家中心顶部出发
+            bullet_x = self.player_x + PLAYER_SIZE // 2 - BULLET_SIZE // 2
+            bullet_y = self.player_y
+            if self.bullet_hell:
+                spread = [i - HELL_SPREAD // 2 for i in range(HELL_SPREAD)]
+                self.bullets.add(bullet_x, bullet_y, spread, -BULLET_SPEED)
+                self.cooldown = HELL_COOLDOWN
+            else:
+                self.bullets.add(bullet_x, bullet_y)
+                self.cooldown = SHOOT_COOLDOWN
+
+        # --- 计时器与胜利条件 ---
+        if self.ticks >= WIN_TIME * TICK_RATE:
+            self.state = "WIN"
+
+        # --- 敌人生成 ---
+        if self.bullet_hell:
+            self.enemies.spawn(HELL_SPAWN, x=(0, SCREEN_WIDTH - HELL_ENEMY_SIZE), y=-HELL_ENEMY_SIZE, vy=HELL_ENEMY_SPEED)
+        else:
+            self.spawn_timer += 1
+            if self.spawn_timer >= ENEMY_SPAWN_RATE:
+                self.spawn_timer = 0
+                enemy_x = self.rng.randint(0, SCREEN_WIDTH - ENEMY_SIZE)
                 enemy_y = -ENEMY_SIZE
-                enemies.append([enemy_x, enemy_y])
-
-            # --- 子弹移动与碰撞检测 ---
-            for bullet in bullets[:]:
-                bullet[1] -= BULLET_SPEED # 子弹向上飞
-                # 移除超出屏幕顶部的子弹
-                if bullet[1] < -BULLET_SIZE:
-                    bullets.remove(bullet)
-
-            # --- 敌人移动与碰撞检测 ---
-            for enemy in enemies[:]:
-                enemy[1] += ENEMY_SPEED # 敌人向下落
-                
-                player_rect = pygame.Rect(player_x, player_y, PLAYER_SIZE, PLAYER_SIZE)
-                enemy_rect = pygame.Rect(enemy[0], enemy[1], ENEMY_SIZE, ENEMY_SIZE)
-
-                # 1. 玩家碰到敌人 -> 游戏结束
-                if player_rect.colliderect(enemy_rect):
-                    state = "GAMEOVER"
-
-                # 2. 子弹碰到敌人 -> 敌人消失，加分
-                for bullet in bullets[:]:
-                    bullet_rect = pygame.Rect(bullet[0], bullet[1], BULLET_SIZE, BULLET_SIZE)
-                    if bullet_rect.colliderect(enemy_rect):
-                        if enemy in enemies: # 确保敌人还在列表里
-                            enemies.remove(enemy)
-                        if bullet in bullets: # 确保子弹还在列表里
-                            bullets.remove(bullet)
-                        score += 1
-                        break # 子弹消失后跳出子弹循环
-
-                # 移除超出屏幕底部的敌人
-                if enemy in enemies and enemy[1] > SCREEN_HEIGHT:
-                    enemies.remove(enemy)
-
-        # 3. 画面绘制
+                self.enemies.add(enemy_x, enemy_y)
+
+        # --- 子弹、敌人移动与碰撞检测 ---
+        self.player_rect.x = self.player_x
+        self.player_rect.y = self.player_y
+        if self.bullet_hell:
+            hits, taken = update_bullet_hell(self.enemies, self.bullets, self.player_x, self.player_y)
+            self.damage += taken
+        else:
+            hits, player_hit = update_entities(self.enemies, self.bullets, self.player_rect, self.grid)
+            if player_hit:
+                self.state = "GAMEOVER"
+        self.score += hits
+
+    def state_hash(self):
+        """模拟状态的摘要，回放时核对用"""
+        return replay.state_hash(self.state, self.ticks, self.score, self.damage, self.cooldown, self.spawn_timer,
+                                 self.player_x, self.player_y, self.rng.getstate(),
+                                 self.enemies.state_bytes(), self.bullets.state_bytes())
+
+    def draw(self, alpha=1.0):
+        """画出当前状态，present() 提交给窗口；alpha 见 timestep.FixedTimestep.alpha，移动的物体画在两个 tick 之间"""
+        screen, font, big_font = self.screen, self.font, self.big_font
         screen.fill(BLACK)
+        dirty_rects = self.dirty_rects
+
+        if self.state == "PLAYING":
+            # 画玩家、敌人和子弹；blits 的参数都是预先建好的，不返回新的 Rect
+            player_view = self.player_view
+            player_view.x = round(self.prev_x + (self.player_x - self.prev_x) * alpha)
+            player_view.y = round(self.prev_y + (self.player_y - self.prev_y) * alpha)
+            screen.blits(self.player_blit, doreturn=False)
+            self.enemies.draw(screen, self.enemy_image, alpha)
+            self.bullets.draw(screen, self.bullet_image, alpha)
+            if self.bullet_hell:
+                # 画判定框
+                offset = (PLAYER_SIZE - HELL_HITBOX) // 2
+                pygame.draw.rect(screen, WHITE, (player_view.x + offset, player_view.y + offset, HELL_HITBOX, HELL_HITBOX))
 
-        if state == "PLAYING":
-            # 画玩家
-            pygame.draw.rect(screen, GREEN, (player_x, player_y, PLAYER_SIZE, PLAYER_SIZE))
-            # 画敌人
-            for enemy in enemies:
-                pygame.draw.rect(screen, RED, (enemy[0], enemy[1], ENEMY_SIZE, ENEMY_SIZE))
-            # 画子弹
-            for bullet in bullets:
-                pygame.draw.rect(screen, YELLOW, (bullet[0], bullet[1], BULLET_SIZE, BULLET_SIZE))
-            
             # 画 UI
-            draw_text(f"Time: {elapsed_seconds:.1f}s / {WIN_TIME}s", font, WHITE, 10, 10)
-            draw_text(f"Score: {score}", font, WHITE, 10, 50)
-            draw_text("Controls: WASD Move, SPACE Shoot, ESC Exit", font, (200, 200, 200), 10, SCREEN_HEIGHT - 40)
+            self.time_label.draw(screen, round(self.elapsed_seconds, 1))
+            self.score_label.draw(screen, self.score)
+            self.controls_label.draw(screen)
+            stats_rect = None
+            if self.bullet_hell:
+                entity_count = len(self.enemies) + len(self.bullets)
+                self.damage_label.draw(screen, self.damage)
+                # 实体数和 FPS 每帧都在变，不缓存
+                stats_rect = draw_text(screen, f"Entities: {entity_count}  FPS: {self.clock.get_fps():.0f}", font, WHITE, 10, 130)
+
+            # 脏矩形模式：记录这一帧画过的区域
+            if dirty_rects is not None:
+                dirty_rects.add(player_view)
+                dirty_rects.extend(self.enemies, alpha)
+                dirty_rects.extend(self.bullets, alpha)
+                for label in self.labels:
+                    dirty_rects.add(label.rect)
+                if stats_rect is not None:
+                    dirty_rects.add(stats_rect)
+
+        elif self.state == "WIN":
+            draw_text(screen, "CHALLENGE SUCCESS!", big_font, GREEN, SCREEN_WIDTH//2, SCREEN_HEIGHT//2, center=True)
+            draw_text(screen, f"Final Score: {self.score}", font, WHITE, SCREEN_WIDTH//2, SCREEN_HEIGHT//2 + 60, center=True)
+            draw_text(screen, "Press 'R' to Restart | ESC to Quit", font, WHITE, SCREEN_WIDTH//2, SCREEN_HEIGHT//2 + 100, center=True)
+            if self.bullet_hell:
+                draw_text(screen, f"Hits taken: {self.damage}", font, WHITE, SCREEN_WIDTH//2, SCREEN_HEIGHT//2 + 140, center=True)
+
+        elif self.state == "GAMEOVER":
+            draw_text(screen, "GAME OVER", big_font, RED, SCREEN_WIDTH//2, SCREEN_HEIGHT//2, center=True)
+            draw_text(screen, f"Final Score: {self.score}", font, WHITE, SCREEN_WIDTH//2, SCREEN_HEIGHT//2 + 60, center=True)
+            draw_text(screen, "Press 'R' to Restart | ESC to Quit", font, WHITE, SCREEN_WIDTH//2, SCREEN_HEIGHT//2 + 100, center=True)
 
-        elif state == "WIN":
-            draw_text("CHALLENGE SUCCESS!", big_font, GREEN, SCREEN_WIDTH//2, SCREEN_HEIGHT//2, center=True)
-            draw_text(f"Final Score: {score}", font, WHITE, SCREEN_WIDTH//2, SCREEN_HEIGHT//2 + 60, center=True)
-            draw_text("Press 'R' to Restart | ESC to Quit", font, WHITE, SCREEN_WIDTH//2, SCREEN_HEIGHT//2 + 100, center=True)
+    def present(self):
+        """把画面提交给窗口：整屏 flip，脏矩形模式下只提交变化的区域"""
+        if self.dirty_rects is None:
+            pygame.display.flip()
+        else:
+            if self.state != "PLAYING":
+                self.dirty_rects.invalidate()
+            self.dirty_rects.present()
 
-        elif state == "GAMEOVER":
-            draw_text("GAME OVER", big_font, RED, SCREEN_WIDTH//2, SCREEN_HEIGHT//2, center=True)
-            draw_text(f"Final Score: {score}", font, WHITE, SCREEN_WIDTH//2, SCREEN_HEIGHT//2 + 60, center=True)
-            draw_text("Press 'R' to Restart | ESC to Quit", font, WHITE, SCREEN_WIDTH//2, SCREEN_HEIGHT//2 + 100, center=True)
+    def frame(self):
+        """主循环的一帧：限制帧率、处理事件、按经过的时间模拟若干个 tick、画出并提交画面；返回是否继续运行"""
+        prof = self.profiler
+        prof.begin()
+        self.clock.tick(FPS)  # 只限制渲染帧率，模拟速度由 timestep 决定
+        prof.mark("wait")
+        running = self.handle_events()
+        prof.mark("events")
+        steps = self.timestep.advance()
+        if steps:
+            buttons = read_buttons()
+            for _ in range(steps):
+                inputs = buttons | self.pending
+                self.pending = 0
+                if self.recorder is not None:
+                    self.recorder.record((inputs,) if inputs else ())
+                self.step(inputs)
+        prof.mark("update")
+        self.draw(self.timestep.alpha)
+        prof.mark("draw")
+        overlay = prof.draw(self.screen)
+        if overlay is not None and self.dirty_rects is not None:
+            self.dirty_rects.add(overlay)
+        self.present()
+        prof.mark("flip")
+        prof.end(ticks=steps, enemies=len(self.enemies), bullets=len(self.bullets))
+        return running
 
-        pygame.display.flip()
+    def close(self):
+        """结束时保存录像和 trace"""
+        if self.recorder is not None:
+            self.recorder.save(self.state_hash())
+        self.profiler.close()
 
-    pygame.quit()
-    sys.exit()
+    def run(self):
+        self.open()
+        while self.frame():
+            pass
+        self.close()
+        runtime.shutdown()
+        sys.exit()
+
+    def run_headless(self, ticks, buttons=0):
+        """不画画面、不限帧率，尽快模拟 ticks 个 tick，一直按住 buttons；游戏结束时提前停下"""
+        for _ in range(ticks):
+            if self.state != "PLAYING":
+                break
+            self.step(buttons)
+
+def main(bullet_hell=False, dirty=False, trace=None):
+    game = Game(bullet_hell, dirty)
+    if trace:
+        game.profiler = profiler.FrameProfiler(trace)
+    game.run()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="绿色方块射击生存战")
+    parser.add_argument("--bullet-hell", action="store_true", help="弹幕模式：同时存在上万个敌人，被击中不会结束游戏，需要 numpy")
+    parser.add_argument("--dirty", action="store_true", help="脏矩形模式：只把变化的区域提交给窗口")
+    parser.add_argument("--seed", type=int, help="随机数种子，种子和输入相同时模拟结果相同")
+    parser.add_argument("--record", metavar="FILE", help="把这一局的种子和输入录制到文件，用 replay.py 回放")
+    parser.add_argument("--trace", metavar="FILE",
+                        help="把每帧各阶段的耗时和实体数写成 Chrome trace JSON（游戏中按 F3 显示帧时间图）")
+    parser.add_argument("--headless", type=int, metavar="TICKS",
+                        help="无头模式：不画画面，一直按住射击键尽快模拟这么多个 tick，打印速度和结果")
+    args = parser.parse_args()
+    if args.headless is None:
+        game = Game(args.bullet_hell, args.dirty, args.seed)
+        if args.record:
+            game.recorder = replay.Recorder(args.record, "shootit", game.seed, bullet_hell=args.bullet_hell)
+        if args.trace:
+            game.profiler = profiler.FrameProfiler(args.trace)
+        game.run()
+    else:
+        game = Game(args.bullet_hell, seed=args.seed)
+        start = time.perf_counter()
+        game.run_headless(args.headless, SHOOT)
+        elapsed = time.perf_counter() - start
+        print(f"{game.ticks} ticks / {elapsed:.2f}s = {game.ticks / elapsed:.0f} ticks/s "
+              f"({game.ticks / TICK_RATE / elapsed:.1f}x 实时)")
+        print(f"state={game.state} score={game.score} damage={game.damage}")
\ No newline at end of file
@@ -0,0 +1,282 @@
+"""贪吃蛇自动驾驶
+
+Autopilot.next_direction(snake, food) 给出下一步的方向，策略是：
+    1. 用 A* 找到食物的路径，并模拟走完这条路径后蛇头还能追上蛇尾（追尾检查），才采用；
+    2. 棋盘存在哈密顿回路时，只要蛇身沿回路顺序排列，沿回路走一格总是安全的，
+       所以 A* 路径只在不破坏这个顺序时当作“抄近路”使用，否则沿回路前进，保证能占满棋盘；
+    3. 没有哈密顿回路（行列数都是奇数）时，A* 路径不安全就朝蛇尾走；
+       长时间吃不到食物时放弃追尾检查，避免永远绕圈。
+规划好的路径会一直沿用到食物被吃掉或路径失效，不会每步重新搜索。
+这个模块不依赖 pygame，snake 只需要有 sanke.Snake 的 body / occupied / grow / cols / rows。
+"""
+import heapq
+from collections import deque
+
+# 蛇长超过棋盘的这个比例后不再抄近路，只沿哈密顿回路走
+SHORTCUT_LIMIT = 0.5
+# 抄近路后蛇头沿回路到蛇尾至少还要留这么多格，给之后的生长留余量
+SHORTCUT_MARGIN = 3
+# A* 找不到安全路径时，隔这么多步再试
+REPLAN_INTERVAL = 8
+# 没有回路可用时，超过 棋盘格数 x 这个倍数 步没吃到食物就认为在原地绕圈，放弃追尾检查
+STALL_FACTOR = 2
+
+
+def hamiltonian_cycle(cols, rows):
+    """返回一条回路（一维下标列表），棋盘太窄时返回 None
+
+    行数为偶数时：第 0 行从左走到右，之后在第 1~cols-1 列之间逐行折返，最后沿第 0 列回到起点。
+    行数为奇数、列数为偶数时按列做同样的构造。
+    行列数都是奇数时不存在经过所有格子的回路，这时最后两行改为逐列上下折返，
+    回路经过除右下角以外的所有格子。
+    """
+    if cols < 2 or rows < 2 or (cols % 2 and rows % 2 and min(cols, rows) < 3):
+        return None
+    if rows % 2 and not cols % 2:
+        # 转置：在 rows x cols 的棋盘上构造，再把坐标换回来
+        return [(i % rows) * cols + i // rows for i in hamiltonian_cycle(rows, cols)]
+    serpentine_rows = rows if not rows % 2 else rows - 2
+    order = list(range(cols))
+    for y in range(1, serpentine_rows):
+        xs = range(cols - 1, 0, -1) if y % 2 else range(1, cols)
+        order.extend(y * cols + x for x in xs)
+    if rows % 2:
+        # 最后两行：先走倒数第二行的最右格，再从右往左逐列上下折返，跳过右下角
+        top, bottom = (rows - 2) * cols, (rows - 1) * cols
+        order.append(top + cols - 1)
+        for i, x in enumerate(range(cols - 2, 0, -1)):
+            order.extend((top + x, bottom + x) if i % 2 == 0 else (bottom + x, top + x))
+    order.extend(y * cols for y in range(rows - 1, 0, -1))
+    return order
+
+
+class Autopilot:
+    def __init__(self, cols, rows):
+        self.cols = cols
+        self.rows = rows
+        self.size = cols * rows
+        cycle = hamiltonian_cycle(cols, rows)
+        # 回路的两个方向，以及每个格子在其中的位置；开局时选和蛇身顺序一致的那个方向
+        self.cycles = []
+        self.cycle_len = len(cycle) if cycle is not None else 0
+        if cycle is not None:
+            for order in (cycle, cycle[::-1]):
+                position = [0] * self.size
+                for i, cell in enumerate(order):
+                    position[cell] = i
+                self.cycles.append((order, position, self._aliases(order, position)))
+        self.reset()
+
+    def _aliases(self, order, position):
+        """不在回路上的格子（奇数 x 奇数棋盘的右下角）可以代替回路上的某一格
+
+        它的两个邻居在回路上正好隔一格，从前一个邻居走到它再走到后一个邻居，
+        和走中间那一格是等价的，所以让它和中间那一格共用回路位置。返回 {中间格: 替代格}。
+        """
+        aliases = {}
+        on_cycle = set(order)
+        for cell in range(self.size):
+            if cell in on_cycle:
+                continue
+            around = sorted(position[n] for n in self._neighbors(cell))
+            for a, b in zip(around, around[1:]):
+                if b - a == 2:
+                    middle = order[a + 1]
+                    position[cell] = a + 1
+                    aliases[middle] = cell
+                    break
+        return aliases
+
+    def reset(self):
+        """新的一局开始时调用"""
+        self.plan = deque()    # 规划好的路径（一维下标），不含当前蛇头
+        self.plan_food = None  # 规划路径时的食物位置
+        self.food_since = 0    # 当前食物出现时的步数
+        self.retry_at = 0      # 到这一步之前不再尝试 A*
+        self.ticks = 0
+        self.ordered = False   # 蛇身是否已经沿回路顺序排列
+        self.cycle = None      # 选定方向的回路
+        self.position = None   # 每个格子在 self.cycle 中的位置
+        self.aliases = {}      # 回路上的格子 -> 可以代替它的回路外的格子
+        self.replans = 0       # 统计：A* 搜索次数
+
+    def _orient(self, body):
+        """检查蛇身是否沿回路顺序排列，必要时把回路反过来；成功后一直保持"""
+        for cycle, position, aliases in self.cycles:
+            # 从蛇尾到蛇头，沿回路前进的总距离小于一圈就说明顺序一致
+            total = 0
+            prev = body[-1]
+            for cell in reversed(body):
+                total += (position[cell] - position[prev]) % self.cycle_len
+                prev = cell
+            if total < self.cycle_len:
+                self.cycle = cycle
+                self.position = position
+                self.aliases = aliases
+                return True
+        return False
+
+    def _neighbors(self, i):
+        x, y = i % self.cols, i // self.cols
+        if y > 0:
+            yield i - self.cols
+        if x < self.cols - 1:
+            yield i + 1
+        if y < self.rows - 1:
+            yield i + self.cols
+        if x > 0:
+            yield i - 1
+
+    def _passable(self, snake, i, tail):
+        # 没有待生长时，蛇尾这一格在下一步会空出来
+        return not snake.occupied[i] or (i == tail and not snake.grow)
+
+    def next_direction(self, snake, food):
+        """根据当前局面返回下一步的方向 (dx, dy)"""
+        cols = self.cols
+        body = [y * cols + x for x, y in snake.body] if not self.ordered else None
+        if body is not None:
+            self.ordered = self._orient(body)
+        head = snake.body[0][1] * cols + snake.body[0][0]
+        target = self._choose(snake, head, None if food is None else food[1] * cols + food[0])
+        self.ticks += 1
+        return (target % cols - head % cols, target // cols - head // cols)
+
+    def _choose(self, snake, head, food):
+        tail_x, tail_y = snake.body[-1]
+        tail = tail_y * self.cols + tail_x
+
+        # 1. 沿用或重新规划到食物的路径
+        if food is not None and food != self.plan_food:
+            self.plan.clear()
+            self.plan_food = food
+            self.food_since = self.ticks
+            self.retry_at = 0
+        if not self.plan and food is not None and self.ticks >= self.retry_at and self._may_shortcut(snake):
+            self.plan = self._plan(snake, head, tail, food)
+            self.replans += 1
+            if not self.plan:
+                self.retry_at = self.ticks + REPLAN_INTERVAL
+        if self.plan:
+            step = self.plan[0]
+            if self._passable(snake, step, tail) and (not self.ordered or self._cycle_safe(snake, head, tail, step, food)):
+                self.plan.popleft()
+                return step
+            self.plan.clear()
+            self.retry_at = self.ticks + REPLAN_INTERVAL
+
+        # 2. 沿哈密顿回路前进；下一格有替代格时，优先走有食物或者空着的那个
+        if self.ordered:
+            step = self.cycle[(self.position[head] + 1) % self.cycle_len]
+            alias = self.aliases.get(step)
+            if alias is not None and (alias == food or snake.occupied[step] and not snake.occupied[alias]):
+                return alias
+            return step
+
+        # 3. 没有回路可用：朝蛇尾走，实在不行随便找一个空格
+        path = self._bfs(snake, head, tail)
+        if path and not (path[0] == tail and snake.grow):
+            return path[0]
+        for n in self._neighbors(head):
+            if self._passable(snake, n, tail):
+                return n
+        return head + self.cols if head + self.cols < self.size else head - self.cols
+
+    def _may_shortcut(self, snake):
+        return not self.ordered or len(snake.body) < self.size * SHORTCUT_LIMIT
+
+    def _cycle_safe(self, snake, head, tail, step, food):
+        """沿回路顺序来看，走到 step 是不是向前跳、没有越过食物，并且离蛇尾还有余量"""
+        position, size = self.position, self.cycle_len
+        ahead = (position[step] - position[head]) % size
+        if ahead == 1:
+            return True
+        if len(snake.body) >= self.size * SHORTCUT_LIMIT:
+            return False
+        to_tail = (position[tail] - position[head]) % size
+        to_food = (position[food] - position[head]) % size
+        # 不能越过食物（与食物共用回路位置的替代格也不行）
+        return (ahead < to_food or step == food) and ahead < to_tail - SHORTCUT_MARGIN
+
+    def _plan(self, snake, head, tail, food):
+        """A* 找到食物的路径，并做追尾检查；不安全时返回空"""
+        path = self._astar(snake, head, tail, food)
+        stalled = not self.ordered and self.ticks - self.food_since > self.size * STALL_FACTOR
+        if path and (stalled or self._can_reach_tail_after(snake, path)):
+            return deque(path)
+        return deque()
+
+    def _astar(self, snake, head, tail, goal):
+        cols = self.cols
+        gx, gy = goal % cols, goal // cols
+        parent = {head: None}
+        cost = {head: 0}
+        heap = [(0, 0, head)]
+        while heap:
+            _, g, i = heapq.heappop(heap)
+            if i == goal:
+                path = []
+                while i != head:
+                    path.append(i)
+                    i = parent[i]
+                path.reverse()
+                return path
+            if g > cost[i]:
+                continue
+            g += 1
+            for n in self._neighbors(i):
+                if (n not in cost or g < cost[n]) and self._passable(snake, n, tail):
+                    cost[n] = g
+                    parent[n] = i
+                    h = abs(n % cols - gx) + abs(n // cols - gy)
+                    heapq.heappush(heap, (g + h, g, n))
+        return []
+
+    def _can_reach_tail_after(self, snake, path):
+        """模拟沿 path 吃到食物，检查届时蛇头是否还有路通往蛇尾"""
+        length = len(snake.body)
+        if length + 1 >= self.size:
+            return True  # 吃完这一个就占满棋盘了
+        cols = self.cols
+        # 走了 k 步之后的蛇身：路径倒过来接上原来的蛇身，长度不变（有待生长时多一节）
+        body = [y * cols + x for x, y in snake.body]
+        new_body = (path[::-1] + body)[:length + snake.grow]
+        occupied = bytearray(snake.occupied)
+        for i in body:
+            occupied[i] = 0
+        for i in new_body:
+            occupied[i] = 1
+        head, tail = new_body[0], new_body[-1]
+        # 吃完后要生长一步，蛇尾不会马上空出来，所以要求至少隔一格才能追上蛇尾
+        seen = {head}
+        queue = deque([head])
+        while queue:
+            i = queue.popleft()
+            for n in self._neighbors(i):
+                if n == tail and i != head:
+                    return True
+                if n not in seen and not occupied[n]:
+                    seen.add(n)
+                    queue.append(n)
+        return False
+
+    def _bfs(self, snake, start, goal):
+        """start 到 goal 的最短路径（不含 start），goal 可以是被占用的蛇尾"""
+        parent = {start: None}
+        queue = deque([start])
+        while queue:
+            i = queue.popleft()
+            for n in self._neighbors(i):
+                if n in parent:
+                    continue
+                if n == goal or not snake.occupied[n]:
+                    parent[n] = i
+                    if n == goal:
+                        path = []
+                        while n != start:
+                            path.append(n)
+                            n = parent[n]
+                        path.reverse()
+                        return path
+                    queue.append(n)
+        return []
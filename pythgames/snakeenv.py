@@ -0,0 +1,137 @@
+"""不依赖 pygame 的批量贪吃蛇模拟器，用于训练和评估 AI
+
+SnakeEnvs 在 NumPy 数组上同时推进 n 个棋盘，规则与 sanke.Snake / sanke.Food 完全一致：
+    - 蛇初始长 3 格，位于棋盘中央，头朝右；不能直接掉头
+    - 每步先移动（没有待生长时去掉尾巴），再检查撞墙和撞自己，所以可以走进刚空出来的尾巴格
+    - 吃到食物后下一步生长，得 10 分，食物从空格子中均匀随机生成；没有空格子时获胜
+结束（撞死或获胜）的棋盘在 step() 末尾自动重置。需要 numpy。
+
+用法：
+    envs = SnakeEnvs(1024, seed=0)
+    rewards, dones = envs.step(actions)   # actions: 每个棋盘的方向 0~3，-1 表示保持方向
+"""
+import numpy as np
+
+# 动作编号对应的方向：0 上、1 右、2 下、3 左，与 sanke 的 UP / RIGHT / DOWN / LEFT 相同
+DIRECTIONS = ((0, -1), (1, 0), (0, 1), (-1, 0))
+_DX = np.array([d[0] for d in DIRECTIONS])
+_DY = np.array([d[1] for d in DIRECTIONS])
+RIGHT = 1
+
+REWARD_FOOD = 1.0
+REWARD_DEATH = -1.0
+
+# observe() 返回的棋盘中每格的取值
+EMPTY, BODY, HEAD, FOOD = 0, 1, 2, 3
+
+
+class SnakeEnvs:
+    """n 个相互独立的贪吃蛇棋盘
+
+    每个棋盘的蛇身保存在长度为 cols*rows 的环形缓冲区里（头部写入、尾部前移），
+    occupied 是每格一个字节的占用表，所以每步的开销与蛇长无关。
+    """
+
+    def __init__(self, n, cols=30, rows=30, seed=None):
+        self.n = n
+        self.cols = cols
+        self.rows = rows
+        self.rng = np.random.default_rng(seed)
+        size = cols * rows
+        self.body = np.zeros((n, size), dtype=np.int32)    # 环形缓冲区，保存一维格子下标
+        self.head = np.zeros(n, dtype=np.int64)            # 头部在环形缓冲区中的位置
+        self.length = np.zeros(n, dtype=np.int64)
+        self.occupied = np.zeros((n, size), dtype=np.uint8)
+        self.direction = np.full(n, RIGHT, dtype=np.int64)
+        self.grow = np.zeros(n, dtype=bool)
+        self.food = np.zeros(n, dtype=np.int64)            # 食物的一维下标，棋盘满了时为 -1
+        self.score = np.zeros(n, dtype=np.int64)
+        self.won = np.zeros(n, dtype=bool)                 # 上一步中获胜的棋盘
+        self.final_score = np.zeros(n, dtype=np.int64)     # 上一步中结束的棋盘重置前的分数
+        self.reset()
+
+    def reset(self, mask=None):
+        """重置 mask 选中的棋盘（默认全部）"""
+        envs = np.arange(self.n) if mask is None else np.flatnonzero(mask)
+        if not len(envs):
+            return
+        start = (self.rows // 2) * self.cols + self.cols // 2
+        cells = np.array([start - 2, start - 1, start])  # 从尾到头
+        self.occupied[envs] = 0
+        self.body[envs, :3] = cells
+        self.occupied[envs[:, None], cells] = 1
+        self.head[envs] = 2
+        self.length[envs] = 3
+        self.direction[envs] = RIGHT
+        self.grow[envs] = False
+        self.score[envs] = 0
+        self._spawn(envs)
+
+    def _spawn(self, envs):
+        """给 envs 中的每个棋盘在空格子里均匀随机放一个食物，返回是否还有空格子"""
+        free = self.occupied[envs] == 0
+        counts = free.sum(axis=1)
+        # 第 k 个空格子：前缀和第一次超过 k 的位置
+        k = (self.rng.random(len(envs)) * counts).astype(np.int64)
+        cells = (free.cumsum(axis=1) > k[:, None]).argmax(axis=1)
+        has_free = counts > 0
+        self.food[envs] = np.where(has_free, cells, -1)
+        return has_free
+
+    def step(self, actions):
+        """所有棋盘前进一步，返回 (rewards, dones)；结束的棋盘已经自动重置"""
+        idx = np.arange(self.n)
+        size = self.cols * self.rows
+        actions = np.asarray(actions)
+        turn = (actions >= 0) & (actions != (self.direction + 2) % 4)
+        self.direction = np.where(turn, actions, self.direction)
+
+        head = self.body[idx, self.head]
+        x = head % self.cols + _DX[self.direction]
+        y = head // self.cols + _DY[self.direction]
+        wall = (x < 0) | (x >= self.cols) | (y < 0) | (y >= self.rows)
+        new_head = np.where(wall, 0, y * self.cols + x)
+
+        # 先去掉尾巴（没有待生长时），再看新头部的格子是否还被占用
+        pop = ~self.grow
+        tail = self.body[idx, (self.head - self.length + 1) % size]
+        self.occupied[idx[pop], tail[pop]] = 0
+        self.length -= pop
+        self.grow[:] = False
+
+        dead = wall | (self.occupied[idx, new_head] > 0)
+        alive = idx[~dead]
+        self.head[alive] = (self.head[alive] + 1) % size
+        self.body[alive, self.head[alive]] = new_head[alive]
+        self.occupied[alive, new_head[alive]] = 1
+        self.length[alive] += 1
+
+        ate = ~dead & (new_head == self.food)
+        self.grow[ate] = True
+        self.score[ate] += 10
+        self.won[:] = False
+        eaters = idx[ate]
+        if len(eaters):
+            self.won[eaters] = ~self._spawn(eaters)
+
+        rewards = np.where(ate, REWARD_FOOD, 0.0)
+        rewards[dead] = REWARD_DEATH
+        dones = dead | self.won
+        self.final_score[dones] = self.score[dones]
+        self.reset(dones)
+        return rewards, dones
+
+    def snake(self, i):
+        """第 i 个棋盘的蛇身，(x, y) 列表，头在前，与 sanke.Snake.body 的顺序相同"""
+        size = self.cols * self.rows
+        cells = self.body[i, (self.head[i] - np.arange(self.length[i])) % size]
+        return [(int(c) % self.cols, int(c) // self.cols) for c in cells]
+
+    def observe(self):
+        """所有棋盘的状态，形状为 (n, rows, cols) 的 uint8 数组，取值见 EMPTY/BODY/HEAD/FOOD"""
+        idx = np.arange(self.n)
+        board = self.occupied.copy()  # 被占用的格子正好是 BODY
+        board[idx, self.body[idx, self.head]] = HEAD
+        has_food = self.food >= 0
+        board[idx[has_food], self.food[has_food]] = FOOD
+        return board.reshape(self.n, self.rows, self.cols)
@@ -0,0 +1,55 @@
+"""固定时间步长：模拟按固定的 tick 频率推进，和渲染的帧率无关
+
+每帧用真实经过的时间给累加器充值，累加器里每攒够一个 tick 的时间就模拟一步；
+渲染变慢时一帧会模拟多步（相当于跳过了中间的画面），游戏速度不变。
+累加器里剩下不到一个 tick 的部分就是 alpha（0 ~ 1），画面画在上一个 tick 和当前 tick 之间的插值位置，
+这样即使渲染帧率和 tick 频率不一致，运动也是平滑的。
+
+一帧补的时间有上限（max_frame_time），窗口被拖动、断点调试之后不会一口气模拟几千步越落越远。
+
+用法：
+    timestep = FixedTimestep(60)
+    while running:
+        for _ in range(timestep.advance()):
+            game.step(buttons)
+        game.draw(timestep.alpha)
+"""
+import time
+
+TICK_RATE = 60         # 每秒模拟的 tick 数
+MAX_FRAME_TIME = 0.25  # 一帧最多补这么多秒的模拟
+
+
+class FixedTimestep:
+    def __init__(self, tick_rate=TICK_RATE, max_frame_time=MAX_FRAME_TIME, clock=time.perf_counter):
+        self.dt = 1.0 / tick_rate
+        self.max_frame_time = max_frame_time
+        self.clock = clock
+        self.accumulator = 0.0
+        self.last = None
+        self.dropped = 0.0  # 因为超过 max_frame_time 而放弃模拟的时间（秒）
+
+    def reset(self):
+        """下一次 advance() 从头计时，之前经过的时间不再模拟"""
+        self.accumulator = 0.0
+        self.last = None
+
+    def advance(self):
+        """按上一次调用以来真实经过的时间，返回这一帧要模拟的 tick 数"""
+        now = self.clock()
+        if self.last is None:
+            self.last = now
+        frame_time = now - self.last
+        self.last = now
+        if frame_time > self.max_frame_time:
+            self.dropped += frame_time - self.max_frame_time
+            frame_time = self.max_frame_time
+        self.accumulator += frame_time
+        steps = int(self.accumulator // self.dt)
+        self.accumulator -= steps * self.dt
+        return steps
+
+    @property
+    def alpha(self):
+        """当前时刻在上一个 tick 和下一个 tick 之间的位置，0 ~ 1"""
+        return min(self.accumulator / self.dt, 1.0)
@@ -0,0 +1,98 @@
+"""迷宫文件的保存、加载，以及加载后的迷宫能正常绘制
+
+用法：python -m pytest tests
+"""
+import os
+import random
+import sys
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "pythgames"))
+
+import pygame  # noqa: E402
+import pytest  # noqa: E402
+
+import mazefile  # noqa: E402
+from maze import Maze  # noqa: E402
+
+
+def render(maze):
+    """把整张迷宫画到一个足够大的 Surface 上，返回像素"""
+    surface = pygame.Surface((maze.cols * 20 + 2, maze.rows * 20 + 2))
+    maze.draw(surface)
+    return pygame.image.tobytes(surface, "RGB")
+
+
+def test_pack_round_trip():
+    rng = random.Random(0)
+    for count in (0, 1, 2, 7, 8, 101):
+        walls = bytearray(rng.randrange(16) for _ in range(count))
+        packed = mazefile.pack(walls)
+        assert len(packed) == (count + 1) // 2
+        assert mazefile.unpack(packed, count) == walls
+
+
+def test_file_round_trip(tmp_path):
+    rng = random.Random(1)
+    cols, rows = 13, 7  # 奇数个格子
+    walls = bytearray(rng.randrange(16) for _ in range(cols * rows))
+    solution = [0, 1, 14, 27]
+    path = str(tmp_path / "maze.bin")
+    mazefile.save(path, walls, cols, rows, solution)
+    with mazefile.load(path) as f:
+        assert (f.cols, f.rows) == (cols, rows)
+        assert f.walls.unpack() == walls
+        assert f.walls[:] == walls
+        assert list(f.solution) == solution
+
+    # 逐行写入和整体写入（不带路径）得到同一个文件
+    plain_path = str(tmp_path / "plain.bin")
+    rows_path = str(tmp_path / "rows.bin")
+    mazefile.save(plain_path, walls, cols, rows)
+    mazefile.save_rows(rows_path, cols, rows, (walls[y * cols:(y + 1) * cols] for y in range(rows)))
+    with open(plain_path, "rb") as a, open(rows_path, "rb") as b:
+        assert a.read() == b.read()
+
+
+def test_truncated_file(tmp_path):
+    path = str(tmp_path / "maze.bin")
+    mazefile.save(path, bytearray(20), 5, 4)
+    with open(path, "r+b") as fp:
+        fp.truncate(mazefile.HEADER.size + 5)
+    with pytest.raises(ValueError):
+        mazefile.load(path)
+
+
+@pytest.mark.parametrize("compact", [True, False])
+@pytest.mark.parametrize("in_memory", [True, False])
+def test_maze_round_trip(tmp_path, compact, in_memory):
+    maze = Maze(41, 31, compact=compact, seed=1)
+    maze.solve_bfs()
+    path = str(tmp_path / "maze.bin")
+    maze.save(path)
+    loaded = Maze.load(path, in_memory=in_memory)
+    try:
+        assert (loaded.cols, loaded.rows) == (maze.cols, maze.rows)
+        assert bytes(loaded.wall_masks()[:]) == bytes(maze.wall_masks())
+        assert loaded.solution_path == maze.solution_path
+        # 解码到内存时文件已经关掉，不留在迷宫对象上；mmap 模式保持打开
+        assert (loaded.file is None) == in_memory
+        # 加载的迷宫（包括直接读 mmap 的墙壁）画出来和内存里同样墙壁的迷宫一样
+        expected = Maze(maze.cols, maze.rows, walls=bytearray(maze.wall_masks()))
+        expected.solution_path = list(maze.solution_path)
+        assert render(loaded) == render(expected)
+    finally:
+        if loaded.file is not None:
+            loaded.file.close()
+
+
+def test_packed_walls_index_and_slice():
+    walls = bytearray(i % 16 for i in range(11))  # 奇数个格子，最后一个字节有半个填充
+    packed = mazefile.PackedWalls(memoryview(mazefile.pack(walls)), len(walls))
+    assert [packed[i] for i in range(-11, 11)] == [walls[i] for i in range(-11, 11)]
+    for s in (slice(None), slice(1, 8), slice(3, 4), slice(-4, None), slice(5, 2), slice(None, None, 3),
+              slice(9, 1, -2), slice(0, 100)):
+        assert packed[s] == walls[s]
+    for i in (11, -12):
+        with pytest.raises(IndexError):
+            packed[i]